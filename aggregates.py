@@ -0,0 +1,169 @@
+import copy
+import math
+
+import numpy as np
+import pandas as pd
+
+from filter_index import FILTER_COLUMNS, FilterIndex
+from timeline import CRITICAL_STATUS_COLOR
+
+# KPI measures: summary key -> (source column, aggregation)
+SUMMARY_MEASURES = {
+    'total_budget': ('budget', 'sum'),
+    'projects_count': ('project_name', 'size'),
+    'households_reached': ('households_reached', 'sum'),
+    'individuals_reached': ('individuals_reached', 'sum'),
+}
+
+# Dimensions the summary can be grouped by
+SUMMARY_GROUPS = {
+    'manager': 'project_manager',
+    'donor': 'donor',
+}
+
+# Year-over-year periods, by project start date relative to today
+CURRENT_YEAR = 2
+PREVIOUS_YEAR = 1
+EARLIER = 0
+
+
+def start_periods(df, today):
+    """
+    Year-over-year period of each project by start date
+
+    Projects started within the last 365 days (or not yet started) fall in
+    the current year, those started in the 365 days before in the previous
+    year, and everything older is earlier.
+    """
+    today = pd.Timestamp(today)
+    start = df['start_date_dt']
+    periods = np.select(
+        [start > today - pd.Timedelta(days=365), start > today - pd.Timedelta(days=730)],
+        [CURRENT_YEAR, PREVIOUS_YEAR],
+        default=EARLIER
+    )
+    return pd.Series(periods.astype('int8'), index=df.index, name='period')
+
+
+def percent_change(current, previous):
+    """Percentage change between two aligned frames; NaN without a previous value"""
+    previous = previous.where(previous != 0)
+    return (current - previous) / previous * 100
+
+
+def summarize_by(df, by, today):
+    """
+    KPI totals and year-over-year deltas per group in a single groupby pass
+
+    `by` is 'manager', 'donor', any column name, or None for one overall row.
+    Delta columns are named '<measure>_delta' and hold the percentage change
+    of projects started in the current year against the previous year.
+    """
+    if by is None:
+        keys = pd.Series(0, index=df.index, name='group')
+    else:
+        keys = df[SUMMARY_GROUPS.get(by, by)]
+
+    grouped = df.groupby([keys, start_periods(df, today)], observed=True).agg(**SUMMARY_MEASURES)
+
+    totals = grouped.groupby(level=0, observed=True).sum()
+    by_period = grouped.unstack('period', fill_value=0).reindex(
+        columns=pd.MultiIndex.from_product([list(SUMMARY_MEASURES), [CURRENT_YEAR, PREVIOUS_YEAR]]),
+        fill_value=0
+    )
+    deltas = percent_change(
+        by_period.xs(CURRENT_YEAR, axis=1, level=1),
+        by_period.xs(PREVIOUS_YEAR, axis=1, level=1)
+    )
+
+    return totals.join(deltas.add_suffix('_delta'))
+
+
+def summarize(df, today):
+    """
+    Overall KPI summary of a projects frame
+
+    Returns the SUMMARY_MEASURES totals plus a 'deltas' dict with their
+    year-over-year percentage change (None when there is nothing to compare).
+    """
+    summary = {key: 0 for key in SUMMARY_MEASURES}
+    summary['deltas'] = {key: None for key in SUMMARY_MEASURES}
+    if len(df) == 0:
+        return summary
+
+    row = summarize_by(df, None, today).iloc[0]
+    for key in SUMMARY_MEASURES:
+        summary[key] = int(row[key])
+        delta = float(row[f'{key}_delta'])
+        summary['deltas'][key] = None if math.isnan(delta) else delta
+    return summary
+
+
+# Dimensions of the rollup cube, one per filter parameter
+CUBE_DIMENSIONS = list(FILTER_COLUMNS.values())
+
+
+def cube_cells(df):
+    """
+    Project count and budget sum per cube cell of a projects frame
+
+    Rows with a missing dimension value keep a cell of their own, so the
+    unfiltered totals still count them.
+    """
+    return df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).agg(
+        count=('budget', 'size'),
+        budget=('budget', 'sum'),
+    ).reset_index()
+
+
+class RollupCube:
+    """
+    Project counts and budget sums per (manager, project, status, timeline)
+
+    Built once per data version. The counters and table footer of any filter
+    selection are sums over the matching cells, found through a FilterIndex
+    over the cells, instead of scans over the project rows.
+    """
+
+    def __init__(self, df):
+        self.cells = cube_cells(df)
+        self.index = FilterIndex(self.cells)
+
+    def updated(self, before, after):
+        """
+        Return a copy of the cube with changed and appended rows re-aggregated
+
+        The cells of `before` (old values of updated rows) are subtracted and
+        those of `after` (new values of updated and appended rows) added.
+        """
+        removed = cube_cells(before)
+        removed[['count', 'budget']] *= -1
+        cells = pd.concat(
+            [frame.astype({column: object for column in CUBE_DIMENSIONS}) for frame in (self.cells, removed, cube_cells(after))],
+            ignore_index=True
+        )
+        cells = cells.groupby(CUBE_DIMENSIONS, dropna=False).sum().reset_index()
+
+        cube = copy.copy(self)
+        cube.cells = cells[cells['count'] != 0].reset_index(drop=True)
+        cube.index = FilterIndex(cube.cells)
+        return cube
+
+    def aggregates(self, filter_params):
+        """The dashboard counters (see query.compute_aggregates) of a filter selection"""
+        positions = self.index.filter_positions(filter_params)
+        cells = self.cells if positions is None else self.cells.take(positions)
+
+        counts = cells['count'].to_numpy()
+        status = cells['status'].to_numpy()
+        closed = status == 'Closed'
+        return {
+            'row_count': int(counts.sum()),
+            'donors_count': int(cells['project_name'].nunique()),
+            'ongoing_count': int(counts[status == 'Ongoing'].sum()),
+            'completed_count': int(counts[closed].sum()),
+            'critical_count': int(counts[(cells['status_color'] == CRITICAL_STATUS_COLOR).to_numpy()].sum()),
+            'active_count': int(counts[~closed].sum()),
+            'total_budget': int(cells['budget'].sum()),
+        }
+
@@ -0,0 +1,254 @@
+"""
+Headless JSON / Arrow query API over the dashboard's project data
+
+Serves the same snapshot, filter index and result cache as the Streamlit UI
+(see shared_snapshot.current_snapshot) without rendering any HTML, so tools
+that need filtered project lists do not have to scrape the dashboard.
+
+    python api.py --port 8000          # or: uvicorn api:app --port 8000
+
+GET /projects?manager=&project=&status=&timeline=&search=
+              &sort=&order=asc|desc&page=1&page_size=100&fields=a,b&format=json|arrow
+GET /summary?manager=&project=&status=&timeline=&search=
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import pyarrow as pa
+
+from data import DATE_COLUMNS, load_summary_data
+from filter_index import FILTER_COLUMNS
+from render_attributes import RENDER_COLUMNS
+from query import get_filter_result_cache, query_projects
+from shared_snapshot import current_snapshot
+from timeline import TIMELINE_FLAGS
+from utils import page_bounds, sorted_positions
+
+# Page size limits of the /projects endpoint
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class ApiError(Exception):
+    """A client error, answered with a 400 response"""
+
+
+def query_value(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def query_int(query, name, default, minimum=1, maximum=None):
+    value = query_value(query, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(f"'{name}' must be an integer")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ApiError(f"'{name}' must be between {minimum} and {maximum}" if maximum else f"'{name}' must be at least {minimum}")
+    return number
+
+
+def query_filters(query):
+    """Filter parameters of a request, 'All' for the ones not given, and its search text"""
+    filters = {param: query_value(query, param, 'All') for param in FILTER_COLUMNS}
+    filters['search'] = query_value(query, 'search', '').strip()
+    return filters
+
+
+def filter_options(facets):
+    """Values each filter parameter accepts besides 'All'"""
+    return {
+        'manager': facets.manager_counts(),
+        'project': facets.project_counts('All'),
+        'status': facets.status_counts('All', 'All'),
+        'timeline': TIMELINE_FLAGS,
+    }
+
+
+def validate_filters(filter_params, facets):
+    """Raise an ApiError for a filter value that is not one of the data's options"""
+    for param, options in filter_options(facets).items():
+        value = filter_params[param]
+        if value != 'All' and value not in options:
+            shown = ', '.join(list(options)[:10]) + (', ...' if len(options) > 10 else '')
+            raise ApiError(f"Unknown {param} '{value}' (expected 'All' or one of: {shown})")
+
+
+def public_fields(df):
+    """
+    Fields a client can select, in frame order
+
+    The parsed date columns are exposed under their source names, since the
+    compact schema drops the date strings. The table's render attributes
+    are left out.
+    """
+    parsed = {dt_name: name for name, dt_name in DATE_COLUMNS.items()}
+    return [
+        parsed.get(column, column) for column in df.columns
+        if column not in DATE_COLUMNS and column not in RENDER_COLUMNS
+    ]
+
+
+def select_fields(df, fields):
+    """The requested fields of some project rows, dates as datetime values"""
+    return df[[DATE_COLUMNS.get(field, field) for field in fields]].set_axis(fields, axis=1)
+
+
+def filtered_projects(query):
+    """Resolve the filters of a request against the current snapshot"""
+    snapshot = current_snapshot()
+    filter_params = query_filters(query)
+    validate_filters(filter_params, snapshot.facets)
+    result = query_projects(
+        snapshot.df, filter_params, snapshot.index, snapshot.version, get_filter_result_cache(), snapshot.cube,
+        snapshot.search
+    )
+    return snapshot, filter_params, result
+
+
+def projects_response(query, accept=''):
+    """Body and content type of a /projects request"""
+    snapshot, filter_params, result = filtered_projects(query)
+    df = snapshot.df
+    positions = result.positions
+
+    available = public_fields(snapshot.df)
+    fields = query_value(query, 'fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else available
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(available)})")
+
+    sort_by = query_value(query, 'sort')
+    if sort_by is not None:
+        if sort_by not in available:
+            raise ApiError(f"Cannot sort by '{sort_by}'")
+        order = query_value(query, 'order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise ApiError("'order' must be 'asc' or 'desc'")
+        positions = sorted_positions(df, DATE_COLUMNS.get(sort_by, sort_by), order == 'desc', positions)
+
+    # Only the rows of the requested page are taken
+    total_rows = len(df) if positions is None else len(positions)
+    page_size = query_int(query, 'page_size', DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE)
+    page, page_count, start, stop = page_bounds(total_rows, query_int(query, 'page', 1), page_size)
+    rows = select_fields(df.iloc[start:stop] if positions is None else df.take(positions[start:stop]), fields)
+
+    meta = {
+        'version': snapshot.version,
+        'as_of': snapshot.as_of.isoformat(),
+        'filters': filter_params,
+        'total_rows': total_rows,
+        'page': page,
+        'page_count': page_count,
+        'page_size': page_size,
+    }
+
+    output = query_value(query, 'format') or ('arrow' if ARROW_CONTENT_TYPE in accept else 'json')
+    if output == 'arrow':
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, b'pm_dashboard': json.dumps(meta)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_CONTENT_TYPE
+    if output != 'json':
+        raise ApiError("'format' must be 'json' or 'arrow'")
+
+    records = rows.to_json(orient='records', date_format='iso', date_unit='s')
+    return json_body({**meta, 'aggregates': result.aggregates}, rows=records), JSON_CONTENT_TYPE
+
+
+def summary_response(query, accept=''):
+    """Body and content type of a /summary request"""
+    snapshot, filter_params, result = filtered_projects(query)
+    summary = load_summary_data(snapshot.df, result.positions, snapshot.version, tuple(filter_params.values()))
+    body = {
+        'version': snapshot.version,
+        'as_of': snapshot.as_of.isoformat(),
+        'filters': filter_params,
+        'aggregates': result.aggregates,
+        'summary': summary,
+    }
+    return json_body(body), JSON_CONTENT_TYPE
+
+
+def json_body(body, rows=None):
+    """Encode a response body, splicing in an already encoded 'rows' array"""
+    encoded = json.dumps(body)
+    if rows is not None:
+        encoded = f'{encoded[:-1]}, "rows": {rows}}}'
+    return encoded.encode()
+
+
+# Request handlers by path
+ROUTES = {
+    '/projects': projects_response,
+    '/summary': summary_response,
+}
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] == 'websocket':
+        # Closing before accepting answers the handshake with a 403
+        await receive()
+        await send({'type': 'websocket.close'})
+        return
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+    handler = ROUTES.get(scope['path'].rstrip('/') or '/')
+    if scope['method'] not in ('GET', 'HEAD'):
+        status, body, content_type = 405, json_body({'error': 'Method not allowed'}), JSON_CONTENT_TYPE
+    elif handler is None:
+        status, body, content_type = 404, json_body({'error': f"Unknown endpoint (try: {', '.join(ROUTES)})"}), JSON_CONTENT_TYPE
+    else:
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        accept = dict(scope['headers']).get(b'accept', b'').decode('latin-1')
+        try:
+            # Filtering and encoding are CPU bound; keep the event loop free
+            body, content_type = await asyncio.get_running_loop().run_in_executor(None, handler, query, accept)
+            status = 200
+        except ApiError as exc:
+            status, body, content_type = 400, json_body({'error': str(exc)}), JSON_CONTENT_TYPE
+
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the project data query API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        parser.exit(1, "The query API needs an ASGI server: pip install uvicorn\n")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+"""
+Headless benchmarks for the dashboard data pipeline
+
+Run with `python benchmark.py`; pass `--rows` / `--table-rows` /
+`--pipeline-rows` to choose the dataset sizes and `--json` to save the
+pipeline timings for comparison between runs.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from aggregates import RollupCube, summarize
+from components import build_table_html
+from data import derive_date_columns, memory_report, parse_project_data
+from filter_index import FilterFacets, FilterIndex
+from history import HistoryStore, record_snapshot
+from render_attributes import derive_render_attributes
+from synthetic import generate_portfolio
+from timeline import classify_status_color
+from utils import sorted_positions
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+
+# Rendered row counts for the table benchmark (a page up to a full dump)
+TABLE_ROWS = [25, 250, 2_500, 25_000]
+
+# Portfolio sizes for the pipeline benchmark
+PIPELINE_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+
+# Projects and days of daily snapshots for the history benchmark
+HISTORY_PROJECTS = 100_000
+HISTORY_DAYS = 365
+
+# Fixed reference date, so every run benchmarks the same portfolio
+BENCHMARK_TODAY = date(2026, 1, 1)
+
+
+def make_status_frame(rows, seed=0):
+    """Random status / days remaining columns for timing the classifier"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'status': rng.choice(['Ongoing', 'Closed'], size=rows, p=[0.8, 0.2]),
+        'days_remaining': rng.integers(-200, 400, size=rows),
+    })
+
+
+def make_table_frame(rows, seed=0):
+    """Random project rows with the columns the table renderer reads"""
+    rng = np.random.default_rng(seed)
+    df = make_status_frame(rows, seed)
+    df['project_manager'] = rng.choice(['Abdurrahman Salih', 'Badr Al-Din Triyaki', 'Lina Haddad'], size=rows)
+    df['project_name'] = [f'Project {i}' for i in range(rows)]
+    df['budget'] = rng.integers(10_000, 1_000_000, size=rows)
+    df['remaining_time_pct'] = rng.integers(0, 100, size=rows)
+    df['progress_pct'] = rng.integers(0, 100, size=rows)
+    df['start_date'] = '10/1/2024'
+    df['end_date'] = '5/1/2025'
+    df['start_date_dt'] = pd.Timestamp('2024-10-01')
+    df['end_date_dt'] = pd.Timestamp('2025-05-01')
+    df['status_color'] = classify_status_color(df['status'], df['days_remaining'])
+    return derive_render_attributes(df)
+
+
+def legacy_table_rows(df):
+    """The original per-row table markup, one Streamlit element per row"""
+    rows = []
+    for _, row in df.iterrows():
+        status_html = f'<span class="status-badge {row["status_color"]}" style="display: inline-block; text-align: center;">{row["status"]}</span>'
+
+        time_class = ""
+        if row['status'] == 'Closed':
+            time_html = f'<div class="time-circle" style="background-color: #212121; margin: 0 auto;">0%</div>'
+        else:
+            if row['remaining_time_pct'] < 30:
+                time_class = "time-red"
+            elif row['remaining_time_pct'] < 60:
+                time_class = "time-orange"
+            else:
+                time_class = "time-green"
+            time_html = f'<div class="time-circle {time_class}" style="margin: 0 auto;">{row["remaining_time_pct"]}%</div>'
+
+        initials = row['project_manager'][0].upper()
+        bg_colors = ['#4285F4', '#EA4335', '#FBBC05', '#34A853', '#8523FA', '#20C997', '#9B59B6']
+        color_index = hash(row['project_manager']) % len(bg_colors)
+        bg_color = bg_colors[color_index]
+
+        manager_html = f"""
+        <div class="avatar-container">
+            <div style="background-color: {bg_color}; width: 32px; height: 32px; border-radius: 50%; margin-right: 10px; display: flex; align-items: center; justify-content: center; font-size: 14px; font-weight: 500; color: white; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                {initials}
+            </div>
+            <div style="font-weight: 500;">{row['project_manager']}</div>
+        </div>
+        """
+
+        progress_pct = row['progress_pct']
+        progress_color = "#0A2463"
+        if row['status'] != 'Closed':
+            if row['remaining_time_pct'] < 30 and progress_pct < 70:
+                progress_color = "#FF5252"
+            elif row['remaining_time_pct'] < 60 and progress_pct < 50:
+                progress_color = "#FFA726"
+
+        progress_html = f"""
+        <div style="position: relative; height: 8px; width: 100%; background-color: #eaecef; border-radius: 20px; overflow: hidden;">
+            <div style="width: {progress_pct}%; height: 100%; background-color: {progress_color}; border-radius: 20px;"></div>
+            <div style="position: absolute; right: 0; top: -18px; font-size: 12px; color: #555; font-weight: 500;">{progress_pct}%</div>
+        </div>
+        """
+
+        rows.append(f"""
+        <div class="project-row" style="display: grid; grid-template-columns: 1.5fr 1fr 0.8fr 0.8fr 0.8fr 0.8fr 0.8fr 1.5fr; gap: 10px; align-items: center; padding: 14px 10px; border-bottom: 1px solid #f0f0f0; border-radius: 4px;">
+            <div>{manager_html}</div>
+            <div style="font-weight: 500; color: #0A2463;">{row['project_name']}</div>
+            <div style="text-align: center;">{status_html}</div>
+            <div style="text-align: right; font-weight: 500;">${row['budget']:,}</div>
+            <div style="text-align: center;">{time_html}</div>
+            <div style="color: #555;">{row['start_date']}</div>
+            <div style="color: #555;">{row['end_date']}</div>
+            <div>{progress_html}</div>
+        </div>
+        """)
+    return rows
+
+
+def legacy_status_color(df):
+    """The original row-wise status color classification"""
+    def determine_status_color(row):
+        if row['status'] == 'Closed':
+            return 'closed'
+        elif row['days_remaining'] < 60:
+            return 'ongoing-red'
+        elif row['days_remaining'] < 120:
+            return 'ongoing-orange'
+        else:
+            return 'ongoing-green'
+
+    return df.apply(determine_status_color, axis=1)
+
+
+def timed(func, *args, repeat=1):
+    """Best wall time of `repeat` calls, in seconds, and the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_status_color(rows_list):
+    """Compare the row-wise apply with the vectorized classifier"""
+    print("Status color classification")
+    print(f"{'rows':>10} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for rows in rows_list:
+        df = make_status_frame(rows)
+        legacy_time, legacy = timed(legacy_status_color, df)
+        fast_time, fast = timed(classify_status_color, df['status'], df['days_remaining'], repeat=3)
+        assert (legacy.to_numpy() == fast.astype(str).to_numpy()).all()
+        print(f"{rows:>10,} {legacy_time:>12.4f} {fast_time:>15.4f} {legacy_time / fast_time:>8.0f}x")
+
+
+def bench_table_html(rows_list):
+    """Compare the per-row table markup with the batched renderer"""
+    print("Project table HTML")
+    print(f"{'rows':>10} {'elements':>9} {'legacy KB':>10} {'batched KB':>11} {'legacy (s)':>11} {'batched (s)':>12}")
+    for rows in rows_list:
+        df = make_table_frame(rows)
+        legacy_time, legacy = timed(legacy_table_rows, df)
+        batched_time, batched = timed(build_table_html, df, rows, repeat=3)
+        legacy_kb = sum(len(row.encode()) for row in legacy) / 1024
+        batched_kb = len(batched.encode()) / 1024
+        print(f"{rows:>10,} {len(legacy):>4} -> 1 {legacy_kb:>10,.0f} {batched_kb:>11,.0f} {legacy_time:>11.4f} {batched_time:>12.4f}")
+
+
+def bench_memory(rows):
+    """Bytes per row of the loaded projects frame, default vs compact schema"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'projects.parquet')
+        pq.write_table(generate_portfolio(rows, today=BENCHMARK_TODAY), path)
+        frames = {
+            'default': derive_date_columns(parse_project_data(path), 'benchmark', BENCHMARK_TODAY),
+            'compact': derive_date_columns(parse_project_data(path, True), 'benchmark', BENCHMARK_TODAY, True),
+        }
+    report = memory_report(frames)
+    report['saving'] = 1 - report['compact'] / report['default']
+    print(f"Projects frame memory at {rows:,} rows (bytes per row)")
+    print(report.to_string(float_format=lambda value: f"{value:,.2f}", na_rep='-'))
+
+
+def pipeline_stages(path, today=BENCHMARK_TODAY):
+    """
+    The dashboard pipeline on one source file, as (stage, function) pairs
+
+    Each function takes the results of the previous stages (a dict) and
+    returns its own. The filter selection is the busiest manager's ongoing
+    projects, and the table is the first page sorted by budget.
+    """
+    def load(state):
+        return parse_project_data(path)
+
+    def derive(state):
+        return derive_date_columns(state['load'], 'benchmark', today)
+
+    def index(state):
+        df = state['derive']
+        return FilterIndex(df), FilterFacets(df), RollupCube(df)
+
+    def filter(state):
+        df = state['derive']
+        manager = df['project_manager'].value_counts().index[0]
+        selection = {'manager': manager, 'project': 'All', 'status': 'Ongoing', 'timeline': 'All'}
+        return selection, state['index'][0].filter_positions(selection)
+
+    def aggregate(state):
+        selection, positions = state['filter']
+        return summarize(state['derive'].take(positions), today), state['index'][2].aggregates(selection)
+
+    def table_html(state):
+        _, positions = state['filter']
+        order = sorted_positions(state['derive'], 'budget', True, positions)
+        return build_table_html(state['derive'].take(order[:25]), len(positions))
+
+    return [
+        ('load', load),
+        ('derive', derive),
+        ('index', index),
+        ('filter', filter),
+        ('aggregate', aggregate),
+        ('table_html', table_html),
+    ]
+
+
+def run_pipeline(path, trace_memory=False):
+    """Run the pipeline stages once; returns {stage: seconds or peak bytes}"""
+    state, results = {}, {}
+    for stage, func in pipeline_stages(path):
+        if trace_memory:
+            tracemalloc.start()
+            state[stage] = func(state)
+            results[stage] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            state[stage] = func(state)
+            results[stage] = time.perf_counter() - start
+    return results
+
+
+def bench_pipeline(rows_list, repeat=3):
+    """
+    Time each pipeline stage on synthetic portfolios and trace its memory peak
+
+    Times are the best of `repeat` runs (a single run past 100,000 rows).
+    Peaks are traced in a separate run (tracing slows Python code down) and
+    cover allocations made through Python and NumPy; Arrow's own buffers
+    are not included.
+    """
+    print("Pipeline stages (best time in ms / traced memory peak in MB)")
+    stages = [stage for stage, _ in pipeline_stages(None)]
+    print(f"{'rows':>10} " + ' '.join(f"{stage:>17}" for stage in stages))
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in rows_list:
+            path = os.path.join(tmp, f'portfolio-{rows}.parquet')
+            pq.write_table(generate_portfolio(rows, today=BENCHMARK_TODAY), path)
+
+            runs = [run_pipeline(path) for _ in range(repeat if rows <= 100_000 else 1)]
+            times = {stage: min(run[stage] for run in runs) for stage in stages}
+            peaks = run_pipeline(path, trace_memory=True)
+            report[rows] = {stage: {'seconds': times[stage], 'peak_bytes': peaks[stage]} for stage in stages}
+
+            cells = [f"{times[stage] * 1000:>8.1f} / {peaks[stage] / 2**20:>6.1f}" for stage in stages]
+            print(f"{rows:>10,} " + ' '.join(cells))
+    return report
+
+
+def write_history(directory, projects, days, seed=0):
+    """
+    Record `days` daily snapshots of a synthetic portfolio
+
+    Progress rises towards the last day.
+    """
+    rng = np.random.default_rng(seed)
+    df = generate_portfolio(projects, today=BENCHMARK_TODAY, seed=seed).to_pandas()
+    progress = df['progress_pct'].to_numpy()
+    remaining = df['remaining_time_pct'].to_numpy()
+    rate = rng.uniform(0, 0.5, size=projects)
+    for offset in range(days - 1, -1, -1):
+        day = BENCHMARK_TODAY - timedelta(days=offset)
+        df['progress_pct'] = np.clip(progress - rate * offset, 0, 100).round().astype('int64')
+        df['remaining_time_pct'] = np.clip(remaining + offset * 100 // 365, 0, 100)
+        record_snapshot(directory, df, day)
+
+
+def bench_history(projects, days):
+    """Time loading a year of daily snapshots and the trend queries over it"""
+    print(f"Progress history of {projects:,} projects over {days} days (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        write_history(tmp, projects, days)
+        write_time = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp) for name in names)
+
+        store = HistoryStore(tmp)
+        load_time, history = timed(lambda: store.history)
+        page = history.names[:25]
+        results = {
+            'write (all days)': write_time,
+            'load (all days)': load_time,
+            'trends, all projects': timed(history.trends, repeat=3)[0],
+            'trends, one page': timed(history.trends, page, repeat=3)[0],
+            'sparklines, one page': timed(history.series, page, repeat=3)[0],
+        }
+    print(f"{'store size':>22} {size / 2**20:>10.1f} MB")
+    for name, seconds in results.items():
+        print(f"{name:>22} {seconds * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--table-rows', type=int, nargs='+', default=TABLE_ROWS)
+    parser.add_argument('--memory-rows', type=int, default=100_000)
+    parser.add_argument('--pipeline-rows', type=int, nargs='+', default=PIPELINE_ROWS)
+    parser.add_argument('--history-projects', type=int, default=HISTORY_PROJECTS)
+    parser.add_argument('--history-days', type=int, default=HISTORY_DAYS)
+    parser.add_argument('--json', help="write the pipeline results to this file")
+    args = parser.parse_args()
+
+    bench_status_color(args.rows)
+    print()
+    bench_table_html(args.table_rows)
+    print()
+    bench_memory(args.memory_rows)
+    print()
+    bench_history(args.history_projects, args.history_days)
+    print()
+    report = bench_pipeline(args.pipeline_rows)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'pipeline': report}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data import DATE_COLUMNS, DATE_FORMATS, ENTERED_REMAINING_COLUMN, SCHEDULE_COLUMNS, derive_date_columns, parse_dates
+from render_attributes import RENDER_COLUMNS
+from sources import OPTIONAL_COLUMNS, PROJECT_COLUMNS, PROJECT_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Environment variable pointing at the project change log (JSON lines)
+CHANGES_PATH_ENV = 'PM_DASHBOARD_CHANGES'
+
+# Column identifying the project a change event applies to (the column the
+# FilterIndex 'project' parameter is built on, used to find its rows)
+CHANGE_KEY = 'project_name'
+
+# Columns a change event may set
+CHANGE_COLUMNS = PROJECT_COLUMNS + list(OPTIONAL_COLUMNS)
+
+# Columns derived from the others, recomputed for changed rows
+DERIVED_COLUMNS = ['days_remaining', 'status_color'] + SCHEDULE_COLUMNS + RENDER_COLUMNS
+
+
+def configured_change_log():
+    """Return the change log configured through the environment, if any"""
+    return os.environ.get(CHANGES_PATH_ENV) or None
+
+
+class ChangeLog:
+    """
+    Reader of an append-only JSON lines log of project change events
+
+    Each line is an object with the CHANGE_KEY of the project and the fields
+    that changed, e.g. {"project_name": "WFP", "progress_pct": 85}. The
+    reader remembers how far it got and only returns complete lines appended
+    since. A log shorter than that offset is taken to have been truncated
+    and is read again from the start. The offset only moves past the events
+    of a read once they are applied (see commit), so a batch that fails to
+    apply is read again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.read_offset = 0
+
+    def reset(self):
+        """Read the log from the start again (e.g. after the base data reloads)"""
+        self.offset = 0
+        self.read_offset = 0
+
+    def commit(self):
+        """Mark the events returned by the last read_new as applied"""
+        self.offset = self.read_offset
+
+    def read_new(self):
+        """
+        Return the valid change events appended since the last commit
+
+        Malformed lines and events whose values do not convert to their
+        column types (see convert_event) are logged and skipped.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+        self.read_offset = self.offset
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as log:
+            log.seek(self.offset)
+            data = log.read(size - self.offset)
+
+        # Leave a partially written last line for the next read
+        complete = data[:data.rfind(b'\n') + 1]
+        events = []
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed change event in %s: %r", self.path, line[:200])
+                continue
+            if not isinstance(event, dict) or event.get(CHANGE_KEY) is None:
+                logger.warning("Skipping change event without '%s' in %s", CHANGE_KEY, self.path)
+                continue
+            try:
+                event = convert_event(event)
+            except (ValueError, TypeError) as exc:
+                logger.warning("Skipping invalid change event in %s (%s): %r", self.path, exc, line[:200])
+                continue
+            events.append(event)
+
+        self.read_offset = self.offset + len(complete)
+        return events
+
+
+def convert_event(event):
+    """
+    Return a change event with its values converted to their column types
+
+    Numbers must be whole and dates match one of DATE_FORMATS (they are
+    rewritten in the first, so a batch of events parses as one column).
+    Raises a ValueError or TypeError otherwise. Missing values and unknown
+    fields are passed through.
+    """
+    converted = {}
+    for name, value in event.items():
+        column_type = PROJECT_TYPES.get(name)
+        if value is None or column_type is None:
+            converted[name] = value
+        elif name in DATE_COLUMNS:
+            converted[name] = parse_dates(pd.Series([value], name=name)).dt.strftime(DATE_FORMATS[0]).iloc[0]
+        elif pa.types.is_integer(column_type):
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError(f"'{name}' must be a whole number, got {value!r}")
+            converted[name] = int(number)
+        else:
+            converted[name] = str(value)
+    return converted
+
+
+def collapse_events(events):
+    """
+    Merge change events into one row of updates per project
+
+    Later events win field by field; unknown fields are ignored.
+    """
+    updates = pd.DataFrame(events)
+    unknown = [name for name in updates.columns if name not in CHANGE_COLUMNS]
+    if unknown:
+        logger.warning("Ignoring unknown change event fields: %s", ', '.join(unknown))
+    updates = updates[[name for name in updates.columns if name in CHANGE_COLUMNS]]
+    return updates.groupby(CHANGE_KEY, sort=False).last()
+
+
+def assign_rows(df, column, positions, values):
+    """Set the values of one column at the given row positions, keeping its dtype"""
+    series = df[column]
+    values = pd.Series(values, index=positions)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        missing = pd.Index(values.unique()).difference(series.cat.categories)
+        if len(missing):
+            series = series.cat.add_categories(missing)
+    else:
+        values = values.astype(series.dtype)
+    series = series.copy()
+    series.iloc[positions] = values.to_numpy()
+    df[column] = series
+
+
+def as_column_dtype(df, column, values):
+    """Cast new values to the dtype of a column, adding categories the column lacks to it"""
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        missing = pd.Index(pd.unique(np.asarray(values))).difference(df[column].cat.categories)
+        if len(missing):
+            df[column] = df[column].cat.add_categories(missing)
+    return values.astype(df[column].dtype)
+
+
+def build_new_rows(df, updates):
+    """Project rows for change events of projects that are not loaded yet"""
+    rows = updates.reset_index()
+    missing = [name for name in PROJECT_COLUMNS if name not in rows.columns or rows[name].isna().any()]
+    if missing:
+        logger.warning(
+            "Skipping %d new projects with incomplete change events (missing %s)",
+            len(rows), ', '.join(missing)
+        )
+        return None
+
+    for name, fill in OPTIONAL_COLUMNS.items():
+        fallback = rows[fill] if fill in rows.columns else fill
+        rows[name] = rows[name].fillna(fallback) if name in rows.columns else fallback
+    for name, dt_name in DATE_COLUMNS.items():
+        rows[dt_name] = parse_dates(rows[name])
+
+    new_rows = pd.DataFrame(index=pd.RangeIndex(len(df), len(df) + len(rows)))
+    for column in df.columns:
+        if column not in rows.columns:
+            continue
+        new_rows[column] = as_column_dtype(df, column, pd.Series(rows[column].to_numpy(), index=new_rows.index))
+    return new_rows
+
+
+def apply_changes(df, events, index, today, compact=False):
+    """
+    Upsert change events into a derived projects frame
+
+    Rows are matched on CHANGE_KEY through the FilterIndex of `df`; events
+    for unknown projects are appended when they carry every PROJECT_COLUMN.
+    Only the affected rows have their dates parsed and their derived columns
+    recomputed. Returns (new frame, before, after) where `before` holds the
+    old values of updated rows and `after` the new values of updated and
+    appended rows, both indexed by row position, for the incremental index
+    and aggregate updates. `df` itself is not modified.
+    """
+    updates = collapse_events(events)
+    known = [key for key in updates.index if len(index.lookup('project', key))]
+    unknown = [key for key in updates.index if not len(index.lookup('project', key))]
+
+    # Existing rows: every row of an updated project gets the new values
+    key_positions = [index.lookup('project', key) for key in known]
+    positions = np.concatenate(key_positions) if key_positions else np.empty(0, dtype=np.intp)
+    keys = np.repeat(np.asarray(known, dtype=object), [len(rows) for rows in key_positions])
+    before = df.iloc[positions]
+
+    df = df.copy(deep=False)
+    for column in updates.columns:
+        values = updates[column].reindex(keys)
+        present = values.notna().to_numpy()
+        if not present.any():
+            continue
+        if column in DATE_COLUMNS:
+            assign_rows(df, DATE_COLUMNS[column], positions[present], parse_dates(values[present]).to_numpy())
+        if column == 'remaining_time_pct':
+            # The schedule is derived again from the entered value below
+            column = ENTERED_REMAINING_COLUMN
+        if column in df.columns:
+            assign_rows(df, column, positions[present], values[present].to_numpy())
+
+    # Recompute the derived columns of the updated rows only
+    if len(positions):
+        derived = derive_date_columns(df.iloc[positions], '', today, compact)
+        for column in DERIVED_COLUMNS:
+            assign_rows(df, column, positions, derived[column].to_numpy())
+
+    # New projects are appended at the end so existing positions stay valid
+    appended = np.empty(0, dtype=np.intp)
+    new_rows = build_new_rows(df, updates.loc[unknown]) if unknown else None
+    if new_rows is not None:
+        new_rows = derive_date_columns(new_rows, '', today, compact)
+        for column in DERIVED_COLUMNS + [ENTERED_REMAINING_COLUMN]:
+            new_rows[column] = as_column_dtype(df, column, new_rows[column])
+        appended = new_rows.index.to_numpy(dtype=np.intp)
+        attrs = df.attrs
+        df = pd.concat([df, new_rows], ignore_index=True)
+        df.attrs = attrs
+
+    after = df.iloc[np.concatenate([positions, appended])]
+    return df, before, after
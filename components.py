@@ -1,11 +1,192 @@
+import html
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
 
-def display_sidebar_filters(df):
-    """Display sidebar filters and return the selected filter values"""
-    
-    # Sidebar header with logo and title
+from export import EXPORT_FORMATS, available_export_formats, export_projects
+from filter_index import FilterFacets
+from history import TREND_WINDOW_DAYS
+from query import compute_aggregates
+from search_index import search_text
+from timeline import TIMELINE_THRESHOLDS
+from utils import format_dates, format_percents, page_bounds, sorted_positions
+
+# Rows per page offered for the projects table
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+# Sortable projects table columns and their labels
+TABLE_SORT_COLUMNS = {
+    'project_manager': 'Project Manager',
+    'project_name': 'Project Name',
+    'status': 'Status',
+    'budget': 'Budget',
+    'remaining_time_pct': 'Remaining Time',
+    'start_date_dt': 'Start Date',
+    'end_date_dt': 'End Date',
+    'progress_pct': 'Progress',
+}
+
+# Sort option keeping search results in their order, best match first
+RELEVANCE_SORT = 'relevance'
+
+# Projects table markup; layout and styling come from the CSS in app.py
+TABLE_HEADER_HTML = (
+    '<div class="column-headers">'
+    '<div>Project Manager</div>'
+    '<div>Project Name</div>'
+    '<div class="cell-center">Status</div>'
+    '<div class="cell-right">Budget</div>'
+    '<div class="cell-center">Remaining Time</div>'
+    '<div>Start Date</div>'
+    '<div>End Date</div>'
+    '<div>Progress</div>'
+    '{}'
+    '</div>'
+)
+
+# Extra column shown when a progress history is recorded (see history.py)
+TABLE_TREND_HEADER_HTML = '<div>Trend</div>'
+TABLE_TREND_CELL_HTML = '<div class="trend-cell" title="{}">{}</div>'
+
+# Sparkline size in pixels; the vertical axis always spans 0-100% progress
+SPARKLINE_WIDTH = 90
+SPARKLINE_HEIGHT = 24
+
+TABLE_EMPTY_HTML = (
+    '<div class="table-empty">'
+    '<div class="table-empty-icon">📊</div>'
+    '<div class="table-empty-title">No projects found</div>'
+    '<div>Try adjusting your filter criteria</div>'
+    '</div>'
+)
+
+# Dollar signs are written as &#36; so Markdown does not pair them up as math
+TABLE_ROW_HTML = (
+    '<div class="project-row">'
+    '<div class="avatar-container"><div class="avatar-img avatar-{}">{}</div><div class="manager-name">{}</div></div>'
+    '<div class="project-name-cell">{}</div>'
+    '<div class="cell-center"><span class="status-badge {}">{}</span></div>'
+    '<div class="budget-cell">&#36;{:,}</div>'
+    '<div class="cell-center"><div class="time-circle {}">{}</div></div>'
+    '<div class="date-cell">{}</div>'
+    '<div class="date-cell">{}</div>'
+    '<div class="progress-track"><div class="progress-fill {}" style="width: {}%;"></div><div class="progress-text">{}</div></div>'
+    '{}'
+    '</div>'
+)
+
+def build_sparkline_html(values, slipping=False):
+    """Inline SVG polyline of daily progress values (NaN days are skipped)"""
+    x = np.linspace(0, SPARKLINE_WIDTH, len(values)) if len(values) > 1 else np.zeros(len(values))
+    y = SPARKLINE_HEIGHT - np.asarray(values) / 100 * SPARKLINE_HEIGHT
+    recorded = ~np.isnan(y)
+    points = " ".join(f"{px:.1f},{py:.1f}" for px, py in zip(x[recorded], y[recorded]))
+    return (
+        f'<svg class="sparkline{" sparkline-slipping" if slipping else ""}" width="{SPARKLINE_WIDTH}" height="{SPARKLINE_HEIGHT}" '
+        f'viewBox="0 0 {SPARKLINE_WIDTH} {SPARKLINE_HEIGHT}"><polyline points="{points}"/></svg>'
+    )
+
+def build_trend_cells_html(series, trends, window_days):
+    """
+    Build the trend cell of each row from a ProgressHistory window
+    
+    `series` holds the daily progress of the rows (see ProgressHistory.series)
+    and `trends` their trend figures; slipping projects get a red line.
+    """
+    cells = []
+    for values, change, slippage, slippage_change in zip(
+        series, trends['progress_change'], trends['slippage_pct'], trends['slippage_change']
+    ):
+        if np.isnan(change):
+            cells.append(TABLE_TREND_CELL_HTML.format("No history", ""))
+            continue
+        title = f"{change:+.0f} pts in {window_days} days"
+        if not np.isnan(slippage):
+            title += f", {abs(slippage):.0f} pts {'behind' if slippage > 0 else 'ahead of'} schedule"
+        cells.append(TABLE_TREND_CELL_HTML.format(title, build_sparkline_html(values, slippage_change > 0)))
+    return cells
+
+def build_table_rows_html(df, trend_cells=None):
+    """
+    Build the HTML for the given project rows in a single pass
+    
+    Row classes, initials and avatar colors are the precomputed render
+    attributes of the frame (see render_attributes.py), so every row is
+    formatted from the column arrays with one template. `trend_cells` adds
+    the prebuilt trend cell of each row.
+    """
+    if len(df) == 0:
+        return ""
+    if trend_cells is None:
+        trend_cells = [""] * len(df)
+    
+    # Names are escaped once per distinct value
+    managers = df['project_manager'].astype(str)
+    manager_names = {name: html.escape(name) for name in managers.unique()}
+    project_names = {name: html.escape(name) for name in df['project_name'].astype(str).unique()}
+    
+    return "".join([
+        TABLE_ROW_HTML.format(
+            avatar_color, initials, manager_names[manager],
+            project_names[project],
+            status_color, status,
+            budget,
+            time_cls, time_pct,
+            start_date, end_date,
+            progress_cls, progress_width, progress_pct,
+            trend_cell
+        )
+        for avatar_color, initials, manager, project, status_color, status, budget, time_cls, time_pct, start_date, end_date, progress_cls, progress_width, progress_pct, trend_cell in zip(
+            df['avatar_color'].tolist(),
+            df['manager_initials'].tolist(),
+            managers.tolist(),
+            df['project_name'].astype(str).tolist(),
+            df['status_color'].astype(str).tolist(),
+            df['status'].tolist(),
+            df['budget'].tolist(),
+            df['time_class'].astype(str).tolist(),
+            format_percents(df['remaining_time_pct']),
+            format_dates(df['start_date_dt']),
+            format_dates(df['end_date_dt']),
+            df['progress_class'].astype(str).tolist(),
+            df['progress_pct'].fillna(0).tolist(),
+            format_percents(df['progress_pct']),
+            trend_cells,
+        )
+    ])
+
+def build_table_html(page_df, total_rows, trend_cells=None):
+    """Build the complete projects table markup for one page of rows (with a trend column if given)"""
+    body = build_table_rows_html(page_df, trend_cells) if len(page_df) > 0 else TABLE_EMPTY_HTML
+    header = TABLE_HEADER_HTML.format(TABLE_TREND_HEADER_HTML if trend_cells is not None else "")
+    table_class = "projects-table with-trend" if trend_cells is not None else "projects-table"
+    return (
+        f'<div class="{table_class}">'
+        '<div class="table-header">'
+        f'<div class="projects-overview-title">Projects List ({total_rows} items)</div>'
+        '</div>'
+        f'{header}{body}'
+        '</div>'
+    )
+
+def as_of_label(data_as_of):
+    """'Data as of' line for a snapshot timestamp (empty when unknown)"""
+    if data_as_of is None:
+        return ""
+    return f"Data as of {data_as_of:%b %d, %Y %H:%M}"
+
+def facet_label(counts):
+    """Selectbox label formatter showing each option's project count"""
+    def format_option(option):
+        if option == 'All':
+            return option
+        return f"{option} ({counts.get(option, 0)})"
+    return format_option
+
+def display_sidebar_header():
+    """Display the static logo and title at the top of the sidebar"""
     st.sidebar.markdown("""
     <div style="text-align: center; padding: 1rem 0;">
         <div style="font-size: 2.2rem; margin-bottom: 0.5rem; color: white;">📊</div>
@@ -14,10 +195,32 @@ def display_sidebar_filters(df):
         <div style="font-size: 0.8rem; color: rgba(255,255,255,0.7); margin-bottom: 1rem;">Dashboard & Reporting Tool</div>
     </div>
     """, unsafe_allow_html=True)
+
+def clear_filters():
+    """Reset every sidebar filter to 'All' and clear the search (a button callback, run before the rerun)"""
+    st.session_state.search_query = ''
+    st.session_state.manager_filter = 'All'
+    st.session_state.project_filter = 'All'
+    st.session_state.status_filter = 'All'
+    st.session_state.timeline_filter = 'All'
+
+def display_sidebar_filters(df, facets=None, data_as_of=None):
+    """
+    Display sidebar filters and return the selected filter values
+    
+    Option lists cascade from manager to project to status and come from the
+    FilterFacets of the data (pass the snapshot's, built once per version).
+    The search text is returned under 'search' and matched through the
+    snapshot's SearchIndex. `data_as_of` is the timestamp of the data shown
+    in the footer.
+    """
+    if facets is None:
+        facets = FilterFacets(df)
     
     # Initialize session state for filters if they don't exist
     if 'filters_initialized' not in st.session_state:
         st.session_state.filters_initialized = True
+        st.session_state.search_query = ''
         st.session_state.manager_filter = 'All'
         st.session_state.project_filter = 'All'  
         st.session_state.status_filter = 'All'
@@ -32,6 +235,14 @@ def display_sidebar_filters(df):
     </div>
     """, unsafe_allow_html=True)
     
+    # Free-text search over project, manager and donor names
+    search_query = st.sidebar.text_input(
+        "Search projects",
+        key='search_query',
+        placeholder="Project, manager or donor",
+        label_visibility='collapsed'
+    ).strip()
+    
     # Project manager filter with icon
     st.sidebar.markdown("""
     <div style="display: flex; align-items: center; margin-bottom: 0.3rem;">
@@ -40,19 +251,15 @@ def display_sidebar_filters(df):
     </div>
     """, unsafe_allow_html=True)
     
-    all_managers = ['All'] + sorted(df['project_manager'].unique().tolist())
+    manager_counts = facets.manager_counts()
     manager_filter = st.sidebar.selectbox(
         "Select project manager", 
-        options=all_managers, 
+        options=['All'] + list(manager_counts), 
+        format_func=facet_label(manager_counts),
         key='manager_filter',
         label_visibility='collapsed'
     )
     
-    # Apply manager filter to dataframe for cascading filters
-    filtered_df = df.copy()
-    if manager_filter != 'All':
-        filtered_df = filtered_df[filtered_df['project_manager'] == manager_filter]
-    
     # Project name filter with icon
     st.sidebar.markdown("""
     <div style="display: flex; align-items: center; margin: 1rem 0 0.3rem 0;">
@@ -61,18 +268,16 @@ def display_sidebar_filters(df):
     </div>
     """, unsafe_allow_html=True)
     
-    all_projects = ['All'] + sorted(filtered_df['project_name'].unique().tolist())
+    # Projects cascade from the selected manager
+    project_counts = facets.project_counts(manager_filter)
     project_filter = st.sidebar.selectbox(
         "Select project", 
-        options=all_projects, 
+        options=['All'] + list(project_counts), 
+        format_func=facet_label(project_counts),
         key='project_filter',
         label_visibility='collapsed'
     )
     
-    # Apply project filter for cascading filters
-    if project_filter != 'All':
-        filtered_df = filtered_df[filtered_df['project_name'] == project_filter]
-    
     # Status filter with icon
     st.sidebar.markdown("""
     <div style="display: flex; align-items: center; margin: 1rem 0 0.3rem 0;">
@@ -81,10 +286,12 @@ def display_sidebar_filters(df):
     </div>
     """, unsafe_allow_html=True)
     
-    all_statuses = ['All'] + sorted(filtered_df['status'].unique().tolist())
+    # Statuses cascade from the selected manager and project
+    status_counts = facets.status_counts(manager_filter, project_filter)
     status_filter = st.sidebar.selectbox(
         "Select status", 
-        options=all_statuses, 
+        options=['All'] + list(status_counts), 
+        format_func=facet_label(status_counts),
         key='status_filter',
         label_visibility='collapsed'
     )
@@ -106,15 +313,12 @@ def display_sidebar_filters(df):
     
     # Clear filters button with improved styling
     st.sidebar.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
-    if st.sidebar.button("Clear All Filters", use_container_width=True):
-        st.session_state.manager_filter = 'All'
-        st.session_state.project_filter = 'All'  
-        st.session_state.status_filter = 'All'
-        st.session_state.timeline_filter = 'All'
-        st.rerun()
+    st.sidebar.button("Clear All Filters", on_click=clear_filters, use_container_width=True)
     
     # Show active filters
     active_filters = []
+    if search_text(search_query):
+        active_filters.append(f"Search: {html.escape(search_query)}")
     if manager_filter != 'All':
         active_filters.append(f"Manager: {manager_filter}")
     if project_filter != 'All':
@@ -141,10 +345,10 @@ def display_sidebar_filters(df):
     
     # Add footer information
     st.sidebar.markdown("<hr style='margin: 2rem 0 1rem 0; opacity: 0.2;'>", unsafe_allow_html=True)
-    st.sidebar.markdown("""
+    st.sidebar.markdown(f"""
     <div style="text-align: center; color: rgba(255,255,255,0.5); font-size: 0.8rem;">
         <div>Project Tracker v1.0</div>
-        <div style="margin-top: 0.2rem;">Last updated: Mar 21, 2025</div>
+        <div style="margin-top: 0.2rem;">{as_of_label(data_as_of)}</div>
     </div>
     """, unsafe_allow_html=True)
     
@@ -152,11 +356,17 @@ def display_sidebar_filters(df):
         'manager': manager_filter,
         'project': project_filter,
         'status': status_filter,
-        'timeline': timeline_filter
+        'timeline': timeline_filter,
+        'search': search_query
     }
 
-def display_project_counts(df=None):
-    """Display donors and ongoing projects counts based on filtered data"""
+def display_project_counts(df=None, aggregates=None):
+    """
+    Display donors and ongoing projects counts based on filtered data
+    
+    `aggregates` are the precomputed counters of the filtered set (see
+    query.compute_aggregates); they are computed from `df` when not given.
+    """
     
     # If no dataframe is provided, use the default counts
     donors_count = 4
@@ -165,15 +375,13 @@ def display_project_counts(df=None):
     critical_count = 1
     
     # If a dataframe is provided, count the actual number of donors and ongoing projects
-    if df is not None:
-        # Count unique project names as donors
-        donors_count = df['project_name'].nunique()
-        # Count ongoing projects
-        ongoing_count = len(df[df['status'] == 'Ongoing'])
-        # Count completed projects
-        completed_count = len(df[df['status'] == 'Closed'])
-        # Count critical projects (less than 60 days remaining and status is not Closed)
-        critical_count = len(df[(df['status'] != 'Closed') & (df['days_remaining'] < 60)])
+    if aggregates is None and df is not None:
+        aggregates = compute_aggregates(df)
+    if aggregates is not None:
+        donors_count = aggregates['donors_count']
+        ongoing_count = aggregates['ongoing_count']
+        completed_count = aggregates['completed_count']
+        critical_count = aggregates['critical_count']
     
     # Add section header
     st.markdown("""
@@ -218,18 +426,28 @@ def display_project_counts(df=None):
             <div style="font-size: 2rem; color: #FF5252; margin-bottom: 5px;">⚠️</div>
             <div class="count-value">{critical_count}</div>
             <div class="count-label">Critical Timeline</div>
-            <div style="font-size: 0.75rem; color: #888; margin-top: 5px;">Less than 60 days</div>
+            <div style="font-size: 0.75rem; color: #888; margin-top: 5px;">Less than {TIMELINE_THRESHOLDS[0]} days</div>
         </div>
         """, unsafe_allow_html=True)
 
-def display_summary_cards(summary_data):
+def delta_html(delta):
+    """Year-over-year change line of a summary card"""
+    if delta is None:
+        return '<div style="height: 20px;"></div>'
+    arrow, color = ("↑", "#66BB6A") if delta >= 0 else ("↓", "#FF5252")
+    return f"""<div style="font-size: 0.8rem; color: {color}; margin-top: 5px; display: flex; align-items: center; justify-content: center;">
+                <span style="margin-right: 3px;">{arrow}</span> {abs(delta):.0f}% from last year
+            </div>"""
+
+def display_summary_cards(summary_data, data_as_of=None):
     """Display summary cards with key metrics"""
+    deltas = summary_data['deltas']
     
     # Section header
-    st.markdown("""
+    st.markdown(f"""
     <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
         <h3 style="margin: 0; color: #0A2463; font-size: 1.2rem;">Key Performance Indicators</h3>
-        <div style="font-size: 0.9rem; color: #666;">Last updated: Mar 21, 2025</div>
+        <div style="font-size: 0.9rem; color: #666;">{as_of_label(data_as_of)}</div>
     </div>
     """, unsafe_allow_html=True)
     
@@ -242,9 +460,7 @@ def display_summary_cards(summary_data):
             <div class="metric-icon">💰</div>
             <div class="metric-value">${summary_data['total_budget']/1000000:.2f}M</div>
             <div class="metric-label">Total Budget</div>
-            <div style="font-size: 0.8rem; color: #66BB6A; margin-top: 5px; display: flex; align-items: center; justify-content: center;">
-                <span style="margin-right: 3px;">↑</span> 12% from last year
-            </div>
+            {delta_html(deltas['total_budget'])}
         </div>
         """, unsafe_allow_html=True)
     
@@ -253,7 +469,7 @@ def display_summary_cards(summary_data):
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">📊</div>
-            <div class="metric-value">{summary_data['projects_count']}</div>
+            <div class="metric-value">{summary_data['projects_count']:,}</div>
             <div class="metric-label">Total Projects</div>
             <div style="height: 20px;"></div>
         </div>
@@ -264,11 +480,9 @@ def display_summary_cards(summary_data):
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">🏡</div>
-            <div class="metric-value">{summary_data['households_reached']}</div>
+            <div class="metric-value">{summary_data['households_reached']:,}</div>
             <div class="metric-label">Households Reached</div>
-            <div style="font-size: 0.8rem; color: #66BB6A; margin-top: 5px; display: flex; align-items: center; justify-content: center;">
-                <span style="margin-right: 3px;">↑</span> 8% increase
-            </div>
+            {delta_html(deltas['households_reached'])}
         </div>
         """, unsafe_allow_html=True)
     
@@ -277,142 +491,133 @@ def display_summary_cards(summary_data):
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">👨‍👩‍👧‍👦</div>
-            <div class="metric-value">{summary_data['individuals_reached']}</div>
+            <div class="metric-value">{summary_data['individuals_reached']:,}</div>
             <div class="metric-label">Individuals Reached</div>
-            <div style="font-size: 0.8rem; color: #66BB6A; margin-top: 5px; display: flex; align-items: center; justify-content: center;">
-                <span style="margin-right: 3px;">↑</span> 15% increase
-            </div>
+            {delta_html(deltas['individuals_reached'])}
         </div>
         """, unsafe_allow_html=True)
 
-def display_project_table(df):
-    """Display the projects table with all details"""
+def display_project_table(df, positions=None, aggregates=None, history=None, ranked=False):
+    """
+    Display one page of the projects table with all details
+    
+    `positions` are the row positions of the filtered set in `df` (None for
+    all rows). Sorting and paging happen server-side on positions, so only
+    the visible rows are taken and rendered; the item count and budget footer cover the whole filtered set
+    and come from `aggregates` when they are precomputed. With a
+    ProgressHistory the rows get a sparkline of their recent progress.
+    When `ranked` (the rows are search matches, best first) the table
+    switches to a Relevance sort that keeps that order.
+    """
+    
+    # Initialize session state for table controls if they don't exist
+    if 'table_initialized' not in st.session_state:
+        st.session_state.table_initialized = True
+        st.session_state.table_sort_by = 'project_manager'
+        st.session_state.table_sort_order = 'Ascending'
+        st.session_state.table_page_size = TABLE_PAGE_SIZES[0]
+        st.session_state.table_page = 1
+    
+    # Relevance is only offered, and picked by default, while a search is active
+    sort_columns = {RELEVANCE_SORT: 'Relevance', **TABLE_SORT_COLUMNS} if ranked else TABLE_SORT_COLUMNS
+    if ranked and not st.session_state.get('table_ranked', False):
+        st.session_state.table_sort_by = RELEVANCE_SORT
+    elif not ranked and st.session_state.table_sort_by == RELEVANCE_SORT:
+        st.session_state.table_sort_by = 'project_manager'
+    st.session_state.table_ranked = ranked
+    
+    # Clamp the page to the filtered set before the page widget is created
+    row_count = len(df) if positions is None else len(positions)
+    page, page_count, start, stop = page_bounds(
+        row_count, st.session_state.table_page, st.session_state.table_page_size
+    )
+    st.session_state.table_page = page
     
     # Section header
-    st.markdown("""
+    showing = f"{start + 1}-{stop} of {row_count}" if row_count > 0 else "0"
+    st.markdown(f"""
     <div style="display: flex; justify-content: space-between; align-items: center; margin: 30px 0 15px 0;">
         <h3 style="margin: 0; color: #0A2463; font-size: 1.2rem;">Project Details</h3>
-        <div style="font-size: 0.9rem; color: #666;">Showing <span style="font-weight: 600; color: #0A2463"></span> projects</div>
+        <div style="font-size: 0.9rem; color: #666;">Showing <span style="font-weight: 600; color: #0A2463">{showing}</span> projects</div>
     </div>
     """, unsafe_allow_html=True)
     
     # Legend section for color coding
-    st.markdown("""
+    red_days, orange_days = TIMELINE_THRESHOLDS
+    st.markdown(f"""
     <div class="color-definition-container">
         <div class="color-definition-title">Timeline Color Legend:</div>
         <div class="color-definition">
-            <div class="color-item"><div class="color-dot red-dot"></div> <span>Less than 60 days remaining</span></div>
-            <div class="color-item"><div class="color-dot orange-dot"></div> <span>60-120 days remaining</span></div>
-            <div class="color-item"><div class="color-dot green-dot"></div> <span>More than 120 days remaining</span></div>
+            <div class="color-item"><div class="color-dot red-dot"></div> <span>Less than {red_days} days remaining</span></div>
+            <div class="color-item"><div class="color-dot orange-dot"></div> <span>{red_days}-{orange_days} days remaining</span></div>
+            <div class="color-item"><div class="color-dot green-dot"></div> <span>More than {orange_days} days remaining</span></div>
             <div class="color-item"><div class="color-dot black-dot"></div> <span>Closed projects</span></div>
         </div>
     </div>
     """, unsafe_allow_html=True)
     
-    # Table header
-    st.markdown(f"""
-    <div class="projects-table">
-        <div class="table-header">
-            <div class="projects-overview-title">Projects List ({len(df)} items)</div>
-        </div>
-        <div class="column-headers" style="display: grid; grid-template-columns: 1.5fr 1fr 0.8fr 0.8fr 0.8fr 0.8fr 0.8fr 1.5fr; gap: 10px;">
-            <div>Project Manager</div>
-            <div>Project Name</div>
-            <div style="text-align: center;">Status</div>
-            <div style="text-align: right;">Budget</div>
-            <div style="text-align: center;">Remaining Time</div>
-            <div>Start Date</div>
-            <div>End Date</div>
-            <div>Progress</div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    # No data message if dataframe is empty
-    if len(df) == 0:
-        st.markdown("""
-        <div style="padding: 30px 0; text-align: center; color: #666;">
-            <div style="font-size: 3rem; margin-bottom: 10px;">📊</div>
-            <div style="font-weight: 500; margin-bottom: 5px;">No projects found</div>
-            <div style="font-size: 0.9rem;">Try adjusting your filter criteria</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Table rows
-    for _, row in df.iterrows():
-        status_html = f'<span class="status-badge {row["status_color"]}" style="display: inline-block; text-align: center;">{row["status"]}</span>'
-        
-        # Create time circle based on remaining time
-        time_class = ""
-        if row['status'] == 'Closed':
-            time_html = f'<div class="time-circle" style="background-color: #212121; margin: 0 auto;">0%</div>'
-        else:
-            if row['remaining_time_pct'] < 30:
-                time_class = "time-red"
-            elif row['remaining_time_pct'] < 60:
-                time_class = "time-orange"
-            else:
-                time_class = "time-green"
-            time_html = f'<div class="time-circle {time_class}" style="margin: 0 auto;">{row["remaining_time_pct"]}%</div>'
-        
-        # Avatar and project manager - improved with random background colors based on name
-        initials = row['project_manager'][0].upper()
-        bg_colors = ['#4285F4', '#EA4335', '#FBBC05', '#34A853', '#8523FA', '#20C997', '#9B59B6']
-        color_index = hash(row['project_manager']) % len(bg_colors) 
-        bg_color = bg_colors[color_index]
-        
-        manager_html = f"""
-        <div class="avatar-container">
-            <div style="background-color: {bg_color}; width: 32px; height: 32px; border-radius: 50%; margin-right: 10px; display: flex; align-items: center; justify-content: center; font-size: 14px; font-weight: 500; color: white; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                {initials}
-            </div>
-            <div style="font-weight: 500;">{row['project_manager']}</div>
-        </div>
-        """
-        
-        # Progress bar with percentage - improved styling
-        progress_pct = row['progress_pct']
-        progress_color = "#0A2463"  # Default blue
-        
-        # Adjust color based on progress vs remaining time
-        if row['status'] != 'Closed':
-            if row['remaining_time_pct'] < 30 and progress_pct < 70:
-                progress_color = "#FF5252"  # Red for warning
-            elif row['remaining_time_pct'] < 60 and progress_pct < 50:
-                progress_color = "#FFA726"  # Orange for caution
-        
-        progress_html = f"""
-        <div style="position: relative; height: 8px; width: 100%; background-color: #eaecef; border-radius: 20px; overflow: hidden;">
-            <div style="width: {progress_pct}%; height: 100%; background-color: {progress_color}; border-radius: 20px;"></div>
-            <div style="position: absolute; right: 0; top: -18px; font-size: 12px; color: #555; font-weight: 500;">{progress_pct}%</div>
-        </div>
-        """
-        
-        # Format the row with hover effect
-        row_html = f"""
-        <div class="project-row" style="display: grid; grid-template-columns: 1.5fr 1fr 0.8fr 0.8fr 0.8fr 0.8fr 0.8fr 1.5fr; gap: 10px; align-items: center; padding: 14px 10px; border-bottom: 1px solid #f0f0f0; border-radius: 4px;">
-            <div>{manager_html}</div>
-            <div style="font-weight: 500; color: #0A2463;">{row['project_name']}</div>
-            <div style="text-align: center;">{status_html}</div>
-            <div style="text-align: right; font-weight: 500;">${row['budget']:,}</div>
-            <div style="text-align: center;">{time_html}</div>
-            <div style="color: #555;">{row['start_date']}</div>
-            <div style="color: #555;">{row['end_date']}</div>
-            <div>{progress_html}</div>
-        </div>
-        """
-        
-        st.markdown(row_html, unsafe_allow_html=True)
-    
-    # Close the table container
-    st.markdown("</div>", unsafe_allow_html=True)
+    # Sorting and page size controls
+    sort_col, order_col, size_col, page_col = st.columns([2, 1, 1, 1])
+    with sort_col:
+        sort_by = st.selectbox(
+            "Sort by",
+            options=list(sort_columns),
+            format_func=sort_columns.get,
+            key='table_sort_by'
+        )
+    with order_col:
+        sort_order = st.selectbox("Order", options=['Ascending', 'Descending'], key='table_sort_order')
+    with size_col:
+        st.selectbox("Rows per page", options=TABLE_PAGE_SIZES, key='table_page_size')
+    with page_col:
+        st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key='table_page')
+    
+    # Only the rows of the visible page are rendered
+    if sort_by == RELEVANCE_SORT:
+        order = np.arange(len(df)) if positions is None else positions
+    else:
+        order = sorted_positions(df, sort_by, sort_order == 'Descending', positions)
+    page_df = df.take(order[start:stop])
+    
+    # Trend sparklines of the visible rows only
+    trend_cells = None
+    if history is not None and len(history.days) > 1:
+        names = page_df['project_name'].astype(str)
+        trend_cells = build_trend_cells_html(history.series(names), history.trends(names), TREND_WINDOW_DAYS)
+    
+    # Table header, rows and empty message are sent as a single element
+    st.markdown(build_table_html(page_df, row_count, trend_cells), unsafe_allow_html=True)
     
     # Add summary at the bottom if there's data
-    if len(df) > 0:
-        active_projects = len(df[df['status'] != 'Closed'])
-        total_budget = df['budget'].sum()
+    if row_count > 0:
+        if aggregates is None:
+            aggregates = compute_aggregates(df if positions is None else df.take(positions))
+        active_projects = aggregates['active_count']
+        total_budget = aggregates['total_budget']
         
         st.markdown(f"""
         <div style="margin-top: 15px; font-size: 0.9rem; color: #555; text-align: right;">
-            Showing {len(df)} projects ({active_projects} active) with a combined budget of <span style="font-weight: 600; color: #0A2463">${total_budget:,}</span>
+            Showing {row_count} projects ({active_projects} active) with a combined budget of <span style="font-weight: 600; color: #0A2463">${total_budget:,}</span>
         </div>
         """, unsafe_allow_html=True)
+        
+        # Export the whole filtered set in table order; the file is only
+        # written when the button is clicked, off the script thread
+        format_col, button_col = st.columns([1, 4])
+        with format_col:
+            export_format = st.selectbox(
+                "Export format",
+                options=available_export_formats(),
+                key='table_export_format',
+                label_visibility='collapsed'
+            )
+        with button_col:
+            extension, mime, _ = EXPORT_FORMATS[export_format]
+            st.download_button(
+                f"Download {row_count:,} projects",
+                data=lambda: export_projects(df, order, export_format),
+                file_name=f"projects-{date.today():%Y-%m-%d}.{extension}",
+                mime=mime,
+                on_click='ignore',
+                key='table_export'
+            )
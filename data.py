@@ -1,70 +1,207 @@
+import logging
+import os
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date
 import streamlit as st
 
-@st.cache_data
-def load_project_data():
+from aggregates import summarize
+from frame_cache import cached_frame
+from render_attributes import derive_render_attributes
+from sources import read_projects
+from timeline import classify_status_color
+
+logger = logging.getLogger(__name__)
+
+# Environment variable switching on the compact schema mode
+COMPACT_SCHEMA_ENV = 'PM_DASHBOARD_COMPACT'
+
+# Repeated string columns stored as categoricals in the compact schema
+CATEGORICAL_COLUMNS = ['project_manager', 'avatar', 'project_name', 'status', 'donor']
+
+# Percentage columns stored as uint8 in the compact schema
+PERCENT_COLUMNS = ['remaining_time_pct', 'progress_pct']
+
+# Reach counts stored as uint32 in the compact schema
+COUNT_COLUMNS = ['households_reached', 'individuals_reached']
+
+# Date string columns replaced by their parsed datetime64 column
+DATE_COLUMNS = {'start_date': 'start_date_dt', 'end_date': 'end_date_dt'}
+
+# Schedule columns derived from the dates of each snapshot; the derived
+# remaining_time_pct replaces the entered one wherever both dates are known
+SCHEDULE_COLUMNS = ['remaining_time_pct', 'elapsed_pct', 'progress_gap_pct']
+
+# Column keeping the entered remaining_time_pct, so the schedule can be
+# derived again (e.g. after a change) from the entered value
+ENTERED_REMAINING_COLUMN = 'entered_remaining_pct'
+
+# Accepted date string formats, tried in order for a whole column
+DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d')
+
+def compact_schema_enabled():
+    """Whether the compact schema mode is switched on through the environment"""
+    return os.environ.get(COMPACT_SCHEMA_ENV, '').lower() in ('1', 'true', 'yes')
+
+def load_parsed_project_data(source, compact=False):
+    """Parsed project rows of a source, through the on-disk frame cache"""
+    return cached_frame(source, compact, parse_project_data)
+
+def parse_dates(values):
+    """
+    Parse date strings with the first of DATE_FORMATS matching the whole column
+    
+    An explicit format keeps pandas from inferring one per call (and from
+    falling back to slow per-element parsing). Raises a ValueError when no
+    format matches.
     """
-    Load project data with the same structure as shown in the image
+    for date_format in DATE_FORMATS:
+        try:
+            return pd.to_datetime(values, format=date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date values in '{getattr(values, 'name', 'dates')}' (expected one of: {', '.join(DATE_FORMATS)})")
+
+def parse_project_data(source, compact=False):
+    """Read project rows from a source and parse their dates (uncached)"""
+    df = read_projects(source)
+    
+    # Parse dates once per source revision
+    for name, dt_name in DATE_COLUMNS.items():
+        df[dt_name] = parse_dates(df[name])
+    
+    if compact:
+        df = compact_project_frame(df)
+    
+    return df
+
+def derive_date_columns(static_df, source_version, today, compact=False):
+    """
+    Return a copy of parsed project rows with the date-dependent columns added
+    
+    The copy is shallow, so `static_df` is left untouched and can be shared.
     """
-    # Create sample data based on the image
-    data = {
-        'project_manager': [
-            'Abdurrahman Salih', 
-            'Abdurrahman Salih', 
-            'Badr Al-Din Triyaki', 
-            'Badr Al-Din Triyaki'
-        ],
-        'avatar': [
-            'avatar1.svg', 
-            'avatar1.svg', 
-            'avatar2.svg', 
-            'avatar2.svg'
-        ],
-        'project_name': ['OCHA', 'WFP', 'GIRO', 'USAID'],
-        'status': ['Ongoing', 'Ongoing', 'Closed', 'Ongoing'],
-        'budget': [250000, 750000, 50000, 180000],
-        'remaining_time_pct': [11, 57, 0, 94],
-        'start_date': ['10/1/2024', '11/1/2024', '10/1/2024', '1/15/2025'],
-        'end_date': ['2/1/2025', '5/1/2025', '12/30/2024', '6/1/2025'],
-        'progress_pct': [93, 80, 96, 10]
-    }
-    
-    df = pd.DataFrame(data)
-    
-    # Calculate days remaining for status color determination
-    df['start_date_dt'] = pd.to_datetime(df['start_date'])
-    df['end_date_dt'] = pd.to_datetime(df['end_date'])
+    df = static_df.copy(deep=False)
     
     # Calculate days remaining based on end date
-    today = datetime.now()
-    df['days_remaining'] = (df['end_date_dt'] - today).dt.days
+    days_remaining = (df['end_date_dt'] - pd.Timestamp(today)).dt.days
+    if compact:
+        days_remaining = days_remaining.astype('Int32' if days_remaining.hasnans else 'int32')
+    df['days_remaining'] = days_remaining
     
     # Determine status color
-    def determine_status_color(row):
-        if row['status'] == 'Closed':
-            return 'closed'
-        elif row['days_remaining'] < 60:
-            return 'ongoing-red'
-        elif row['days_remaining'] < 120:
-            return 'ongoing-orange'
-        else:
-            return 'ongoing-green'
-    
-    df['status_color'] = df.apply(determine_status_color, axis=1)
+    df['status_color'] = classify_status_color(df['status'], df['days_remaining'])
     
+    # Elapsed / remaining time and the gap to the expected progress
+    df = derive_schedule_metrics(df, today, compact)
+    
+    # Table classes, initials and avatar colors, so rendering only looks them up
+    df = derive_render_attributes(df)
+    
+    # Tag the frame so caches built from it can be keyed by data version
+    df.attrs['data_version'] = f"{source_version}@{today:%Y-%m-%d}" + (":compact" if compact else "")
+    
+    return df
+
+def derive_schedule_metrics(df, today, compact=False):
+    """
+    Add the SCHEDULE_COLUMNS computed from the start and end dates
+    
+    elapsed_pct is the share of the project's time passed by `today` (0-100),
+    remaining_time_pct the rest (0 for closed projects) and progress_gap_pct
+    the expected progress (equal to elapsed_pct on a linear schedule) minus
+    progress_pct, positive when the project is behind. Where a date is
+    missing the entered remaining time (kept in ENTERED_REMAINING_COLUMN) is
+    used and elapsed is its complement; with neither the values are missing,
+    and columns with missing values use the nullable integer types.
+    """
+    if ENTERED_REMAINING_COLUMN not in df.columns:
+        df[ENTERED_REMAINING_COLUMN] = df['remaining_time_pct'] if 'remaining_time_pct' in df.columns else np.nan
+    start = df['start_date_dt']
+    duration = (df['end_date_dt'] - start).dt.days.to_numpy(dtype='float64', na_value=np.nan)
+    elapsed_days = (pd.Timestamp(today) - start).dt.days.to_numpy(dtype='float64', na_value=np.nan)
+    
+    # Zero-length projects are fully elapsed from their start day
+    with np.errstate(divide='ignore', invalid='ignore'):
+        elapsed = np.where(duration > 0, elapsed_days / duration, (elapsed_days >= 0).astype('float64')) * 100
+    entered = df[ENTERED_REMAINING_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    known = ~np.isnan(duration) & ~np.isnan(elapsed_days)
+    elapsed = np.round(np.where(known, np.clip(elapsed, 0, 100), 100 - entered))
+    
+    closed = np.asarray(df['status'] == 'Closed', dtype=bool)
+    remaining = np.where(closed, 0, 100 - elapsed)
+    gap = elapsed - df['progress_pct'].to_numpy(dtype='float64', na_value=np.nan)
+    
+    for name, values, dtype, nullable_dtype in (
+        ('remaining_time_pct', remaining, 'uint8', 'UInt8'),
+        ('elapsed_pct', elapsed, 'uint8', 'UInt8'),
+        ('progress_gap_pct', gap, 'int8', 'Int8'),
+    ):
+        values = pd.Series(values, index=df.index)
+        if not compact:
+            dtype, nullable_dtype = 'int64', 'Int64'
+        df[name] = values.astype(nullable_dtype if values.hasnans else dtype)
     return df
 
-@st.cache_data
-def load_summary_data():
+def compact_project_frame(df):
     """
-    Load summary metrics data
+    Convert parsed project rows to the compact schema
+    
+    Repeated strings become categoricals, percentages uint8, reach counts
+    uint32 and the date strings are dropped in favour of the datetime64
+    columns (dates are formatted when rendered). Columns with missing values
+    use the nullable UInt8 / UInt32 types.
+    """
+    df = df.drop(columns=[name for name in DATE_COLUMNS if name in df.columns])
+    for name in CATEGORICAL_COLUMNS:
+        # Categories get pandas' own string inference, as when read back from Arrow
+        df[name] = df[name].astype(object).astype('category')
+    for name in PERCENT_COLUMNS:
+        values = clip_logged(df[name], 0, 100)
+        df[name] = values.astype('UInt8' if values.hasnans else 'uint8')
+    for name in COUNT_COLUMNS:
+        values = clip_logged(df[name], 0, np.iinfo('uint32').max)
+        df[name] = values.astype('UInt32' if values.hasnans else 'uint32')
+    return df
+
+def clip_logged(values, lower, upper):
+    """Clip a column to the range its compact type holds, logging the rows that were out of it"""
+    rows = np.flatnonzero(((values < lower) | (values > upper)).fillna(False).to_numpy(dtype=bool))
+    if len(rows):
+        logger.warning(
+            "Clipped %d '%s' values to %d-%d for the compact schema (first at row %d)",
+            len(rows), values.name, lower, upper, rows[0]
+        )
+    return values.clip(lower, upper)
+
+def memory_report(frames):
+    """
+    Memory use per column of one or more projects frames, in bytes per row
+    
+    `frames` maps a label (e.g. 'default', 'compact') to a frame; the result
+    has one column per label and a 'total' row.
+    """
+    report = pd.DataFrame({
+        label: df.memory_usage(deep=True, index=False) / max(len(df), 1)
+        for label, df in frames.items()
+    })
+    report.loc['total'] = report.sum()
+    return report
+
+def data_version(df):
+    """Return the data version a loaded projects frame was tagged with"""
+    return df.attrs['data_version']
+
+@st.cache_data(max_entries=256)
+def load_summary_data(_df, _positions, data_version, selection=None):
+    """
+    Load summary metrics data for the rows of a projects frame at `_positions`
+    
+    Computed from the project rows (all of them when `_positions` is None)
+    by aggregates.summarize and cached per data version and filter
+    `selection` (any hashable key of the filters that produced the
+    positions), so the KPI cards always match the table and the rows are
+    only taken on a cache miss.
     """
-    summary = {
-        'total_budget': 1230000,  # $1.23M
-        'projects_count': 4,
-        'households_reached': 698,
-        'individuals_reached': 3490
-    }
-    
-    return summary
+    return summarize(_df if _positions is None else _df.take(_positions), date.today())
@@ -0,0 +1,117 @@
+import importlib.util
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from data import DATE_COLUMNS
+
+# Exported columns and their header, dates taken from the parsed columns
+EXPORT_COLUMNS = {
+    'project_manager': 'Project Manager',
+    'project_name': 'Project Name',
+    'donor': 'Donor',
+    'status': 'Status',
+    'budget': 'Budget',
+    'start_date': 'Start Date',
+    'end_date': 'End Date',
+    'days_remaining': 'Days Remaining',
+    'remaining_time_pct': 'Remaining Time %',
+    'elapsed_pct': 'Elapsed Time %',
+    'progress_gap_pct': 'Progress Gap %',
+    'progress_pct': 'Progress %',
+    'households_reached': 'Households Reached',
+    'individuals_reached': 'Individuals Reached',
+    'status_color': 'Timeline',
+}
+
+# Rows converted and written at a time
+EXPORT_CHUNK_ROWS = 10_000
+
+
+def export_chunks(df, positions=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield the exported columns of the rows at `positions` as Arrow tables
+
+    Dates become date32 values and categoricals plain strings, so every
+    chunk has the same schema whatever the data.
+    """
+    columns = [DATE_COLUMNS.get(column, column) for column in EXPORT_COLUMNS]
+    if positions is None:
+        positions = range(len(df))
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        chunk = df.iloc[positions[start:start + chunk_rows]][columns]
+        table = pa.Table.from_pandas(chunk, preserve_index=False).rename_columns(list(EXPORT_COLUMNS.values()))
+        yield table.cast(export_schema(table.schema))
+
+
+def export_schema(schema):
+    """Plain (non-dictionary, date instead of timestamp) version of a chunk schema"""
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        elif pa.types.is_timestamp(field.type):
+            field = field.with_type(pa.date32())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def write_csv(chunks, file):
+    writer = None
+    for table in chunks:
+        if writer is None:
+            writer = pa_csv.CSVWriter(file, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def write_parquet(chunks, file):
+    writer = None
+    for table in chunks:
+        if writer is None:
+            writer = pq.ParquetWriter(file, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def write_xlsx(chunks, file):
+    # openpyxl is optional and only needed for Excel exports
+    from openpyxl import Workbook
+
+    # Write-only mode streams rows to the file instead of keeping a sheet model
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Projects')
+    sheet.append(list(EXPORT_COLUMNS.values()))
+    for table in chunks:
+        for row in zip(*(column.to_pylist() for column in table.columns)):
+            sheet.append(row)
+    workbook.save(file)
+
+
+# Export formats: label -> (file extension, MIME type, writer)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv', write_csv),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', write_parquet),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', write_xlsx),
+}
+
+
+def available_export_formats():
+    """Export format labels whose writer can run here"""
+    return [label for label in EXPORT_FORMATS if label != 'Excel' or importlib.util.find_spec('openpyxl')]
+
+
+def export_projects(df, positions=None, export_format='CSV'):
+    """
+    Write projects in one of EXPORT_FORMATS, chunk by chunk, and return the bytes
+
+    No chunk of rows is converted before the previous one has been written,
+    so only the encoded file, not a converted copy of the rows, is held in
+    memory.
+    """
+    _, _, writer = EXPORT_FORMATS[export_format]
+    file = io.BytesIO()
+    writer(export_chunks(df, positions), file)
+    return file.getvalue()
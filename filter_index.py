@@ -0,0 +1,179 @@
+import copy
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from timeline import TIMELINE_FLAGS
+
+# Filter parameters mapped to the column each one is indexed on
+FILTER_COLUMNS = {
+    'manager': 'project_manager',
+    'project': 'project_name',
+    'status': 'status',
+    'timeline': 'status_color',
+}
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+def changed_values(before, after, column):
+    """
+    Yield (position, old value, new value) for rows whose column changed
+
+    `before` and `after` are row subsets indexed by row position; rows only
+    in `after` (appended rows) have no old value. Missing values are None.
+    """
+    old_values = before[column].astype(object).reindex(after.index)
+    for position, old, new in zip(after.index, old_values, after[column].astype(object)):
+        old = None if pd.isna(old) else old
+        new = None if pd.isna(new) else new
+        if old != new:
+            yield position, old, new
+
+
+class FilterIndex:
+    """
+    Row positions of every filter value in a dataset
+
+    Built once per dataset load. Each filter value maps to the sorted row
+    positions holding it, so applying filters is an intersection of the
+    position arrays of the selected values instead of a scan of the frame.
+    """
+
+    def __init__(self, df):
+        self.row_count = len(df)
+        self.positions = {}
+        for param, column in FILTER_COLUMNS.items():
+            groups = df.groupby(column, observed=True, sort=False).indices
+            self.positions[param] = {
+                value: np.asarray(rows, dtype=np.intp) for value, rows in groups.items()
+            }
+
+    def lookup(self, param, value):
+        """Sorted row positions matching one filter parameter value"""
+        if param == 'timeline':
+            value = TIMELINE_FLAGS[value]
+        return self.positions[param].get(value, EMPTY_POSITIONS)
+
+    def filter_positions(self, filter_params):
+        """
+        Return the sorted row positions matching the filter parameters
+
+        Returns None when no filter is active, meaning every row matches.
+        """
+        selected = [
+            self.lookup(param, filter_params[param])
+            for param in FILTER_COLUMNS
+            if filter_params.get(param, 'All') != 'All'
+        ]
+        if not selected:
+            return None
+
+        # Intersect from the most selective value outwards
+        selected.sort(key=len)
+        positions = selected[0]
+        for rows in selected[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, rows, assume_unique=True)
+        return positions
+
+    def updated(self, before, after, row_count):
+        """
+        Return a copy of the index with changed and appended rows moved
+
+        `before` holds the previous values of updated rows and `after` the
+        new values of updated and appended rows, both indexed by row
+        position. Only the position arrays of affected values are rebuilt;
+        this index is left untouched for concurrent readers.
+        """
+        index = copy.copy(self)
+        index.row_count = row_count
+        index.positions = {}
+        for param, column in FILTER_COLUMNS.items():
+            removals = defaultdict(list)
+            additions = defaultdict(list)
+            for position, old, new in changed_values(before, after, column):
+                if old is not None:
+                    removals[old].append(position)
+                if new is not None:
+                    additions[new].append(position)
+
+            table = dict(self.positions[param])
+            for value, rows in removals.items():
+                remaining = np.setdiff1d(table[value], rows, assume_unique=True)
+                if len(remaining):
+                    table[value] = remaining
+                else:
+                    del table[value]
+            for value, rows in additions.items():
+                table[value] = np.union1d(table.get(value, EMPTY_POSITIONS), np.asarray(rows, dtype=np.intp))
+            index.positions[param] = table
+        return index
+
+
+
+# Columns the cascading sidebar facets are counted over
+FACET_COLUMNS = ['project_manager', 'project_name', 'status']
+
+
+class FilterFacets:
+    """
+    Cascading sidebar filter options with their project counts
+
+    Holds, per data version, the projects available under each manager and
+    the statuses available under each (manager, project) pair, where either
+    side may be 'All'. Option lists and counts are then plain lookups.
+    """
+
+    def __init__(self, df):
+        counts = df.groupby(FACET_COLUMNS, observed=True).size()
+        self.triples = {key: count for key, count in counts.items() if count}
+        self._build()
+
+    def _build(self):
+        managers = defaultdict(int)
+        projects = defaultdict(lambda: defaultdict(int))
+        statuses = defaultdict(lambda: defaultdict(int))
+        for (manager, project, status), count in self.triples.items():
+            managers[manager] += count
+            for manager_key in (manager, 'All'):
+                projects[manager_key][project] += count
+                for project_key in (project, 'All'):
+                    statuses[(manager_key, project_key)][status] += count
+
+        self.managers = dict(sorted(managers.items()))
+        self.projects = {key: dict(sorted(values.items())) for key, values in projects.items()}
+        self.statuses = {key: dict(sorted(values.items())) for key, values in statuses.items()}
+
+    def updated(self, before, after):
+        """
+        Return a copy of the facets with changed and appended rows recounted
+
+        `before` and `after` are the old and new values of the affected rows,
+        as for FilterIndex.updated.
+        """
+        triples = dict(self.triples)
+        for rows, sign in ((before, -1), (after, 1)):
+            for key in zip(*(rows[column].astype(object) for column in FACET_COLUMNS)):
+                if any(pd.isna(value) for value in key):
+                    continue
+                triples[key] = triples.get(key, 0) + sign
+        facets = copy.copy(self)
+        facets.triples = {key: count for key, count in triples.items() if count}
+        facets._build()
+        return facets
+
+    def manager_counts(self):
+        """Project count per manager"""
+        return self.managers
+
+    def project_counts(self, manager):
+        """Project count per project name under a manager selection"""
+        return self.projects.get(manager, {})
+
+    def status_counts(self, manager, project):
+        """Project count per status under a manager and project selection"""
+        return self.statuses.get((manager, project), {})
+
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from sources import arrow_frame
+
+logger = logging.getLogger(__name__)
+
+# Environment variable setting the directory of the parsed data cache
+# ('off' disables it)
+CACHE_DIR_ENV = 'PM_DASHBOARD_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'pm-dashboard-cache')
+
+# Bump whenever the parsed frame changes shape (columns, dtypes, date parsing)
+# so caches written by older code are ignored
+SCHEMA_VERSION = 1
+
+# Cache files kept; the least recently used beyond this are removed
+CACHE_MAX_FILES = 8
+
+# Read size when hashing a source file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Hit/miss counters of this process
+CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+def configured_cache_dir():
+    """Return the cache directory configured through the environment, or None if disabled"""
+    directory = os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    if directory.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    return directory
+
+
+def source_content_hash(source):
+    """
+    BLAKE2 digest of the bytes of a source file
+
+    For a multi-file source (a tuple of paths) the digest covers the path
+    and bytes of every file; files that cannot be read count by their path.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in source if isinstance(source, tuple) else [source]:
+        if isinstance(source, tuple):
+            digest.update(os.path.abspath(path).encode() + b'\0')
+        try:
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        except OSError:
+            if not isinstance(source, tuple):
+                raise
+    return digest.hexdigest()
+
+
+def cache_path(directory, content_hash, compact=False):
+    """Path of the cached frame of one source content and schema"""
+    schema = f"v{SCHEMA_VERSION}" + ("-compact" if compact else "")
+    return Path(directory) / f"projects-{content_hash}-{schema}.arrow"
+
+
+def read_cached_frame(path):
+    """
+    Read a cached frame by memory-mapping its Arrow IPC file
+
+    String columns stay backed by the mapped file (see sources.arrow_frame);
+    numeric, date and categorical columns are copied into pandas. Returns
+    None when there is no usable cache file.
+    """
+    try:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowInvalid):
+        logger.warning("Ignoring unreadable project data cache %s", path, exc_info=True)
+        return None
+
+    os.utime(path)
+    return arrow_frame(table)
+
+
+def write_cached_frame(path, df):
+    """
+    Write a frame to the cache as an uncompressed (memory-mappable) Arrow IPC file
+
+    The file is written next to its final path and renamed into place, so
+    readers never see a partial cache file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(table, temp_path, compression='uncompressed')
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    prune_cache(path.parent)
+
+
+def prune_cache(directory, max_files=CACHE_MAX_FILES):
+    """Remove the least recently used cache files beyond `max_files`"""
+    files = sorted(Path(directory).glob('projects-*.arrow'), key=lambda file: file.stat().st_mtime, reverse=True)
+    for file in files[max_files:]:
+        file.unlink(missing_ok=True)
+
+
+def cached_frame(source, compact, build):
+    """
+    Return the parsed frame of a source file through the disk cache
+
+    The cache is keyed by the source content hash and SCHEMA_VERSION, so a
+    restart or a new replica loads the frame with a memory-mapped read
+    instead of parsing the source again. On a miss `build(source, compact)`
+    is called and its result stored. Cache failures never fail the load.
+    Frames missing a source file that failed to load are not stored.
+    """
+    directory = configured_cache_dir()
+    if source is None or directory is None:
+        return build(source, compact)
+
+    path = cache_path(directory, source_content_hash(source), compact)
+    df = read_cached_frame(path)
+    if df is not None:
+        CACHE_STATS['hits'] += 1
+        return df
+
+    CACHE_STATS['misses'] += 1
+    df = build(source, compact)
+    if df.attrs.get('failed_sources'):
+        return df
+    try:
+        write_cached_frame(path, df)
+    except OSError:
+        logger.warning("Could not write project data cache %s", path, exc_info=True)
+    return df
@@ -0,0 +1,410 @@
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Environment variable pointing at the directory of the progress history
+# (unset disables recording and the trend views)
+HISTORY_DIR_ENV = 'PM_DASHBOARD_HISTORY_DIR'
+
+# One Parquet file per day, in a hive-style date=YYYY-MM-DD directory
+PARTITION_PREFIX = 'date='
+PARTITION_FILE = 'snapshot.parquet'
+
+# Project names in id order; new projects are appended, ids never change
+PROJECTS_FILE = 'projects.parquet'
+
+# Lock file held while the registry is read, extended and rewritten
+PROJECTS_LOCK_FILE = 'projects.lock'
+
+# Columns of a daily snapshot; projects are referenced by id and
+# percentages fit in a byte, so a day of 100k projects stays small
+HISTORY_SCHEMA = pa.schema([
+    ('project_id', pa.int32()),
+    ('status', pa.dictionary(pa.int8(), pa.string())),
+    ('progress_pct', pa.int8()),
+    ('remaining_time_pct', pa.int8()),
+    ('budget', pa.int64()),
+])
+
+# Value of the history matrices on days a project has no snapshot
+MISSING = -1
+
+# Days covered by the trend figures and the table sparklines
+TREND_WINDOW_DAYS = 30
+
+# How often the store is checked for new or rewritten days (seconds)
+HISTORY_CHECK_INTERVAL = 5.0
+
+# Days read in parallel when loading the history
+HISTORY_READ_THREADS = 8
+
+
+def configured_history_dir():
+    """Return the history directory configured through the environment, if any"""
+    return os.environ.get(HISTORY_DIR_ENV) or None
+
+
+def partition_path(directory, day):
+    return Path(directory) / f"{PARTITION_PREFIX}{day.isoformat()}" / PARTITION_FILE
+
+
+def list_partitions(directory):
+    """Map each recorded day to the modification time of its file"""
+    partitions = {}
+    for path in Path(directory).glob(f"{PARTITION_PREFIX}*/{PARTITION_FILE}"):
+        try:
+            day = date.fromisoformat(path.parent.name[len(PARTITION_PREFIX):])
+            partitions[day] = path.stat().st_mtime_ns
+        except (ValueError, OSError):
+            continue
+    return partitions
+
+
+def write_atomic(path, write):
+    """Call `write(temp_path)` and rename the result to `path`"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def registry_lock(directory):
+    """Hold an exclusive lock on the project registry of a history directory"""
+    path = Path(directory) / PROJECTS_LOCK_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_project_names(directory):
+    """Registered project names in id order (empty before the first record)"""
+    try:
+        table = read_table(Path(directory) / PROJECTS_FILE)
+    except FileNotFoundError:
+        return np.array([], dtype=object)
+    return table['project_name'].to_numpy().astype(object)
+
+
+def read_table(path, schema=None):
+    """
+    Read a Parquet file of the store through one open handle
+
+    Files are replaced by renames; reading by path could mix the size of
+    one version with the contents of the next.
+    """
+    with open(path, 'rb') as file:
+        return pq.read_table(file, schema=schema)
+
+
+def history_table(df, project_ids):
+    """The history columns of a projects frame as an Arrow table"""
+    return pa.table({
+        'project_id': project_ids,
+        'status': pa.array(df['status'].astype(str)).dictionary_encode(),
+        'progress_pct': df['progress_pct'].clip(0, 100).fillna(MISSING).to_numpy('int8'),
+        'remaining_time_pct': df['remaining_time_pct'].clip(0, 100).fillna(MISSING).to_numpy('int8'),
+        'budget': df['budget'].to_numpy('int64'),
+    }).cast(HISTORY_SCHEMA).sort_by('project_id')
+
+
+def write_history_table(table, path):
+    # Ids are written in order, so delta encoding stores them in a few bytes
+    pq.write_table(
+        table, path, compression='zstd',
+        use_dictionary=[name for name in HISTORY_SCHEMA.names if name != 'project_id'],
+        column_encoding={'project_id': 'DELTA_BINARY_PACKED'},
+    )
+
+
+def record_snapshot(directory, df, day, names=None):
+    """
+    Record the progress, budget and status of every project for `day`
+
+    Projects not in the registry yet are appended to it first, under the
+    registry lock and from a fresh read, so writers in other processes never
+    lose each other's projects. Each day is one Parquet file written next to
+    its final path and renamed into place, so readers never see a partial
+    day. Recording the same day again replaces it with the latest numbers;
+    earlier days are never touched. Pass the registered `names` when known to
+    skip reading them. Returns the registered names after the record.
+
+    Projects are identified by name only (as change events are), so of rows
+    sharing a project name only the first is recorded, with a warning.
+    """
+    if names is None:
+        names = read_project_names(directory)
+    project_names = df['project_name'].astype(str)
+    duplicated = project_names.duplicated().to_numpy()
+    if duplicated.any():
+        logger.warning(
+            "Recording only the first row of %d project names shared by several rows on %s; "
+            "the progress history is keyed by project name",
+            project_names[duplicated].nunique(), day
+        )
+        df = df[~duplicated]
+        project_names = project_names[~duplicated]
+    project_ids = pd.Index(names).get_indexer(project_names)
+    if (project_ids < 0).any():
+        with registry_lock(directory):
+            # `names` may be stale: another writer can have registered projects since
+            names = read_project_names(directory)
+            project_ids = pd.Index(names).get_indexer(project_names)
+            new = project_names[project_ids < 0].unique()
+            if len(new):
+                names = np.concatenate([names, np.asarray(new, dtype=object)])
+                registry = pa.table({'project_name': pa.array(names, pa.string())})
+                write_atomic(Path(directory) / PROJECTS_FILE, lambda temp_path: pq.write_table(registry, temp_path, compression='zstd'))
+                project_ids = pd.Index(names).get_indexer(project_names)
+
+    table = history_table(df, project_ids)
+    write_atomic(partition_path(directory, day), lambda temp_path: write_history_table(table, temp_path))
+    return names
+
+
+def read_partition(directory, day):
+    return read_table(partition_path(directory, day), schema=HISTORY_SCHEMA)
+
+
+class ProgressHistory:
+    """
+    Daily progress snapshots as dense day x project matrices
+
+    `progress` and `remaining` hold one int8 per day and project (MISSING
+    where a project has no snapshot), so every query is a vectorized
+    operation over the last rows, and loading a day fills one contiguous
+    row. `budget` and `status` are the most recent values of each project.
+    """
+
+    def __init__(self, names, days, progress, remaining, budget, status):
+        self.names = names
+        self.days = days
+        self.progress = progress
+        self.remaining = remaining
+        self.budget = budget
+        self.status = status
+        self._rows = pd.Index(names)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.array([], dtype=object), np.array([], dtype='datetime64[D]'),
+            np.empty((0, 0), dtype='int8'), np.empty((0, 0), dtype='int8'),
+            np.zeros(0, dtype='int64'), np.array([], dtype=object),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def with_days(self, names, tables):
+        """
+        Return a new history with the snapshot tables of some days added or replaced
+
+        `names` is the current project registry (ours plus newly registered
+        projects) and `tables` maps a date to its snapshot table.
+        """
+        days = np.union1d(self.days, np.array(sorted(tables), dtype='datetime64[D]'))
+
+        # Existing cells move to their place in the grown matrices
+        progress = np.full((len(days), len(names)), MISSING, dtype='int8')
+        remaining = np.full((len(days), len(names)), MISSING, dtype='int8')
+        old_days = np.searchsorted(days, self.days)
+        progress[old_days, :len(self.names)] = self.progress
+        remaining[old_days, :len(self.names)] = self.remaining
+        budget = np.zeros(len(names), dtype='int64')
+        budget[:len(self.names)] = self.budget
+        status = np.empty(len(names), dtype=object)
+        status[:len(self.names)] = self.status
+
+        latest = self.days.max() if len(self.days) else None
+        for day, table in sorted(tables.items()):
+            rows = table['project_id'].to_numpy()
+            day_row = np.searchsorted(days, np.datetime64(day, 'D'))
+            progress[day_row] = MISSING
+            remaining[day_row] = MISSING
+            progress[day_row, rows] = table['progress_pct'].to_numpy()
+            remaining[day_row, rows] = table['remaining_time_pct'].to_numpy()
+            if latest is None or np.datetime64(day, 'D') >= latest:
+                status_column = table['status'].combine_chunks()
+                budget[rows] = table['budget'].to_numpy()
+                status[rows] = np.array(status_column.dictionary.to_pylist(), dtype=object)[status_column.indices.to_numpy(zero_copy_only=False)]
+                latest = np.datetime64(day, 'D')
+        return ProgressHistory(names, days, progress, remaining, budget, status)
+
+    def rows_of(self, project_names):
+        """Positions of some projects in the registry (-1 for projects without history)"""
+        return self._rows.get_indexer(pd.Index(project_names).astype(str))
+
+    def window_start(self, window_days):
+        """First matrix row within `window_days` calendar days of the latest day"""
+        if len(self.days) == 0:
+            return 0
+        return int(np.searchsorted(self.days, self.days[-1] - np.timedelta64(window_days - 1, 'D')))
+
+    def window(self, matrix, rows, window_days):
+        """The days of a window as project x day values of `rows` (all projects if None)"""
+        recent = matrix[self.window_start(window_days):].T
+        if rows is None:
+            return recent
+        if len(self.names) == 0:
+            return np.full((len(rows), recent.shape[1]), MISSING, dtype='int8')
+        values = recent[np.maximum(rows, 0)]
+        values[rows < 0] = MISSING
+        return values
+
+    def series(self, project_names, window_days=TREND_WINDOW_DAYS):
+        """Daily progress of some projects over the window as floats (NaN when missing)"""
+        values = self.window(self.progress, self.rows_of(project_names), window_days).astype('float32')
+        values[values == MISSING] = np.nan
+        return values
+
+    def trends(self, project_names=None, window_days=TREND_WINDOW_DAYS):
+        """
+        Trend, slippage and burn rate of projects over the last `window_days`
+
+        Returns a frame indexed by project name:
+          progress_pct           latest recorded progress
+          progress_change        progress gained over the window (points)
+          progress_per_day       least-squares slope of progress (points/day)
+          slippage_pct           schedule minus progress: time elapsed (100 -
+                                 remaining time %) less progress; positive
+                                 means behind schedule
+          slippage_change        how much the slippage grew over the window
+          burn_per_day           budget delivered per day at the current
+                                 slope (budget x slope / 100)
+          days_to_complete       days until 100% at the current slope
+        """
+        rows = None if project_names is None else self.rows_of(project_names)
+        progress = self.window(self.progress, rows, window_days).astype('float64')
+        remaining = self.window(self.remaining, rows, window_days).astype('float64')
+        recorded = progress != MISSING
+        progress[~recorded] = np.nan
+        remaining[remaining == MISSING] = np.nan
+        slippage = (100 - remaining) - progress
+
+        # Least-squares slope over the recorded days of each project
+        offsets = (self.days[self.window_start(window_days):] - self.days[-1:]).astype('float64') if len(self.days) else []
+        x = np.where(recorded, offsets, 0.0)
+        y = np.where(recorded, progress, 0.0)
+        n = recorded.sum(axis=1)
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        denominator = n * (x * x).sum(axis=1) - sx * sx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denominator > 0, (n * (x * y).sum(axis=1) - sx * sy) / denominator, np.nan)
+
+        latest = last_recorded(progress, recorded)
+        budget = self.budget if rows is None else np.where(rows >= 0, self.budget[np.maximum(rows, 0)] if len(self.names) else 0, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days_to_complete = np.where(slope > 0, (100 - latest) / slope, np.nan)
+        return pd.DataFrame({
+            'progress_pct': latest,
+            'progress_change': latest - first_recorded(progress, recorded),
+            'progress_per_day': slope,
+            'slippage_pct': last_recorded(slippage, recorded),
+            'slippage_change': last_recorded(slippage, recorded) - first_recorded(slippage, recorded),
+            'burn_per_day': budget * slope / 100,
+            'days_to_complete': days_to_complete,
+        }, index=pd.Index(self.names if project_names is None else project_names, name='project_name'))
+
+
+def last_recorded(values, recorded):
+    """Value of each row on its last recorded day (NaN if none)"""
+    if values.shape[1] == 0:
+        return np.full(values.shape[0], np.nan)
+    column = values.shape[1] - 1 - np.argmax(recorded[:, ::-1], axis=1)
+    return np.where(recorded.any(axis=1), values[np.arange(len(values)), column], np.nan)
+
+
+def first_recorded(values, recorded):
+    """Value of each row on its first recorded day (NaN if none)"""
+    if values.shape[1] == 0:
+        return np.full(values.shape[0], np.nan)
+    column = np.argmax(recorded, axis=1)
+    return np.where(recorded.any(axis=1), values[np.arange(len(values)), column], np.nan)
+
+
+class HistoryStore:
+    """
+    Append-only store of daily project snapshots in a date-partitioned directory
+
+    The loaded ProgressHistory is kept in memory. At most every `interval`
+    seconds the directory is listed and only new or rewritten days are read
+    and merged in, so a year of history is read once per process.
+    """
+
+    def __init__(self, directory, interval=HISTORY_CHECK_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self._history = ProgressHistory.empty()
+        self._loaded = {}
+        self._recorded_names = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def record(self, df, day):
+        """Record the projects of `day` (see record_snapshot)"""
+        self._recorded_names = record_snapshot(self.directory, df, day, self._recorded_names)
+
+    @property
+    def history(self):
+        if time.monotonic() - self._checked_at >= self.interval:
+            self.check()
+        return self._history
+
+    def check(self):
+        """Read the days that are new or changed since the last check"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            partitions = list_partitions(self.directory)
+            changed = [day for day, mtime in partitions.items() if self._loaded.get(day) != mtime]
+            if not changed:
+                return
+            with ThreadPoolExecutor(HISTORY_READ_THREADS) as pool:
+                tables = dict(zip(changed, pool.map(lambda day: read_partition(self.directory, day), changed)))
+            self._history = self._history.with_days(read_project_names(self.directory), tables)
+            self._loaded.update((day, partitions[day]) for day in changed)
+            logger.info("Loaded %d day(s) of progress history from %s", len(changed), self.directory)
+
+
+def configured_history_store():
+    """The history store configured through the environment, or None"""
+    directory = configured_history_dir()
+    return HistoryStore(directory) if directory else None
+
+
+@st.cache_resource
+def get_history_store(directory):
+    """The history store of this process for a directory"""
+    return HistoryStore(directory)
+
+
+def current_history():
+    """The progress history to show, or None when no history directory is configured"""
+    directory = configured_history_dir()
+    if directory is None:
+        return None
+    return get_history_store(directory).history
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from frame_cache import CACHE_STATS
+from query import get_filter_result_cache
+from sources import source_loads
+
+logger = logging.getLogger(__name__)
+
+# Environment variable / query parameter switching on the debug panel
+DEBUG_PANEL_ENV = 'PM_DASHBOARD_DEBUG'
+DEBUG_QUERY_PARAM = 'debug'
+
+# Environment variable naming a file the per-rerun JSON records are appended to
+PROFILE_LOG_ENV = 'PM_DASHBOARD_PROFILE_LOG'
+
+# Reruns kept for the latency percentiles
+LATENCY_WINDOW = 1000
+
+# Stage the time and messages outside of any stage are counted under
+UNSTAGED = 'other'
+
+
+def is_enabled(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def debug_panel_enabled():
+    """Whether the debug panel is switched on for this session"""
+    return is_enabled(os.environ.get(DEBUG_PANEL_ENV, '')) or is_enabled(st.query_params.get(DEBUG_QUERY_PARAM, ''))
+
+
+class RerunStats:
+    """Process-wide window of recent rerun durations"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._durations = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.reruns = 0
+
+    def record(self, duration_ms):
+        with self._lock:
+            self._durations.append(duration_ms)
+            self.reruns += 1
+
+    def percentiles(self):
+        """p50 and p95 rerun latency in milliseconds over the window"""
+        with self._lock:
+            durations = np.fromiter(self._durations, dtype=float)
+        if len(durations) == 0:
+            return {'p50_ms': None, 'p95_ms': None}
+        p50, p95 = np.percentile(durations, [50, 95])
+        return {'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2)}
+
+
+@st.cache_resource
+def get_rerun_stats():
+    """The rerun latency window of this server"""
+    profile_log = os.environ.get(PROFILE_LOG_ENV)
+    # The resource cache can be cleared and rebuilt; attach each log file once
+    if profile_log and not any(
+        isinstance(handler, logging.FileHandler) and handler.baseFilename == os.path.abspath(profile_log)
+        for handler in logger.handlers
+    ):
+        handler = logging.FileHandler(profile_log)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return RerunStats()
+
+
+class RerunProfile:
+    """
+    Per-stage timings and frontend traffic of one script rerun
+
+    Wrap each part of the script in `stage(name)`. Every message the rerun
+    sends to the browser is counted against the stage it was sent from,
+    both as an element count and as its serialized size in bytes.
+    """
+
+    def __init__(self, scope='app'):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._current = UNSTAGED
+        self._cache_before = get_filter_result_cache().stats()
+        self._frame_cache_before = dict(CACHE_STATS)
+
+    def _stage_row(self, name):
+        return self.stages.setdefault(name, {'ms': 0.0, 'elements': 0, 'bytes': 0})
+
+    @contextmanager
+    def stage(self, name):
+        previous, self._current = self._current, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stage_row(name)['ms'] += (time.perf_counter() - started) * 1000
+            self._current = previous
+
+    def count_message(self, msg):
+        row = self._stage_row(self._current)
+        if msg.WhichOneof('type') == 'delta':
+            row['elements'] += 1
+        row['bytes'] += msg.ByteSize()
+
+    def cache_counters(self):
+        """Hits and misses of the caches during this rerun"""
+        after = get_filter_result_cache().stats()
+        return {
+            'filter_results': {key: after[key] - self._cache_before[key] for key in ('hits', 'misses')},
+            'frame_cache': {key: CACHE_STATS[key] - self._frame_cache_before[key] for key in CACHE_STATS},
+        }
+
+    def finish(self):
+        """Record and log the rerun; returns its record"""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        staged_ms = sum(row['ms'] for name, row in self.stages.items() if name != UNSTAGED)
+        self._stage_row(UNSTAGED)['ms'] = max(total_ms - staged_ms, 0.0)
+        stats = get_rerun_stats()
+        stats.record(total_ms)
+
+        record = {
+            'event': 'rerun',
+            'scope': self.scope,
+            'total_ms': round(total_ms, 2),
+            'stages': {name: {**row, 'ms': round(row['ms'], 2)} for name, row in self.stages.items()},
+            'caches': self.cache_counters(),
+            'filter_result_cache': get_filter_result_cache().stats(),
+            **stats.percentiles(),
+        }
+        logger.info(json.dumps(record))
+        return record
+
+
+def start_rerun_profile(scope='app'):
+    """
+    Start profiling the current script rerun
+
+    Message counting wraps the private enqueue hook of the script run
+    context; without it (e.g. outside a Streamlit server) only the timings
+    are recorded. The original hook is kept on the context, so a rerun that
+    was interrupted before finish_rerun_profile never stacks wrappers.
+    """
+    profile = RerunProfile(scope)
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        ctx._rerun_profile = profile
+    if ctx is not None and hasattr(ctx, '_enqueue'):
+        enqueue = getattr(ctx, '_uninstrumented_enqueue', ctx._enqueue)
+        ctx._uninstrumented_enqueue = enqueue
+
+        def counting_enqueue(msg):
+            profile.count_message(msg)
+            enqueue(msg)
+        ctx._enqueue = counting_enqueue
+    return profile
+
+
+def fragment_rerun_profile():
+    """
+    The profile a fragment records its stages in
+
+    During a full rerun this is the profile started by the script; when only
+    fragments rerun, a new 'fragment' scope profile is started.
+    """
+    ctx = get_script_run_ctx()
+    profile = getattr(ctx, '_rerun_profile', None)
+    if profile is None or ctx.fragment_ids_this_run:
+        profile = start_rerun_profile('fragment')
+    return profile
+
+
+def finish_rerun_profile(profile):
+    """Stop counting messages, record the rerun and show the debug panel if enabled"""
+    ctx = get_script_run_ctx()
+    if ctx is not None and hasattr(ctx, '_uninstrumented_enqueue'):
+        ctx._enqueue = ctx._uninstrumented_enqueue
+    record = profile.finish()
+    if debug_panel_enabled():
+        display_debug_panel(record)
+    return record
+
+
+def display_debug_panel(record):
+    """Show the profile of the last rerun and the latency percentiles"""
+    with st.expander("Performance", expanded=True):
+        stages = pd.DataFrame.from_dict(record['stages'], orient='index')
+        stages.loc['total'] = [record['total_ms'], stages['elements'].sum(), stages['bytes'].sum()]
+        st.dataframe(stages.rename(columns={'ms': 'time (ms)', 'bytes': 'bytes sent'}))
+        st.markdown(
+            f"Rerun latency p50 **{record['p50_ms']} ms**, p95 **{record['p95_ms']} ms** "
+            f"over the last {min(get_rerun_stats().reruns, LATENCY_WINDOW)} reruns"
+        )
+        details = {'caches this rerun': record['caches'], 'filter result cache': record['filter_result_cache']}
+        loads = source_loads()
+        if loads:
+            details['source files (last read)'] = loads
+        st.json(details)
@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from search_index import search_text
+from timeline import critical_count
+
+# Default bounds of the shared filter result cache
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough fixed cost of one cache entry besides its row positions
+RESULT_ENTRY_OVERHEAD = 1024
+
+
+def compute_aggregates(df):
+    """Counters and totals the dashboard shows for a filtered set of projects"""
+    closed = df['status'] == 'Closed'
+    return {
+        'row_count': len(df),
+        'donors_count': int(df['project_name'].nunique()),
+        'ongoing_count': int((df['status'] == 'Ongoing').sum()),
+        'completed_count': int(closed.sum()),
+        'critical_count': critical_count(df),
+        'active_count': int((~closed).sum()),
+        'total_budget': int(df['budget'].sum()),
+    }
+
+
+class FilterResult:
+    """
+    Row positions of one filter selection and its precomputed aggregates
+
+    `ranked` is set when the positions are search matches, best match first.
+    """
+
+    __slots__ = ('positions', 'aggregates', 'ranked')
+
+    def __init__(self, positions, aggregates, ranked=False):
+        self.positions = positions
+        self.aggregates = aggregates
+        self.ranked = ranked
+
+    def take(self, df):
+        """The filtered rows of the dataset the result was computed on"""
+        if self.positions is None:
+            return df
+        return df.take(self.positions)
+
+    @property
+    def nbytes(self):
+        positions_bytes = 0 if self.positions is None else self.positions.nbytes
+        return positions_bytes + RESULT_ENTRY_OVERHEAD
+
+
+class FilterResultCache:
+    """
+    Thread-safe LRU cache of filter results shared by all sessions
+
+    Entries are keyed by (data version, manager, project, status, timeline)
+    and evicted least recently used first once either the entry count or the
+    memory budget is exceeded.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = result
+            self._bytes += result.nbytes
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current size of the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+@st.cache_resource
+def get_filter_result_cache():
+    """The filter result cache shared across sessions of this server"""
+    return FilterResultCache()
+
+
+def filter_key(version, filter_params):
+    """Cache key of one filter selection on one data version"""
+    return (
+        version,
+        filter_params['manager'],
+        filter_params['project'],
+        filter_params['status'],
+        filter_params['timeline'],
+        search_text(filter_params.get('search', '')),
+    )
+
+
+def query_projects(df, filter_params, index, version, cache=None, cube=None, search_index=None):
+    """
+    Return the FilterResult of a filter selection, memoized in `cache`
+
+    `index` is the FilterIndex of `df` and `version` its data version. With
+    the RollupCube of `df` the aggregates are summed from cube cells rather
+    than computed from the filtered rows. A 'search' text in the filter
+    parameters is matched through the SearchIndex of `df`; its matches are
+    intersected with the filter positions and come best match first. A
+    search too short to match (see search_text) is ignored.
+    """
+    key = filter_key(version, filter_params)
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    positions = index.filter_positions(filter_params)
+    search = search_text(filter_params.get('search', ''))
+    ranked = bool(search) and search_index is not None
+    if ranked:
+        positions = search_index.filter_positions(positions, search)
+    if cube is not None and not search:
+        aggregates = cube.aggregates(filter_params)
+    else:
+        aggregates = compute_aggregates(df if positions is None else df.take(positions))
+    result = FilterResult(positions, aggregates, ranked)
+
+    if cache is not None:
+        cache.put(key, result)
+    return result
@@ -0,0 +1,240 @@
+import logging
+import os
+import threading
+from datetime import date, datetime
+
+import streamlit as st
+
+from aggregates import RollupCube
+from changes import ChangeLog, apply_changes, configured_change_log
+from data import compact_schema_enabled, data_version, derive_date_columns, load_parsed_project_data
+from filter_index import FilterFacets, FilterIndex
+from history import configured_history_store
+from search_index import SearchIndex
+from sources import configured_source, source_signature
+
+logger = logging.getLogger(__name__)
+
+# Environment variable setting how often the data source is polled, in seconds
+REFRESH_INTERVAL_ENV = 'PM_DASHBOARD_REFRESH_SECONDS'
+DEFAULT_REFRESH_INTERVAL = 60
+
+# Failed revision recorded while the source cannot be stat'ed at all
+UNREADABLE_SOURCE = 'unreadable'
+
+
+class Snapshot:
+    """
+    A fully derived, read-only view of the project data
+
+    Bundles the projects frame with the filter index, sidebar facets,
+    rollup cube and search index built from it, so readers never mix
+    structures of two different data versions.
+    """
+
+    def __init__(self, df, source_version, data_date, as_of, index=None, facets=None, cube=None, search=None):
+        self.df = df
+        self.version = data_version(df)
+        self.source_version = source_version
+        self.data_date = data_date
+        self.as_of = as_of
+        self.built_at = datetime.now()
+        self.index = FilterIndex(df) if index is None else index
+        self.facets = FilterFacets(df) if facets is None else facets
+        self.cube = RollupCube(df) if cube is None else cube
+        self.search = SearchIndex(df) if search is None else search
+
+    def with_changes(self, events, version, compact=False):
+        """
+        Return a new snapshot (data version `version`) with change events applied
+
+        Only the changed rows are re-derived, and the filter index, facets,
+        rollup cube and search index are updated incrementally from them.
+        """
+        df, before, after = apply_changes(self.df, events, self.index, self.data_date, compact)
+        df.attrs['data_version'] = version
+        return Snapshot(
+            df, self.source_version, self.data_date, datetime.now(),
+            index=self.index.updated(before, after, len(df)),
+            facets=self.facets.updated(before, after),
+            cube=self.cube.updated(before, after),
+            search=self.search.updated(before, after),
+        )
+
+
+def source_as_of(source):
+    """When the data of a source was last changed (now for the built-in sample)"""
+    if source is None:
+        return datetime.now()
+    if not isinstance(source, tuple):
+        return datetime.fromtimestamp(os.stat(source).st_mtime)
+    mtimes = []
+    for path in source:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            continue
+    return datetime.fromtimestamp(max(mtimes)) if mtimes else datetime.now()
+
+
+class SnapshotRefresher:
+    """
+    Keeps a warm Snapshot of the project data up to date in the background
+
+    A daemon thread polls the data source every `interval` seconds. When the
+    source revision or the calendar date changes, the next snapshot is built
+    off the request path and swapped in with a single reference assignment;
+    readers keep using the previous snapshot until then. A failed refresh is
+    logged once per source revision and the previous snapshot stays in place;
+    so does a source that is missing or unreadable for a while. Its rows are
+    still re-derived when the date changes meanwhile.
+
+    With a `changes` log (see changes.ChangeLog) new change events are
+    applied incrementally on each poll. The log is replayed from the start
+    whenever the source itself is reloaded.
+
+    With a `history` store (see history.HistoryStore) every swapped-in
+    snapshot is recorded as the progress of its day.
+    """
+
+    def __init__(self, source=None, compact=False, interval=DEFAULT_REFRESH_INTERVAL, changes=None, history=None):
+        self.source = source
+        self.compact = compact
+        self.interval = interval
+        self.changes = ChangeLog(changes) if changes else None
+        self.history = history
+        self.last_error = None
+        self._failed_version = None
+        self._static_df = None
+        self._base_version = None
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        """The current snapshot (always fully built)"""
+        return self._snapshot
+
+    def start(self):
+        """Build the first snapshot synchronously, then start polling"""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name='project-data-refresher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self, force=False):
+        """
+        Build and swap in a new snapshot if the source or the date changed
+
+        Returns True when a new snapshot was swapped in.
+        """
+        with self._refresh_lock:
+            snapshot = self._rebuild(force)
+            if self.changes is not None:
+                events = self.changes.read_new()
+                if events:
+                    version = f"{self._base_version}+{self.changes.read_offset}"
+                    snapshot = (snapshot or self._snapshot).with_changes(events, version, self.compact)
+                    # Keep the changes when the date-dependent columns are re-derived
+                    self._static_df = snapshot.df
+                self.changes.commit()
+
+            if snapshot is None:
+                return False
+            self._snapshot = snapshot
+            self.last_error = None
+            logger.info("Swapped in project data snapshot %s", snapshot.version)
+            self._record_history(snapshot)
+            return True
+
+    def _record_history(self, snapshot):
+        """Record a snapshot in the progress history; a failure never fails the refresh"""
+        if self.history is None:
+            return
+        try:
+            self.history.record(snapshot.df, snapshot.data_date)
+        except Exception:
+            logger.exception("Could not record project data snapshot %s in the progress history", snapshot.version)
+
+    def _rebuild(self, force=False):
+        """Build a snapshot from the source if it or the date changed, else None"""
+        current = self._snapshot
+        today = date.today()
+        try:
+            source_version = source_signature(self.source)
+        except OSError as exc:
+            if current is None:
+                raise
+            if self._failed_version != UNREADABLE_SOURCE:
+                logger.warning("Cannot read project data source (%s); keeping snapshot %s", exc, current.version)
+            self._failed_version = UNREADABLE_SOURCE
+            self.last_error = exc
+            return self._new_day(today)
+
+        source_changed = current is None or current.source_version != source_version
+        if not (force or source_changed or current.data_date != today):
+            return None
+        if not force and source_version == self._failed_version:
+            return self._new_day(today)
+
+        # Re-parse only when the source itself changed
+        if force or source_changed or self._static_df is None:
+            try:
+                self._static_df = load_parsed_project_data(self.source, self.compact)
+            except Exception:
+                self._failed_version = source_version
+                raise
+            if self.changes is not None:
+                self.changes.reset()
+
+        return self._derive(source_version, today, source_as_of(self.source))
+
+    def _new_day(self, today):
+        """
+        The current rows re-derived for `today` when the date has changed, else None
+
+        Used while the source cannot be parsed, so the date-dependent columns
+        never go stale.
+        """
+        current = self._snapshot
+        if current.data_date == today or self._static_df is None:
+            return None
+        return self._derive(current.source_version, today, current.as_of)
+
+    def _derive(self, source_version, today, as_of):
+        """A snapshot of the parsed rows with their date-dependent columns for `today`"""
+        df = derive_date_columns(self._static_df, source_version, today, self.compact)
+        self._base_version = data_version(df)
+        if self.changes is not None and self.changes.offset:
+            df.attrs['data_version'] = f"{self._base_version}+{self.changes.offset}"
+        return Snapshot(df, source_version, today, as_of)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as exc:
+                self.last_error = exc
+                logger.exception("Project data refresh failed; keeping the previous snapshot")
+
+
+def refresh_interval():
+    """Polling interval configured through the environment, in seconds"""
+    return float(os.environ.get(REFRESH_INTERVAL_ENV, DEFAULT_REFRESH_INTERVAL))
+
+
+@st.cache_resource
+def get_project_refresher(source=None, compact=None):
+    """The snapshot refresher of this server, started on first use"""
+    if source is None:
+        source = configured_source()
+    if compact is None:
+        compact = compact_schema_enabled()
+    return SnapshotRefresher(
+        source, compact, refresh_interval(), configured_change_log(), configured_history_store()
+    ).start()
@@ -0,0 +1,59 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from timeline import STATUS_COLORS
+
+# Time circle class of each timeline status color, in STATUS_COLORS order
+TIME_CIRCLE_CLASSES = ['time-red', 'time-orange', 'time-green', 'time-closed']
+
+# Progress bar classes: on track, behind and far behind the remaining time
+PROGRESS_CLASSES = ['', 'progress-orange', 'progress-red']
+
+# Number of avatar background colors defined in the CSS (avatar-0 ... avatar-6)
+AVATAR_COLOR_COUNT = 7
+
+# Columns the projects table reads instead of working them out per row
+RENDER_COLUMNS = ['time_class', 'progress_class', 'manager_initials', 'avatar_color']
+
+
+def avatar_color(name):
+    """Avatar color index of a manager, the same in every process and release"""
+    return zlib.crc32(name.encode('utf-8')) % AVATAR_COLOR_COUNT
+
+
+def manager_initials(name):
+    return name[:1].upper()
+
+
+def derive_render_attributes(df):
+    """
+    Add the RENDER_COLUMNS to a derived projects frame
+
+    The time circle class follows the timeline status color, the progress
+    bar turns orange or red when progress lags the remaining time, and the
+    avatar initials and color are worked out once per distinct manager.
+    All four are categoricals; the frame is modified in place and returned.
+    """
+    status_codes = pd.Categorical(df['status_color'], categories=STATUS_COLORS).codes
+    df['time_class'] = pd.Categorical.from_codes(status_codes, categories=TIME_CIRCLE_CLASSES)
+
+    closed = np.asarray(df['status'] == 'Closed', dtype=bool)
+    remaining = df['remaining_time_pct'].to_numpy(dtype='float64', na_value=np.nan)
+    progress = df['progress_pct'].to_numpy(dtype='float64', na_value=np.nan)
+    progress_codes = np.select(
+        [closed, (remaining < 30) & (progress < 70), (remaining < 60) & (progress < 50)],
+        [0, 2, 1],
+        default=0
+    )
+    df['progress_class'] = pd.Categorical.from_codes(progress_codes.astype('int8'), categories=PROGRESS_CLASSES)
+
+    # Codes per manager, looked up through the manager codes of the rows
+    managers = pd.Categorical(df['project_manager'].astype(str))
+    names = managers.categories
+    initials = pd.Categorical([manager_initials(name) for name in names])
+    df['manager_initials'] = pd.Categorical.from_codes(initials.codes[managers.codes], categories=initials.categories)
+    colors = np.asarray([avatar_color(name) for name in names], dtype='int8')
+    df['avatar_color'] = pd.Categorical.from_codes(colors[managers.codes], categories=range(AVATAR_COLOR_COUNT))
+    return df
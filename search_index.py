@@ -0,0 +1,186 @@
+import copy
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from filter_index import EMPTY_POSITIONS, changed_values
+
+# Columns the search box matches against
+SEARCH_COLUMNS = ['project_name', 'project_manager', 'donor']
+
+# Share of the query's trigrams a value must contain to match; below 1 a
+# value still matches with a typo or two in a longer query
+SEARCH_MIN_SCORE = 0.6
+
+# Score added to values that contain the query as typed (after normalizing)
+EXACT_MATCH_BONUS = 1.0
+
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """Case-folded words of a text separated by single spaces"""
+    return NON_WORD.sub(' ', str(text).casefold()).strip()
+
+
+def trigrams(text):
+    """Distinct trigrams of the words of a normalized text, each padded with spaces"""
+    grams = set()
+    for word in text.split():
+        padded = f' {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def query_trigrams(text):
+    """
+    Trigrams of a normalized search query
+
+    The last word may still be being typed, so it is matched as a prefix
+    (no trailing padding); a query needs two characters to match at all.
+    """
+    words = text.split()
+    if not words:
+        return set()
+    grams = trigrams(' '.join(words[:-1]))
+    padded = f' {words[-1]}'
+    grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def search_text(query):
+    """
+    Normalized text of a search query, empty when it cannot match
+
+    A query without trigrams (one character, or only punctuation) is no
+    search at all rather than a search matching nothing.
+    """
+    text = normalize(query)
+    return text if query_trigrams(text) else ''
+
+
+class SearchIndex:
+    """
+    Trigram inverted index over the SEARCH_COLUMNS of a dataset
+
+    Every distinct normalized value (a term) gets an id; each trigram maps
+    to the ids of the terms containing it, and each term to the sorted row
+    positions holding it per column. A search counts the query trigrams of
+    the terms that share any, so ranking a query looks at the candidate
+    terms only and never scans the string columns.
+    """
+
+    def __init__(self, df):
+        self.terms = []
+        self.term_ids = {}
+        self.postings = defaultdict(list)
+        self.positions = {}
+        for column in SEARCH_COLUMNS:
+            table = {}
+            for value, rows in df.groupby(column, observed=True, sort=False).indices.items():
+                term = self._term_id(normalize(value))
+                rows = np.asarray(rows, dtype=np.intp)
+                table[term] = rows if term not in table else np.union1d(table[term], rows)
+            self.positions[column] = table
+        self.postings = {gram: np.asarray(ids, dtype=np.intp) for gram, ids in self.postings.items()}
+
+    def _term_id(self, term):
+        """Id of a normalized term, registering it and its trigrams when new"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            for gram in trigrams(term):
+                self.postings[gram].append(term_id)
+        return term_id
+
+    def term_scores(self, query):
+        """Ids and scores of the terms matching a query, best first"""
+        text = normalize(query)
+        grams = query_trigrams(text)
+        ids = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not ids:
+            return EMPTY_POSITIONS, np.empty(0)
+
+        # Share of the query trigrams found in each candidate term
+        counts = np.bincount(np.concatenate(ids), minlength=len(self.terms))
+        candidates = np.flatnonzero(counts >= SEARCH_MIN_SCORE * len(grams))
+        scores = counts[candidates] / len(grams)
+        scores += EXACT_MATCH_BONUS * np.fromiter(
+            (text in self.terms[term] for term in candidates), dtype=bool, count=len(candidates)
+        )
+        order = np.argsort(-scores, kind='stable')
+        return candidates[order], scores[order]
+
+    def search(self, query):
+        """
+        Row positions matching a query, best match first
+
+        A row scores as its best matching value in any SEARCH_COLUMN.
+        Returns an empty array when nothing matches.
+        """
+        terms, _ = self.term_scores(query)
+        rows = [
+            table[term]
+            for term in terms.tolist()
+            for table in self.positions.values()
+            if term in table
+        ]
+        if not rows:
+            return EMPTY_POSITIONS
+
+        # Terms come best first, so a row's first occurrence is its best score
+        rows = np.concatenate(rows)
+        unique_rows, first = np.unique(rows, return_index=True)
+        return unique_rows[np.argsort(first, kind='stable')]
+
+    def filter_positions(self, positions, query):
+        """
+        Intersect filter positions (None for all rows) with the matches of a query
+
+        The result keeps the match order, best first.
+        """
+        matches = self.search(query)
+        if positions is None:
+            return matches
+        return matches[np.isin(matches, positions, assume_unique=True)]
+
+    def updated(self, before, after):
+        """
+        Return a copy of the index with changed and appended rows moved
+
+        `before` and `after` are the old and new values of the affected rows,
+        as for FilterIndex.updated. New terms get new ids and trigram
+        postings; this index is left untouched for concurrent readers.
+        """
+        index = copy.copy(self)
+        index.terms = list(self.terms)
+        index.term_ids = dict(self.term_ids)
+        index.postings = defaultdict(list)
+        index.positions = {}
+        for column in SEARCH_COLUMNS:
+            removals = defaultdict(list)
+            additions = defaultdict(list)
+            for position, old, new in changed_values(before, after, column):
+                if old is not None:
+                    removals[self.term_ids[normalize(old)]].append(position)
+                if new is not None:
+                    additions[index._term_id(normalize(new))].append(position)
+
+            table = dict(self.positions[column])
+            for term, rows in removals.items():
+                remaining = np.setdiff1d(table[term], rows, assume_unique=True)
+                if len(remaining):
+                    table[term] = remaining
+                else:
+                    del table[term]
+            for term, rows in additions.items():
+                table[term] = np.union1d(table.get(term, EMPTY_POSITIONS), np.asarray(rows, dtype=np.intp))
+            index.positions[column] = table
+
+        postings = dict(self.postings)
+        for gram, ids in index.postings.items():
+            postings[gram] = np.concatenate([postings.get(gram, EMPTY_POSITIONS), np.asarray(ids, dtype=np.intp)])
+        index.postings = postings
+        return index
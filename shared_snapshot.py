@@ -0,0 +1,267 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import streamlit as st
+
+from changes import configured_change_log
+from data import compact_schema_enabled
+from history import configured_history_store
+from refresher import Snapshot, SnapshotRefresher, get_project_refresher, refresh_interval
+from sources import arrow_frame, configured_source
+
+logger = logging.getLogger(__name__)
+
+# Environment variable pointing at the directory of the shared snapshot
+SHARED_SNAPSHOT_ENV = 'PM_DASHBOARD_SHARED_SNAPSHOT'
+
+# File naming the current snapshot generation
+CURRENT_FILE = 'CURRENT'
+
+# Schema metadata key holding the snapshot details
+SNAPSHOT_METADATA_KEY = b'pm_dashboard_snapshot'
+
+# Published generations kept besides the current one
+SNAPSHOT_KEEP = 2
+
+# How often a worker checks for a new generation, and how long it waits for the first one (seconds)
+SHARED_CHECK_INTERVAL = 1.0
+SHARED_WAIT_TIMEOUT = 60.0
+
+
+def configured_shared_dir():
+    """Return the shared snapshot directory configured through the environment, if any"""
+    return os.environ.get(SHARED_SNAPSHOT_ENV) or None
+
+
+def snapshot_path(directory, generation):
+    return Path(directory) / f"snapshot-{generation:08d}.arrow"
+
+
+def current_generation(directory):
+    """The current generation number of a shared snapshot directory (0 if none yet)"""
+    try:
+        with open(Path(directory) / CURRENT_FILE) as file:
+            return int(json.load(file)['generation'])
+    except FileNotFoundError:
+        return 0
+
+
+def write_atomic(path, write):
+    """Call `write(temp_path)` and rename the result to `path`"""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def publish_snapshot(directory, snapshot):
+    """
+    Write a snapshot as the next generation of a shared snapshot directory
+
+    The frame is written as an uncompressed Arrow IPC file that workers
+    memory-map; the CURRENT file is switched to it last, so workers only
+    ever see complete generations. Returns the new generation number.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = current_generation(directory) + 1
+
+    # A single record batch, so every column maps as one contiguous buffer
+    table = pa.Table.from_pandas(snapshot.df, preserve_index=False).combine_chunks()
+    details = {
+        'version': snapshot.version,
+        'source_version': snapshot.source_version,
+        'data_date': snapshot.data_date.isoformat(),
+        'as_of': snapshot.as_of.isoformat(),
+    }
+    table = table.replace_schema_metadata({**table.schema.metadata, SNAPSHOT_METADATA_KEY: json.dumps(details)})
+    path = snapshot_path(directory, generation)
+    write_atomic(path, lambda temp_path: feather.write_feather(
+        table, temp_path, compression='uncompressed', chunksize=max(table.num_rows, 1)
+    ))
+
+    current = {'generation': generation, 'file': path.name, 'version': snapshot.version}
+    write_atomic(directory / CURRENT_FILE, lambda temp_path: Path(temp_path).write_text(json.dumps(current)))
+
+    # Workers still mapping an old generation keep it alive after the unlink
+    for old in sorted(directory.glob('snapshot-*.arrow'))[:-(SNAPSHOT_KEEP + 1)]:
+        try:
+            old.unlink()
+        except OSError:
+            logger.warning("Could not remove old shared snapshot %s", old)
+
+    logger.info("Published shared snapshot generation %d (%s)", generation, snapshot.version)
+    return generation
+
+
+def frame_from_table(table):
+    """
+    Convert a memory-mapped Arrow table to pandas without copying where possible
+
+    Fixed-width columns without nulls become read-only NumPy views of the
+    mapped buffers and string columns stay Arrow-backed (see
+    sources.arrow_frame); only the remaining columns (categoricals, nullable
+    integers) are converted.
+    """
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if column.num_chunks == 1 and column.null_count == 0 and (
+            pa.types.is_integer(column.type) or pa.types.is_floating(column.type) or pa.types.is_timestamp(column.type)
+        ):
+            columns[name] = pd.Series(column.chunk(0).to_numpy(zero_copy_only=True), name=name, copy=False)
+        else:
+            columns[name] = arrow_frame(table.select([name]))[name]
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_snapshot(directory, generation):
+    """Map one generation of a shared snapshot directory read-only as a Snapshot"""
+    with pa.memory_map(str(snapshot_path(directory, generation))) as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    details = json.loads(table.schema.metadata[SNAPSHOT_METADATA_KEY])
+    df = frame_from_table(table)
+    df.attrs['data_version'] = details['version']
+    return Snapshot(
+        df,
+        details['source_version'],
+        date.fromisoformat(details['data_date']),
+        datetime.fromisoformat(details['as_of']),
+    )
+
+
+class SharedSnapshotReader:
+    """
+    Serves the snapshot published to a shared directory by the loader process
+
+    Every worker maps the same Arrow file instead of holding its own copy of
+    the data. At most every `interval` seconds the CURRENT generation is
+    checked; a new one is mapped and swapped in, while requests keep using
+    the previous snapshot until it is ready. Only the first request waits,
+    for the first generation.
+    """
+
+    def __init__(self, directory, interval=SHARED_CHECK_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.generation = 0
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._checking = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def snapshot(self):
+        if time.monotonic() - self._checked_at >= self.interval:
+            self.check()
+        if self._snapshot is None and not self._ready.wait(SHARED_WAIT_TIMEOUT):
+            raise RuntimeError(f"No shared snapshot could be mapped from '{self.directory}'")
+        return self._snapshot
+
+    def check(self):
+        """
+        Swap in the current generation if it is newer than ours
+
+        One caller at a time checks; the others return at once. The new
+        generation is mapped and its index, facets and cube are built
+        without holding the lock, which only guards the reference swap.
+        """
+        with self._lock:
+            if self._checking:
+                return
+            self._checking = True
+            self._checked_at = time.monotonic()
+        try:
+            generation = current_generation(self.directory)
+            if self._snapshot is None:
+                generation = self.wait_for_first(generation)
+            if generation != self.generation:
+                snapshot = read_snapshot(self.directory, generation)
+                with self._lock:
+                    self._snapshot = snapshot
+                    self.generation = generation
+                self._ready.set()
+                logger.info("Mapped shared snapshot generation %d (%s)", generation, snapshot.version)
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def wait_for_first(self, generation, timeout=SHARED_WAIT_TIMEOUT):
+        """Wait for the loader to publish a first generation"""
+        deadline = time.monotonic() + timeout
+        while generation == 0:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"No shared snapshot was published to '{self.directory}'; start the loader with "
+                    f"`{SHARED_SNAPSHOT_ENV}={self.directory} python shared_snapshot.py`"
+                )
+            time.sleep(0.5)
+            generation = current_generation(self.directory)
+        return generation
+
+
+@st.cache_resource
+def get_shared_snapshot_reader(directory):
+    """The shared snapshot reader of this worker process"""
+    return SharedSnapshotReader(directory)
+
+
+def current_snapshot():
+    """
+    The project data snapshot to serve
+
+    With PM_DASHBOARD_SHARED_SNAPSHOT set it is mapped from the shared
+    directory, otherwise this process keeps its own (see refresher.py).
+    """
+    directory = configured_shared_dir()
+    if directory is None:
+        return get_project_refresher().snapshot
+    return get_shared_snapshot_reader(directory).snapshot
+
+
+def run_loader(directory, interval):
+    """Keep the shared snapshot up to date, publishing a generation per swap"""
+    refresher = SnapshotRefresher(
+        configured_source(), compact_schema_enabled(), interval, configured_change_log(), configured_history_store()
+    )
+    refresher.refresh()
+    publish_snapshot(directory, refresher.snapshot)
+    while True:
+        time.sleep(interval)
+        try:
+            if refresher.refresh():
+                publish_snapshot(directory, refresher.snapshot)
+        except Exception:
+            logger.exception("Shared snapshot refresh failed; keeping the previous generation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load project data and publish it for the dashboard workers.")
+    parser.add_argument('--dir', default=configured_shared_dir(), help=f"shared snapshot directory (default: ${SHARED_SNAPSHOT_ENV})")
+    parser.add_argument('--interval', type=float, default=refresh_interval(), help="polling interval in seconds")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error(f"set {SHARED_SNAPSHOT_ENV} or pass --dir")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    run_loader(args.dir, args.interval)
+
+
+if __name__ == '__main__':
+    main()
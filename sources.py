@@ -0,0 +1,311 @@
+import glob
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Environment variable pointing at the project data file(s)
+DATA_PATH_ENV = 'PM_DASHBOARD_DATA'
+
+# Files of a multi-file source read at a time; Arrow reads and parses
+# without holding the GIL, so threads run the files in parallel
+SOURCE_READ_THREADS = 8
+
+# Outcome of the last read of each file of a multi-file source; the
+# refresher thread writes it while the debug panel reads it, so both go
+# through the lock (see source_loads)
+SOURCE_LOADS = {}
+_source_loads_lock = threading.Lock()
+
+# Arrow-backed string dtype with NaN for missing values (pandas 3's default
+# 'str' dtype; pandas 2 names it 'pyarrow_numpy')
+try:
+    ARROW_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except TypeError:
+    ARROW_STRING_DTYPE = pd.StringDtype('pyarrow_numpy')
+
+# Columns the dashboard reads from a project source
+PROJECT_COLUMNS = [
+    'project_manager',
+    'avatar',
+    'project_name',
+    'status',
+    'budget',
+    'remaining_time_pct',
+    'start_date',
+    'end_date',
+    'progress_pct',
+]
+
+# Optional columns read when a source has them, with their fill-in when it does not
+OPTIONAL_COLUMNS = {
+    'donor': 'project_name',
+    'households_reached': 0,
+    'individuals_reached': 0,
+}
+
+# Declared Arrow types for the projected columns
+PROJECT_TYPES = {
+    'project_manager': pa.string(),
+    'avatar': pa.string(),
+    'project_name': pa.string(),
+    'status': pa.string(),
+    'budget': pa.int64(),
+    'remaining_time_pct': pa.int64(),
+    'start_date': pa.string(),
+    'end_date': pa.string(),
+    'progress_pct': pa.int64(),
+    'donor': pa.string(),
+    'households_reached': pa.int64(),
+    'individuals_reached': pa.int64(),
+}
+
+PROJECT_SCHEMA = pa.schema([(name, PROJECT_TYPES[name]) for name in PROJECT_COLUMNS + list(OPTIONAL_COLUMNS)])
+
+
+def sample_projects():
+    """Built-in sample portfolio used when no data file is configured"""
+    data = {
+        'project_manager': [
+            'Abdurrahman Salih',
+            'Abdurrahman Salih',
+            'Badr Al-Din Triyaki',
+            'Badr Al-Din Triyaki'
+        ],
+        'avatar': [
+            'avatar1.svg',
+            'avatar1.svg',
+            'avatar2.svg',
+            'avatar2.svg'
+        ],
+        'project_name': ['OCHA', 'WFP', 'GIRO', 'USAID'],
+        'status': ['Ongoing', 'Ongoing', 'Closed', 'Ongoing'],
+        'budget': [250000, 750000, 50000, 180000],
+        'remaining_time_pct': [11, 57, 0, 94],
+        'start_date': ['10/1/2024', '11/1/2024', '10/1/2024', '1/15/2025'],
+        'end_date': ['2/1/2025', '5/1/2025', '12/30/2024', '6/1/2025'],
+        'progress_pct': [93, 80, 96, 10],
+        'donor': ['OCHA', 'WFP', 'GIRO', 'USAID'],
+        'households_reached': [210, 160, 98, 230],
+        'individuals_reached': [1050, 800, 490, 1150]
+    }
+
+    return pa.Table.from_pydict(data, schema=PROJECT_SCHEMA)
+
+
+def projected_columns(path, available):
+    """
+    Return the columns to read from a source file with the given columns
+
+    Raises a ValueError if the file lacks any of PROJECT_COLUMNS.
+    """
+    missing = [name for name in PROJECT_COLUMNS if name not in available]
+    if missing:
+        raise ValueError(f"Project data file '{Path(path).name}' is missing required columns: {', '.join(missing)}")
+    return PROJECT_COLUMNS + [name for name in OPTIONAL_COLUMNS if name in available]
+
+
+def read_parquet_source(path):
+    """Read the projected columns from a Parquet file"""
+    columns = projected_columns(path, pq.read_schema(path).names)
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_arrow_source(path):
+    """Read the projected columns from an Arrow IPC / Feather file"""
+    with pa.memory_map(str(path)) as source:
+        columns = projected_columns(path, pa.ipc.open_file(source).schema.names)
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def read_csv_source(path):
+    """Read the projected columns from a CSV file"""
+    columns = projected_columns(path, pa_csv.open_csv(path).schema.names)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types={name: PROJECT_TYPES[name] for name in columns},
+    )
+    return pa_csv.read_csv(path, convert_options=convert_options)
+
+
+# Source readers keyed by file extension
+SOURCE_READERS = {
+    '.parquet': read_parquet_source,
+    '.pq': read_parquet_source,
+    '.arrow': read_arrow_source,
+    '.feather': read_arrow_source,
+    '.ipc': read_arrow_source,
+    '.csv': read_csv_source,
+}
+
+
+def fill_optional_columns(table):
+    """Add the OPTIONAL_COLUMNS a source table lacks with their fill-in values"""
+    for name, fill in OPTIONAL_COLUMNS.items():
+        if name in table.column_names:
+            continue
+        if fill in table.column_names:
+            column = table.column(fill)
+        else:
+            column = pa.repeat(pa.scalar(fill, type=PROJECT_TYPES[name]), table.num_rows)
+        table = table.append_column(name, column)
+    return table
+
+
+def configured_source():
+    """
+    Return the data source configured through the environment, if any
+
+    PM_DASHBOARD_DATA holds a file path, or several separated by os.pathsep
+    (':' on Unix), each of which may be a glob pattern. Several files are
+    returned as a tuple of paths and loaded together (see read_projects).
+    """
+    value = os.environ.get(DATA_PATH_ENV)
+    if not value:
+        return None
+    paths = []
+    for entry in filter(None, value.split(os.pathsep)):
+        paths.extend(sorted(glob.glob(entry)) if glob.has_magic(entry) else [entry])
+    if not paths:
+        raise ValueError(f"{DATA_PATH_ENV}='{value}' matches no project data files")
+    return paths[0] if len(paths) == 1 else tuple(paths)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def source_signature(source=None):
+    """
+    Identify a revision of a data source by its path, size and modification time
+
+    A multi-file source combines the signatures of its files; a file that
+    cannot be found counts as a revision of its own, so it is retried once
+    it appears.
+    """
+    if source is None:
+        return 'sample'
+    if not isinstance(source, tuple):
+        return file_signature(source)
+    signatures = []
+    for path in source:
+        try:
+            signatures.append(file_signature(path))
+        except OSError:
+            signatures.append(f"{os.path.abspath(path)}:missing")
+    return '|'.join(signatures)
+
+
+def string_dtype(arrow_type):
+    """types_mapper for Table.to_pandas keeping string columns Arrow-backed"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return ARROW_STRING_DTYPE
+    return None
+
+
+def arrow_frame(table):
+    """
+    Convert an Arrow table to a pandas DataFrame
+
+    String columns keep the table's buffers instead of being copied into
+    Python string objects, so strings read from a memory-mapped file stay
+    mapped. Other columns are converted to their usual numpy types.
+    """
+    return table.to_pandas(types_mapper=string_dtype)
+
+
+def read_source_table(source):
+    """Read one source file as an Arrow table in PROJECT_SCHEMA"""
+    path = Path(source)
+    reader = SOURCE_READERS.get(path.suffix.lower())
+    if reader is None:
+        supported = ', '.join(sorted(SOURCE_READERS))
+        raise ValueError(f"Unsupported project data file '{path.name}' (expected one of: {supported})")
+
+    return fill_optional_columns(reader(path)).select(PROJECT_SCHEMA.names).cast(PROJECT_SCHEMA)
+
+
+def timed_source_read(path):
+    """Read one file of a multi-file source; returns (table or None, load details)"""
+    started = time.perf_counter()
+    try:
+        table, error = read_source_table(path), None
+    except Exception as exc:
+        table, error = None, f"{type(exc).__name__}: {exc}"
+    return table, {
+        'rows': 0 if table is None else table.num_rows,
+        'ms': round((time.perf_counter() - started) * 1000, 2),
+        'error': error,
+    }
+
+
+def read_source_tables(paths, threads=SOURCE_READ_THREADS):
+    """
+    Read the files of a multi-file source concurrently
+
+    A file that cannot be read is logged and left out, so one bad export
+    does not hold back the others. Returns the tables that were read, in
+    `paths` order, and the paths that failed. Raises a ValueError when no
+    file could be read at all.
+    """
+    with ThreadPoolExecutor(max(min(threads, len(paths)), 1)) as pool:
+        results = list(pool.map(timed_source_read, paths))
+
+    with _source_loads_lock:
+        SOURCE_LOADS.update((str(path), load) for path, (_, load) in zip(paths, results))
+
+    tables, failed = [], []
+    for path, (table, load) in zip(paths, results):
+        if table is None:
+            failed.append(str(path))
+            logger.error("Skipping project data file %s: %s", path, load['error'])
+        else:
+            tables.append(table)
+            logger.info("Read %d projects from %s in %.1f ms", load['rows'], path, load['ms'])
+    if not tables:
+        raise ValueError(f"None of the project data files could be read: {', '.join(failed)}")
+    return tables, failed
+
+
+def source_loads():
+    """A copy of the last read outcome of each source file, safe to iterate"""
+    with _source_loads_lock:
+        return dict(SOURCE_LOADS)
+
+
+def read_projects(source=None):
+    """
+    Read project rows from a data source as a pandas DataFrame
+
+    `source` is a path to a Parquet, Arrow/Feather or CSV file, or a tuple
+    of such paths. When it is None the built-in sample portfolio is
+    returned. Only PROJECT_COLUMNS and the OPTIONAL_COLUMNS present in a
+    file are read; missing optional columns are filled in and everything is
+    cast to the declared types.
+
+    The files of a multi-file source are read in parallel and their tables
+    concatenated without copying (each becomes a chunk of the combined
+    columns), so the conversion to pandas (see arrow_frame) is the only copy. The paths of
+    files that failed are listed in the frame's attrs['failed_sources'].
+    """
+    if source is None:
+        return arrow_frame(sample_projects())
+    if not isinstance(source, tuple):
+        return arrow_frame(read_source_table(source))
+
+    tables, failed = read_source_tables(source)
+    df = arrow_frame(pa.concat_tables(tables))
+    df.attrs['failed_sources'] = failed
+    return df
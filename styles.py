@@ -0,0 +1,425 @@
+# Page-wide CSS of the dashboard, sent once per session (see app.py)
+DASHBOARD_CSS = """
+<style>
+    /* Global styles */
+    .main {
+        padding-top: 0;
+        background-color: #f7f9fc;
+    }
+    .block-container {
+        padding-top: 1rem;
+        padding-bottom: 0;
+        max-width: 1300px;
+    }
+    
+    /* Streamlit element adjustments */
+    .stProgress > div > div > div {
+        height: 15px;
+    }
+    div[data-testid="stSidebarUserContent"] {
+        padding-top: 1.5rem;
+        background-color: #0A2463;
+        color: white;
+    }
+    div[data-testid="stSidebar"] {
+        background-color: #0A2463;
+    }
+    /* Custom styling for dropdown labels */
+    section[data-testid="stSidebar"] label {
+        color: white !important;
+    }
+    /* Dropdown styling */
+    section[data-testid="stSidebar"] div[data-baseweb="select"] div[data-testid="stMarkdownContainer"] {
+        color: white !important;
+    }
+    /* Dropdown value when not focused */
+    section[data-testid="stSidebar"] div[data-baseweb="select"] div[role="combobox"] {
+        color: black !important;
+        background-color: white !important;
+        border-radius: 4px !important;
+    }
+    /* Dropdown options in dropdown menu */
+    div[data-baseweb="popover"] div[role="listbox"] li {
+        color: black !important;
+    }
+    /* Dropdown option when selected */
+    div[data-baseweb="popover"] div[role="listbox"] li[aria-selected="true"] {
+        background-color: #e6f0ff !important;
+    }
+    /* Dropdown button styling */
+    button[kind="primaryFormSubmit"] {
+        background-color: #1E5AF5 !important;
+        border-radius: 4px !important;
+    }
+    /* Header colors in sidebar */
+    section[data-testid="stSidebar"] div[data-testid="stMarkdownContainer"] strong {
+        color: white !important;
+    }
+    
+    /* Status badges */
+    .status-badge {
+        border-radius: 20px;
+        padding: 0.25rem 0.7rem;
+        color: white;
+        font-size: 0.8rem;
+        font-weight: 500;
+        display: inline-block;
+        min-width: 80px;
+        text-align: center;
+    }
+    .ongoing-red {
+        background-color: #FF5252;
+    }
+    .ongoing-orange {
+        background-color: #FFA726;
+    }
+    .ongoing-green {
+        background-color: #66BB6A;
+    }
+    .closed {
+        background-color: #212121;
+    }
+    
+    /* Progress elements */
+    .progress-track {
+        position: relative;
+        height: 8px;
+        width: 100%;
+        background-color: #eaecef;
+        border-radius: 20px;
+        overflow: hidden;
+    }
+    .progress-fill {
+        height: 100%;
+        background-color: #0A2463;
+        border-radius: 20px;
+    }
+    .progress-fill.progress-red {
+        background-color: #FF5252;
+    }
+    .progress-fill.progress-orange {
+        background-color: #FFA726;
+    }
+    .progress-text {
+        position: absolute;
+        right: 0;
+        top: -18px;
+        font-size: 12px;
+        color: #555;
+        font-weight: 500;
+    }
+    
+    /* Header and title elements */
+    .dashboard-header {
+        background: linear-gradient(90deg, #164092 0%, #3366CC 100%);
+        color: white;
+        padding: 20px;
+        border-radius: 8px;
+        margin-bottom: 20px;
+        display: flex;
+        align-items: center;
+        justify-content: space-between;
+        box-shadow: 0 4px 12px rgba(10, 36, 99, 0.15);
+    }
+    .dashboard-title {
+        font-size: 24px;
+        font-weight: 600;
+        margin: 0;
+    }
+    .dashboard-subtitle {
+        font-size: 14px;
+        opacity: 0.8;
+        margin: 5px 0 0 0;
+    }
+    .header-right {
+        display: flex;
+        align-items: center;
+    }
+    .date-display {
+        background: rgba(255, 255, 255, 0.2);
+        padding: 8px 15px;
+        border-radius: 20px;
+        font-size: 14px;
+        display: flex;
+        align-items: center;
+    }
+    
+    /* Sidebar elements */
+    .sidebar-icon {
+        font-size: 1.5rem;
+        color: white;
+        margin-bottom: 0.5rem;
+        text-align: center;
+    }
+    .sidebar-title {
+        text-align: center;
+        color: white;
+        margin-bottom: 1.5rem;
+        font-weight: 600;
+        font-size: 1.1rem;
+    }
+    
+    /* Metric cards */
+    .metric-card {
+        background-color: white;
+        padding: 1.2rem;
+        border-radius: 8px;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
+        text-align: center;
+        transition: transform 0.2s ease, box-shadow 0.2s ease;
+        height: 200px;
+        display: flex;
+        flex-direction: column;
+        justify-content: center;
+        align-items: center;
+        width: 100%;
+    }
+    .metric-card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.12);
+    }
+    .metric-value {
+        font-size: 2.2rem;
+        font-weight: bold;
+        color: #0A2463;
+        margin: 10px 0;
+        line-height: 1;
+    }
+    .metric-label {
+        font-size: 0.9rem;
+        color: #666;
+        margin-top: 5px;
+    }
+    .metric-icon {
+        font-size: 2.2rem;
+        color: #1E5AF5;
+        margin-bottom: 5px;
+    }
+    
+    /* Avatar and user elements */
+    .avatar-img {
+        border-radius: 50%;
+        width: 32px;
+        height: 32px;
+        flex-shrink: 0;
+        margin-right: 10px;
+        background-color: #e5e9f2;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 14px;
+        font-weight: 500;
+        color: white;
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+    }
+    .avatar-0 { background-color: #4285F4; }
+    .avatar-1 { background-color: #EA4335; }
+    .avatar-2 { background-color: #FBBC05; }
+    .avatar-3 { background-color: #34A853; }
+    .avatar-4 { background-color: #8523FA; }
+    .avatar-5 { background-color: #20C997; }
+    .avatar-6 { background-color: #9B59B6; }
+    .avatar-container {
+        display: flex;
+        align-items: center;
+    }
+    .manager-name {
+        font-weight: 500;
+    }
+    
+    /* Project table elements */
+    .project-row, .column-headers {
+        display: grid;
+        grid-template-columns: 1.5fr 1fr 0.8fr 0.8fr 0.8fr 0.8fr 0.8fr 1.5fr;
+        gap: 10px;
+    }
+    .with-trend .project-row, .with-trend .column-headers {
+        grid-template-columns: 1.5fr 1fr 0.8fr 0.8fr 0.8fr 0.8fr 0.8fr 1.5fr 0.9fr;
+    }
+    .trend-cell {
+        display: flex;
+        align-items: center;
+    }
+    .sparkline polyline {
+        fill: none;
+        stroke: #1E5AF5;
+        stroke-width: 1.5;
+    }
+    .sparkline-slipping polyline {
+        stroke: #FF5252;
+    }
+    .project-row {
+        padding: 14px 10px;
+        border-bottom: 1px solid #f0f0f0;
+        border-radius: 4px;
+        transition: background-color 0.15s ease;
+        align-items: center;
+    }
+    .project-row:hover {
+        background-color: #f5f8ff;
+    }
+    .time-circle {
+        width: 40px;
+        height: 40px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 0.8rem;
+        font-weight: bold;
+        color: white;
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+        margin: 0 auto;
+    }
+    .time-closed {
+        background-color: #212121;
+    }
+    .time-green {
+        background-color: #66BB6A;
+    }
+    .time-orange {
+        background-color: #FFA726;
+    }
+    .time-red {
+        background-color: #FF5252;
+    }
+    
+    /* Table layout */
+    .projects-table {
+        margin-top: 1.5rem;
+        background-color: white;
+        padding: 1.5rem;
+        border-radius: 8px;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
+    }
+    .table-header {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-bottom: 15px;
+    }
+    .column-headers {
+        font-weight: 600;
+        border-bottom: 2px solid #eaeef2;
+        padding-bottom: 12px;
+        color: #0A2463;
+    }
+    .projects-overview-title {
+        font-size: 1.5rem;
+        font-weight: 600;
+        color: #0A2463;
+        margin: 0;
+    }
+    .cell-center {
+        text-align: center;
+    }
+    .cell-right {
+        text-align: right;
+    }
+    .project-name-cell {
+        font-weight: 500;
+        color: #0A2463;
+    }
+    .budget-cell {
+        text-align: right;
+        font-weight: 500;
+    }
+    .date-cell {
+        color: #555;
+    }
+    .table-empty {
+        padding: 30px 0;
+        text-align: center;
+        color: #666;
+        font-size: 0.9rem;
+    }
+    .table-empty-icon {
+        font-size: 3rem;
+        margin-bottom: 10px;
+    }
+    .table-empty-title {
+        font-weight: 500;
+        font-size: 1rem;
+        margin-bottom: 5px;
+    }
+    
+    /* Legend and color definitions */
+    .color-definition-container {
+        background-color: white;
+        padding: 10px 15px;
+        border-radius: 8px;
+        margin: 15px 0;
+        font-size: 0.85rem;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
+    }
+    .color-definition-title {
+        font-weight: 600;
+        margin-bottom: 5px;
+        color: #0A2463;
+    }
+    .color-definition {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 15px;
+    }
+    .color-item {
+        display: flex;
+        align-items: center;
+    }
+    .color-dot {
+        width: 12px;
+        height: 12px;
+        border-radius: 50%;
+        margin-right: 6px;
+    }
+    .red-text, .red-dot {
+        color: #FF5252;
+        background-color: #FF5252;
+    }
+    .orange-text, .orange-dot {
+        color: #FFA726;
+        background-color: #FFA726;
+    }
+    .green-text, .green-dot {
+        color: #66BB6A;
+        background-color: #66BB6A;
+    }
+    .black-text, .black-dot {
+        color: #212121;
+        background-color: #212121;
+    }
+    
+    /* Count cards */
+    .count-card {
+        background-color: white;
+        padding: 1.2rem;
+        border-radius: 8px;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
+        text-align: center;
+        display: flex;
+        flex-direction: column;
+        justify-content: center;
+        align-items: center;
+        height: 180px;
+        width: 100%;
+        margin-bottom: 15px;
+        transition: transform 0.2s ease, box-shadow 0.2s ease;
+    }
+    .count-card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.12);
+    }
+    .count-value {
+        font-size: 2.2rem;
+        font-weight: bold;
+        color: #0A2463;
+        margin: 10px 0;
+        line-height: 1;
+    }
+    .count-label {
+        font-size: 0.9rem;
+        color: #666;
+        margin-top: 5px;
+    }
+</style>
+"""
@@ -0,0 +1,141 @@
+"""
+Deterministic synthetic project portfolios
+
+Run with `python synthetic.py --rows 100000 --out projects.parquet` to write
+a portfolio in the source file layout (Parquet, Arrow/Feather or CSV by file
+extension); the same arguments always produce the same file.
+"""
+import argparse
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from sources import PROJECT_SCHEMA
+
+FIRST_NAMES = [
+    'Abdurrahman', 'Badr', 'Lina', 'Omar', 'Sara', 'Yusuf', 'Maya', 'Karim',
+    'Nour', 'Hassan', 'Leila', 'Tariq', 'Rania', 'Sami', 'Dina', 'Faris',
+]
+LAST_NAMES = [
+    'Salih', 'Triyaki', 'Haddad', 'Khalil', 'Mansour', 'Aziz', 'Nasser',
+    'Hamdan', 'Rahman', 'Saleh', 'Darwish', 'Qasim',
+]
+DONORS = ['ECHO', 'USAID', 'WFP', 'UNICEF', 'OCHA', 'GIZ', 'FCDO', 'UNHCR', 'SIDA', 'GIRO', 'JICA', 'KfW']
+SECTORS = ['Food Security', 'WASH', 'Health', 'Shelter', 'Education', 'Protection', 'Livelihoods', 'Nutrition']
+
+# Share of projects per status
+DEFAULT_STATUS_MIX = {'Ongoing': 0.7, 'Closed': 0.3}
+
+
+def zipf_weights(count, skew=1.1):
+    """Probabilities of `count` items falling off like a Zipf distribution"""
+    weights = 1 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def manager_names(count):
+    """`count` distinct manager names ('First Last', numbered past the combinations)"""
+    names = [f'{first} {last}' for last in LAST_NAMES for first in FIRST_NAMES]
+    return [
+        names[i % len(names)] + (f' {i // len(names) + 1}' if i >= len(names) else '')
+        for i in range(count)
+    ]
+
+
+def generate_portfolio(rows, managers=None, today=None, start_spread_days=3 * 365,
+                       status_mix=None, seed=0):
+    """
+    Generate a realistic project portfolio as an Arrow table in PROJECT_SCHEMA
+
+    Managers (default: one per 40 projects) and donors carry Zipf-skewed
+    workloads, budgets are log-normal, start dates spread over the
+    `start_spread_days` before `today` and durations over 3-36 months.
+    Closed projects (share set by `status_mix`) mostly ended already, and
+    progress follows the elapsed share of the project's time with noise.
+    The same arguments (including `today`) always give the same portfolio.
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today or date.today())
+    status_mix = status_mix or DEFAULT_STATUS_MIX
+    managers = manager_names(managers or max(rows // 40, 1))
+
+    manager = rng.choice(len(managers), size=rows, p=zipf_weights(len(managers), 0.8))
+    donor = rng.choice(len(DONORS), size=rows, p=zipf_weights(len(DONORS)))
+    sector = rng.integers(0, len(SECTORS), size=rows)
+    status = rng.choice(list(status_mix), size=rows, p=np.array(list(status_mix.values())) / sum(status_mix.values()))
+    closed = status == 'Closed'
+
+    duration = rng.integers(90, 1095, size=rows)
+    start_offset = rng.integers(0, start_spread_days, size=rows)
+    # Closed projects started early enough to have ended
+    start_offset = np.where(closed, np.maximum(start_offset, duration + rng.integers(0, 180, size=rows)), start_offset)
+    start = today - pd.to_timedelta(start_offset, unit='D')
+    end = start + pd.to_timedelta(duration, unit='D')
+
+    elapsed = np.clip(start_offset / duration, 0, 1)
+    remaining_pct = np.where(closed, 0, np.round((1 - elapsed) * 100)).astype('int64')
+    progress = np.where(closed, rng.integers(85, 101, size=rows), np.clip(elapsed * 100 + rng.normal(0, 12, size=rows), 0, 100))
+
+    households = np.round(rng.lognormal(5, 1, size=rows)).astype('int64')
+    individuals = households * rng.integers(4, 8, size=rows)
+    donor_names = pa.array(np.array(DONORS)[donor])
+
+    # String columns are assembled with Arrow kernels rather than per row
+    data = {
+        'project_manager': pa.array(np.array(managers)[manager]),
+        'avatar': pa.array(np.array([f'avatar{i + 1}.svg' for i in range(8)])[manager % 8]),
+        'project_name': pc.binary_join_element_wise(
+            donor_names, pa.array(np.array(SECTORS)[sector]), pa.array(np.arange(1, rows + 1)).cast(pa.string()), ' '
+        ),
+        'status': pa.array(status),
+        'budget': np.round(rng.lognormal(12, 1, size=rows), -2).astype('int64'),
+        'remaining_time_pct': remaining_pct,
+        'start_date': pc.strftime(pa.array(start), format='%m/%d/%Y'),
+        'end_date': pc.strftime(pa.array(end), format='%m/%d/%Y'),
+        'progress_pct': np.round(progress).astype('int64'),
+        'donor': donor_names,
+        'households_reached': households,
+        'individuals_reached': individuals,
+    }
+    return pa.Table.from_pydict(data, schema=PROJECT_SCHEMA)
+
+
+def write_portfolio(table, path):
+    """Write a portfolio table as Parquet, Arrow/Feather or CSV by file extension"""
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.parquet', '.pq'):
+        pq.write_table(table, path)
+    elif suffix in ('.arrow', '.feather', '.ipc'):
+        feather.write_feather(table, path)
+    elif suffix == '.csv':
+        pa_csv.write_csv(table, path)
+    else:
+        raise ValueError(f"Unsupported portfolio file '{Path(path).name}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--managers', type=int, default=None, help="number of managers (default: rows / 40)")
+    parser.add_argument('--spread-days', type=int, default=3 * 365, help="days over which start dates spread")
+    parser.add_argument('--closed-share', type=float, default=DEFAULT_STATUS_MIX['Closed'])
+    parser.add_argument('--today', type=date.fromisoformat, default=None, help="reference date (YYYY-MM-DD)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    status_mix = {'Ongoing': 1 - args.closed_share, 'Closed': args.closed_share}
+    table = generate_portfolio(args.rows, args.managers, args.today, args.spread_days, status_mix, args.seed)
+    write_portfolio(table, args.out)
+    print(f"Wrote {table.num_rows:,} projects to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+from datetime import date
+
+import pyarrow.parquet as pq
+import pytest
+
+from data import derive_date_columns, parse_project_data
+from synthetic import generate_portfolio
+
+# Day the test portfolios are generated and derived for
+TODAY = date(2025, 6, 1)
+
+
+def derived_projects(path, compact=False):
+    """Parse and derive a project source as the dashboard does, without the caches"""
+    return derive_date_columns(parse_project_data(path, compact), 'test', TODAY, compact)
+
+
+@pytest.fixture(autouse=True)
+def frame_cache_dir(tmp_path, monkeypatch):
+    """Keep the on-disk frame cache of each test in its own directory"""
+    directory = tmp_path / 'frame-cache'
+    monkeypatch.setenv('PM_DASHBOARD_CACHE_DIR', str(directory))
+    return directory
+
+
+@pytest.fixture
+def portfolio_path(tmp_path):
+    """A generated 500-project portfolio written as Parquet"""
+    path = tmp_path / 'portfolio.parquet'
+    pq.write_table(generate_portfolio(500, today=TODAY, seed=7), path)
+    return path
+
+
+@pytest.fixture(params=[False, True], ids=['standard', 'compact'])
+def projects(request, portfolio_path):
+    """The derived portfolio frame, in the standard and the compact schema"""
+    return derived_projects(portfolio_path, compact=request.param)
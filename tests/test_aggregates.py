@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import CURRENT_YEAR, EARLIER, PREVIOUS_YEAR, RollupCube, start_periods, summarize, summarize_by
+from conftest import TODAY
+from filter_index import FilterIndex
+from query import compute_aggregates
+
+SELECTIONS = [
+    {},
+    {'status': 'Ongoing'},
+    {'status': 'Closed', 'timeline': 'Closed'},
+    {'timeline': 'Red'},
+    {'manager': 'Nobody'},
+]
+
+
+def selections(df):
+    manager = df['project_manager'].iloc[0]
+    return SELECTIONS + [{'manager': manager}, {'manager': manager, 'timeline': 'Green'}]
+
+
+def filtered_aggregates(df, selection):
+    """The counters of a selection computed from its rows"""
+    positions = FilterIndex(df).filter_positions(selection)
+    return compute_aggregates(df if positions is None else df.take(positions))
+
+
+def test_cube_matches_aggregates_of_the_rows(projects):
+    cube = RollupCube(projects)
+
+    for selection in selections(projects):
+        assert cube.aggregates(selection) == filtered_aggregates(projects, selection)
+
+
+@pytest.mark.parametrize('column', ['status', 'project_manager'])
+def test_cube_keeps_rows_with_a_missing_dimension(projects, column):
+    df = projects.copy()
+    df.iloc[[2, 9], df.columns.get_loc(column)] = None
+
+    totals = RollupCube(df).aggregates({})
+
+    assert totals == compute_aggregates(df)
+    assert totals['row_count'] == len(df)
+    assert totals['total_budget'] == int(df['budget'].sum())
+
+
+def test_updated_cube_matches_a_rebuilt_one(projects):
+    cube = RollupCube(projects)
+    positions = [0, 4, 7]
+    before = projects.iloc[positions]
+    after = before.astype({'status': object}).assign(status='Closed', budget=np.int64(1))
+    df = projects.astype({'status': object})
+    df.iloc[positions, df.columns.get_loc('status')] = 'Closed'
+    df.iloc[positions, df.columns.get_loc('budget')] = 1
+
+    updated = cube.updated(before, after)
+
+    for selection in selections(projects):
+        assert updated.aggregates(selection) == filtered_aggregates(df, selection)
+
+
+def test_updated_cube_keeps_rows_with_a_missing_dimension(projects):
+    before = projects.iloc[[3]]
+    after = before.astype({'status': object}).assign(status=None)
+    df = projects.astype({'status': object})
+    df.iloc[3, df.columns.get_loc('status')] = None
+
+    updated = RollupCube(projects).updated(before, after)
+
+    assert updated.aggregates({}) == compute_aggregates(df)
+
+
+@pytest.fixture
+def dated():
+    """Four projects started this year, last year, earlier and not yet"""
+    return pd.DataFrame({
+        'project_manager': ['Ann', 'Ann', 'Bob', 'Bob'],
+        'project_name': ['A', 'B', 'C', 'D'],
+        'donor': ['WFP', 'UN', 'WFP', 'WFP'],
+        'budget': [100, 50, 30, 70],
+        'households_reached': [10, 5, 1, 0],
+        'individuals_reached': [20, 10, 2, 0],
+        'start_date_dt': pd.to_datetime(['2025-03-01', '2024-06-01', '2022-01-01', '2025-09-01']),
+    })
+
+
+def test_start_periods_split_by_year_before_today(dated):
+    assert start_periods(dated, TODAY).tolist() == [CURRENT_YEAR, PREVIOUS_YEAR, EARLIER, CURRENT_YEAR]
+
+
+def test_summary_totals_and_year_over_year_deltas(dated):
+    summary = summarize(dated, TODAY)
+
+    assert summary['total_budget'] == 250
+    assert summary['projects_count'] == 4
+    assert summary['households_reached'] == 16
+    assert summary['deltas']['total_budget'] == 240.0
+    assert summary['deltas']['projects_count'] == 100.0
+    assert summary['deltas']['households_reached'] == 100.0
+
+
+def test_summary_without_a_previous_year_has_no_deltas(dated):
+    summary = summarize(dated.iloc[[0, 3]], TODAY)
+
+    assert summary['total_budget'] == 170
+    assert summary['deltas'] == {key: None for key in summary['deltas']}
+
+
+def test_empty_summary():
+    summary = summarize(pd.DataFrame(columns=['budget']), TODAY)
+
+    assert summary['total_budget'] == 0
+    assert summary['deltas']['total_budget'] is None
+
+
+def test_summary_by_manager_and_donor(dated):
+    by_manager = summarize_by(dated, 'manager', TODAY)
+    by_donor = summarize_by(dated, 'donor', TODAY)
+
+    assert by_manager['total_budget'].to_dict() == {'Ann': 150, 'Bob': 100}
+    assert by_manager.loc['Ann', 'total_budget_delta'] == 100.0
+    assert math.isnan(by_manager.loc['Bob', 'total_budget_delta'])
+    assert by_donor['projects_count'].to_dict() == {'UN': 1, 'WFP': 3}
+    assert by_donor.loc['UN', 'projects_count_delta'] == -100.0
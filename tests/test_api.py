@@ -0,0 +1,118 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pyarrow as pa
+import pytest
+
+import api
+from conftest import TODAY
+from refresher import Snapshot
+
+
+@pytest.fixture
+def snapshot(projects, monkeypatch):
+    """Serve the test portfolio through the API"""
+    snapshot = Snapshot(projects, 'test', TODAY, datetime(2025, 6, 1, 8))
+    monkeypatch.setattr(api, 'current_snapshot', lambda: snapshot)
+    return snapshot
+
+
+def call(scope, messages=()):
+    """Run one ASGI call; returns the messages the app sent"""
+    incoming = list(messages)
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(api.app(scope, receive, send))
+    return sent
+
+
+def get(path, query=b'', method='GET', headers=()):
+    """Status, headers and body of an HTTP request to the API"""
+    start, body = call({
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': list(headers),
+    })
+    return start['status'], dict(start['headers']), body['body']
+
+
+def test_projects_are_filtered_and_paged(snapshot):
+    status, headers, body = get('/projects', b'status=Ongoing&fields=project_name,budget&page_size=10&sort=budget&order=desc')
+
+    result = json.loads(body)
+    ongoing = snapshot.df[snapshot.df['status'] == 'Ongoing']
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert result['total_rows'] == len(ongoing)
+    assert [row['budget'] for row in result['rows']] == sorted(ongoing['budget'], reverse=True)[:10]
+    assert set(result['rows'][0]) == {'project_name', 'budget'}
+    assert result['aggregates']['row_count'] == len(ongoing)
+
+
+def test_projects_as_arrow(snapshot):
+    status, headers, body = get('/projects', b'timeline=Red', headers=[(b'accept', b'application/vnd.apache.arrow.stream')])
+
+    table = pa.ipc.open_stream(body).read_all()
+    meta = json.loads(table.schema.metadata[b'pm_dashboard'])
+    assert status == 200
+    assert meta['total_rows'] == (snapshot.df['status_color'] == 'ongoing-red').sum()
+    assert 'time_class' not in table.column_names
+
+
+def test_summary(snapshot):
+    status, _, body = get('/summary', b'status=Closed')
+
+    result = json.loads(body)
+    assert status == 200
+    assert result['aggregates']['completed_count'] == result['aggregates']['row_count']
+    assert result['filters']['status'] == 'Closed'
+
+
+@pytest.mark.parametrize('query, message', [
+    (b'timeline=bogus', "Unknown timeline 'bogus'"),
+    (b'status=Paused', "Unknown status 'Paused'"),
+    (b'manager=Nobody', "Unknown manager 'Nobody'"),
+    (b'page=0', "'page' must be at least 1"),
+    (b'page_size=5000', "'page_size' must be between 1 and 1000"),
+    (b'fields=secret', 'Unknown fields: secret'),
+    (b'sort=secret', "Cannot sort by 'secret'"),
+    (b'format=xml', "'format' must be 'json' or 'arrow'"),
+])
+def test_invalid_requests_get_a_400(snapshot, query, message):
+    status, _, body = get('/projects', query)
+
+    assert status == 400
+    assert message in json.loads(body)['error']
+
+
+def test_unknown_paths_and_methods(snapshot):
+    assert get('/nowhere')[0] == 404
+    assert get('/projects', method='POST')[0] == 405
+    status, _, body = get('/summary', method='HEAD')
+    assert status == 200 and body == b''
+
+
+def test_websocket_connections_are_closed(snapshot):
+    sent = call({'type': 'websocket', 'path': '/projects'}, [{'type': 'websocket.connect'}])
+
+    assert sent == [{'type': 'websocket.close'}]
+
+
+def test_lifespan_is_acknowledged():
+    sent = call({'type': 'lifespan'}, [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+
+    assert [message['type'] for message in sent] == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_unknown_scope_types_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported ASGI scope type"):
+        call({'type': 'telepathy'})
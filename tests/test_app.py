@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).resolve().parent.parent / 'app.py'
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """The dashboard, run once on the built-in sample portfolio"""
+    monkeypatch.delenv('PM_DASHBOARD_DATA', raising=False)
+    monkeypatch.delenv('PM_DASHBOARD_SHARED_SNAPSHOT', raising=False)
+    return AppTest.from_file(str(APP_PATH), default_timeout=60).run()
+
+
+def table_html(app):
+    return next(element.value for element in app.markdown if 'class="table-header"' in element.value)
+
+
+def test_dashboard_renders(app):
+    assert not app.exception
+    assert [selectbox.key for selectbox in app.sidebar.selectbox][:4] == [
+        'manager_filter', 'project_filter', 'status_filter', 'timeline_filter'
+    ]
+    assert 'OCHA' in table_html(app)
+
+
+def test_filters_rerun_the_dashboard(app):
+    app.sidebar.selectbox(key='status_filter').set_value('Closed').run()
+
+    assert not app.exception
+    assert 'GIRO' in table_html(app)
+    assert 'OCHA' not in table_html(app)
+
+
+def test_clear_filters_resets_every_filter(app):
+    app.sidebar.selectbox(key='status_filter').set_value('Closed').run()
+    app.sidebar.text_input(key='search_query').set_value('wfp').run()
+
+    app.sidebar.button[0].click().run()
+
+    assert not app.exception
+    assert app.session_state['status_filter'] == 'All'
+    assert app.session_state['search_query'] == ''
+    assert 'OCHA' in table_html(app)
+
+
+def test_search_results_keep_their_relevance_order(app):
+    app.sidebar.text_input(key='search_query').set_value('wfp').run()
+
+    assert not app.exception
+    assert app.session_state['table_sort_by'] == 'relevance'
+    assert app.selectbox(key='table_sort_by').options[0] == 'Relevance'
+
+    app.sidebar.text_input(key='search_query').set_value('w').run()
+
+    assert app.session_state['table_sort_by'] == 'project_manager'
+    assert 'OCHA' in table_html(app)
@@ -0,0 +1,100 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from changes import ChangeLog, apply_changes
+from conftest import TODAY, derived_projects
+from filter_index import FilterIndex
+from synthetic import generate_portfolio
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A generated portfolio as a frame, with the first project missing its dates"""
+    df = generate_portfolio(50, today=TODAY, seed=11).to_pandas()
+    df.loc[0, ['start_date', 'end_date', 'status', 'remaining_time_pct']] = [None, None, 'Closed', 40]
+    return df
+
+
+def write(df, path):
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+    return path
+
+
+@pytest.mark.parametrize('compact', [False, True], ids=['standard', 'compact'])
+def test_changes_match_a_fresh_derive(source, tmp_path, compact):
+    df = derived_projects(write(source, tmp_path / 'before.parquet'), compact)
+    names = source['project_name']
+    events = [
+        {'project_name': names[0], 'status': 'Ongoing'},
+        {'project_name': names[1], 'progress_pct': 55, 'end_date': '12/31/2026'},
+        {'project_name': names[2], 'remaining_time_pct': 12},
+        {'project_name': names[1], 'status': 'Closed'},
+        {**source.iloc[3].to_dict(), 'project_name': 'New project', 'project_manager': 'Quentin', 'progress_pct': 5},
+    ]
+
+    changed, before, after = apply_changes(df, events, FilterIndex(df), TODAY, compact)
+
+    edited = source.copy()
+    edited.loc[0, 'status'] = 'Ongoing'
+    edited.loc[1, ['progress_pct', 'end_date', 'status']] = [55, '12/31/2026', 'Closed']
+    edited.loc[2, 'remaining_time_pct'] = 12
+    edited = pd.concat([edited, pd.DataFrame([{**source.iloc[3].to_dict(), 'project_name': 'New project', 'project_manager': 'Quentin', 'progress_pct': 5}])], ignore_index=True)
+    expected = derived_projects(write(edited, tmp_path / 'after.parquet'), compact)
+    pd.testing.assert_frame_equal(changed, expected, check_categorical=False)
+    assert changed['remaining_time_pct'].iloc[0] == 40
+    assert changed['manager_initials'].iloc[-1] == 'Q'
+    assert before.index.tolist() == [0, 1, 2]
+    assert after.index.tolist() == [0, 1, 2, 50]
+
+
+def test_change_log_reads_only_complete_new_lines(tmp_path, caplog):
+    path = tmp_path / 'changes.jsonl'
+    log = ChangeLog(path)
+    assert log.read_new() == []
+
+    path.write_text('{"project_name": "A", "progress_pct": 10}\nnot json\n{"progress_pct": 5}\n{"project_name": "B"')
+    assert log.read_new() == [{'project_name': 'A', 'progress_pct': 10}]
+    assert 'malformed' in caplog.text
+    log.commit()
+
+    with open(path, 'a') as file:
+        file.write(', "status": "Closed"}\n')
+    assert log.read_new() == [{'project_name': 'B', 'status': 'Closed'}]
+    log.commit()
+
+    path.write_text('{"project_name": "C"}\n')
+    assert log.read_new() == [{'project_name': 'C'}]
+
+
+def test_events_are_read_again_until_committed(tmp_path):
+    path = tmp_path / 'changes.jsonl'
+    path.write_text('{"project_name": "A", "progress_pct": 10}\n')
+    log = ChangeLog(path)
+
+    assert len(log.read_new()) == 1
+    assert len(log.read_new()) == 1
+    log.commit()
+
+    assert log.read_new() == []
+    assert log.offset == path.stat().st_size
+
+
+def test_invalid_events_are_skipped_one_by_one(tmp_path, caplog):
+    path = tmp_path / 'changes.jsonl'
+    path.write_text(
+        '{"project_name": "OCHA", "end_date": "2025/13/45"}\n'
+        '{"project_name": "WFP", "progress_pct": 85}\n'
+        '{"project_name": "GIRO", "budget": "lots"}\n'
+        '{"project_name": "UNHCR", "progress_pct": 12.5}\n'
+        '{"project_name": "USAID", "progress_pct": "40", "start_date": "2025-02-01"}\n'
+    )
+
+    events = ChangeLog(path).read_new()
+
+    assert events == [
+        {'project_name': 'WFP', 'progress_pct': 85},
+        {'project_name': 'USAID', 'progress_pct': 40, 'start_date': '02/01/2025'},
+    ]
+    assert caplog.text.count('Skipping invalid change event') == 3
@@ -0,0 +1,49 @@
+import logging
+
+import pyarrow.parquet as pq
+
+from conftest import derived_projects
+from data import compact_project_frame, parse_project_data
+from sources import sample_projects
+
+
+def write_projects(path, **columns):
+    """Write the sample portfolio with some columns replaced"""
+    table = sample_projects()
+    for name, values in columns.items():
+        table = table.set_column(table.schema.get_field_index(name), name, [values])
+    pq.write_table(table, path)
+    return path
+
+
+def test_compact_frame_uses_small_types(tmp_path):
+    df = parse_project_data(write_projects(tmp_path / 'projects.parquet'), compact=True)
+
+    assert str(df['project_manager'].dtype) == 'category'
+    assert str(df['progress_pct'].dtype) == 'uint8'
+    assert str(df['households_reached'].dtype) == 'uint32'
+    assert 'start_date' not in df.columns
+
+
+def test_compact_frame_keeps_missing_numbers(tmp_path):
+    path = write_projects(
+        tmp_path / 'projects.parquet',
+        remaining_time_pct=[11, None, 0, 94],
+        households_reached=[210, None, 98, None],
+    )
+
+    df = derived_projects(path, compact=True)
+
+    assert str(parse_project_data(path, compact=True)['households_reached'].dtype) == 'UInt32'
+    assert df['households_reached'].isna().tolist() == [False, True, False, True]
+    assert df['households_reached'].sum() == 308
+
+
+def test_out_of_range_values_are_clipped_and_logged(tmp_path, caplog):
+    path = write_projects(tmp_path / 'projects.parquet', progress_pct=[93, 180, -5, 10])
+
+    with caplog.at_level(logging.WARNING, logger='data'):
+        df = compact_project_frame(parse_project_data(path))
+
+    assert df['progress_pct'].tolist() == [93, 100, 0, 10]
+    assert "Clipped 2 'progress_pct' values to 0-100" in caplog.text
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import TABLE_EMPTY_HTML, build_table_html, build_table_rows_html
+from conftest import derived_projects
+
+
+@pytest.fixture
+def page(portfolio_path):
+    """Three standard-schema rows, as one page of the projects table"""
+    return derived_projects(portfolio_path).head(3).copy()
+
+
+def test_names_are_escaped(page):
+    page['project_name'] = ['<b>Wells</b> & Pumps', 'Roads', '"Quoted"']
+    page['project_manager'] = ["O'Neil <admin>", 'Ann', 'Ann']
+
+    rows = build_table_rows_html(page)
+
+    assert '&lt;b&gt;Wells&lt;/b&gt; &amp; Pumps' in rows
+    assert '&quot;Quoted&quot;' in rows
+    assert 'O&#x27;Neil &lt;admin&gt;' in rows
+    assert '<b>' not in rows and '<admin>' not in rows
+
+
+def test_missing_values_are_shown_as_dashes_and_blanks(page):
+    page['progress_pct'] = [np.nan, 40.0, 10.0]
+    page['remaining_time_pct'] = pd.array([None, 50, 20], dtype='Int64')
+    page['start_date_dt'] = [pd.NaT, *page['start_date_dt'].iloc[1:]]
+
+    first_row = build_table_rows_html(page.head(1))
+
+    assert '">–</div></div><div class="date-cell"></div>' in first_row
+    assert '<div class="progress-text">–</div>' in first_row
+    assert 'style="width: 0.0%;"' in first_row
+
+
+def test_one_row_per_project_with_trend_cells(page):
+    rows = build_table_rows_html(page, trend_cells=['<i>a</i>', '<i>b</i>', '<i>c</i>'])
+
+    assert rows.count('<div class="project-row">') == 3
+    assert rows.index('<i>a</i>') < rows.index('<i>b</i>') < rows.index('<i>c</i>')
+
+
+def test_an_empty_page_shows_the_empty_state(page):
+    assert build_table_rows_html(page.head(0)) == ""
+
+    table = build_table_html(page.head(0), 0)
+
+    assert TABLE_EMPTY_HTML in table
+    assert 'Projects List (0 items)' in table
+    assert 'project-row' not in table
@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from export import EXPORT_COLUMNS, available_export_formats, export_projects
+
+
+def test_csv_export_has_every_row_in_order(projects):
+    positions = np.arange(len(projects))[::-1]
+
+    table = pa_csv.read_csv(io.BytesIO(export_projects(projects, positions, 'CSV')))
+
+    assert table.column_names == list(EXPORT_COLUMNS.values())
+    assert table.column('Project Name').to_pylist() == projects['project_name'].astype(str).tolist()[::-1]
+
+
+def test_parquet_export_is_written_in_chunks(projects, monkeypatch):
+    monkeypatch.setattr('export.EXPORT_CHUNK_ROWS', 64)
+    positions = np.flatnonzero((projects['status'] == 'Ongoing').to_numpy())
+
+    data = export_projects(projects, positions, 'Parquet')
+
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == len(positions)
+    assert str(table.schema.field('Start Date').type) == 'date32[day]'
+    assert table.column('Budget').to_pylist() == projects['budget'].take(positions).tolist()
+
+
+def test_empty_export_keeps_the_header(projects):
+    table = pa_csv.read_csv(io.BytesIO(export_projects(projects, np.empty(0, dtype=np.intp), 'CSV')))
+
+    assert table.num_rows == 0
+    assert table.column_names == list(EXPORT_COLUMNS.values())
+
+
+@pytest.mark.parametrize('export_format', available_export_formats())
+def test_exports_are_accepted_by_the_download_button(projects, export_format):
+    data = export_projects(projects.head(20), None, export_format)
+
+    assert convert_data_to_bytes_and_infer_mime(data, ValueError('unsupported'))[0] == data
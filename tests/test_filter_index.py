@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from filter_index import FILTER_COLUMNS, FilterFacets, FilterIndex
+from timeline import TIMELINE_FLAGS
+
+
+def mask_positions(df, filter_params):
+    """Row positions of a filter selection worked out with a plain boolean mask"""
+    mask = np.ones(len(df), dtype=bool)
+    for param, column in FILTER_COLUMNS.items():
+        value = filter_params.get(param, 'All')
+        if value != 'All':
+            value = TIMELINE_FLAGS.get(value, value) if param == 'timeline' else value
+            mask &= (df[column].astype(object) == value).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def selections(df):
+    manager = df['project_manager'].iloc[0]
+    return [
+        {'manager': manager},
+        {'manager': manager, 'status': 'Ongoing'},
+        {'status': 'Closed', 'timeline': 'Closed'},
+        {'timeline': 'Red'},
+        {'project': df['project_name'].iloc[3], 'timeline': 'Green'},
+        {'manager': 'Nobody'},
+    ]
+
+
+def test_no_filter_matches_every_row(projects):
+    index = FilterIndex(projects)
+
+    assert index.filter_positions({'manager': 'All', 'timeline': 'All'}) is None
+    assert index.filter_positions({}) is None
+
+
+def test_filter_positions_match_a_mask_scan(projects):
+    index = FilterIndex(projects)
+
+    for selection in selections(projects):
+        assert index.filter_positions(selection).tolist() == mask_positions(projects, selection).tolist()
+
+
+def test_updated_index_matches_a_rebuilt_one(projects):
+    index = FilterIndex(projects)
+    before = projects.iloc[[1, 5]]
+    after = before.astype({'project_manager': object}).assign(project_manager='New Manager')
+    updated_df = projects.astype({'project_manager': object})
+    updated_df.iloc[[1, 5], updated_df.columns.get_loc('project_manager')] = 'New Manager'
+
+    updated = index.updated(before, after, len(projects))
+
+    fresh = FilterIndex(updated_df)
+    for selection in selections(projects) + [{'manager': 'New Manager'}]:
+        assert updated.filter_positions(selection).tolist() == fresh.filter_positions(selection).tolist()
+    assert index.filter_positions({'manager': 'New Manager'}).tolist() == []
+
+
+def test_facets_cascade_from_manager(projects):
+    facets = FilterFacets(projects)
+    manager = projects['project_manager'].iloc[0]
+
+    counts = facets.project_counts(manager)
+
+    assert set(counts) == set(projects.loc[projects['project_manager'] == manager, 'project_name'])
+    assert sum(counts.values()) == facets.manager_counts()[manager]
+
+
+@pytest.mark.parametrize('param', ['manager', 'project', 'status'])
+def test_unknown_values_match_no_rows(projects, param):
+    assert len(FilterIndex(projects).filter_positions({param: 'no such value'})) == 0
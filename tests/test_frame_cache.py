@@ -0,0 +1,90 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from data import parse_project_data
+from frame_cache import CACHE_STATS, cache_path, cached_frame, prune_cache, source_content_hash
+from synthetic import generate_portfolio
+
+
+def load(source, compact=False):
+    return cached_frame(source, compact, parse_project_data)
+
+
+def cache_files(directory):
+    return sorted(path.name for path in directory.glob('projects-*.arrow'))
+
+
+@pytest.mark.parametrize('compact', [False, True], ids=['standard', 'compact'])
+def test_cache_hit_returns_the_parsed_frame(portfolio_path, frame_cache_dir, compact):
+    parsed = load(portfolio_path, compact)
+    hits = CACHE_STATS['hits']
+
+    cached = load(portfolio_path, compact)
+
+    assert CACHE_STATS['hits'] == hits + 1
+    pd.testing.assert_frame_equal(cached, parsed)
+    assert len(cache_files(frame_cache_dir)) == 1
+
+
+def test_cached_strings_stay_arrow_backed(portfolio_path):
+    load(portfolio_path)
+
+    cached = load(portfolio_path)
+
+    assert isinstance(cached['project_name'].dtype, pd.StringDtype)
+    assert cached['project_name'].dtype.storage.startswith('pyarrow')
+
+
+def test_cache_is_keyed_by_content(portfolio_path, frame_cache_dir):
+    load(portfolio_path)
+    os.utime(portfolio_path, ns=(0, 0))
+    assert load(portfolio_path) is not None
+    assert len(cache_files(frame_cache_dir)) == 1
+
+    pq.write_table(generate_portfolio(20, seed=3), portfolio_path)
+
+    assert len(load(portfolio_path)) == 20
+    assert len(cache_files(frame_cache_dir)) == 2
+
+
+def test_unreadable_cache_file_is_rebuilt(portfolio_path, frame_cache_dir):
+    path = cache_path(frame_cache_dir, source_content_hash(portfolio_path))
+    frame_cache_dir.mkdir()
+    path.write_bytes(b'truncated')
+
+    df = load(portfolio_path)
+
+    assert len(df) == 500
+    assert path.stat().st_size > 1000
+
+
+def test_frames_with_failed_sources_are_not_cached(portfolio_path, tmp_path, frame_cache_dir):
+    bad = tmp_path / 'bad.parquet'
+    bad.write_bytes(b'not parquet')
+
+    df = load((str(portfolio_path), str(bad)))
+
+    assert df.attrs['failed_sources'] == [str(bad)]
+    assert cache_files(frame_cache_dir) == []
+
+
+def test_cache_can_be_switched_off(portfolio_path, frame_cache_dir, monkeypatch):
+    monkeypatch.setenv('PM_DASHBOARD_CACHE_DIR', 'off')
+
+    load(portfolio_path)
+
+    assert not frame_cache_dir.exists()
+
+
+def test_prune_keeps_the_most_recently_used_files(tmp_path):
+    for number in range(5):
+        path = tmp_path / f'projects-{number}.arrow'
+        path.write_bytes(b'')
+        os.utime(path, ns=(number * 10**9, number * 10**9))
+
+    prune_cache(tmp_path, max_files=2)
+
+    assert cache_files(tmp_path) == ['projects-3.arrow', 'projects-4.arrow']
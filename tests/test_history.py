@@ -0,0 +1,98 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from conftest import TODAY
+from history import MISSING, HistoryStore, read_project_names, record_snapshot
+
+
+def portfolio(names, progress, remaining=50, budget=1000):
+    return pd.DataFrame({
+        'project_name': names,
+        'status': 'Ongoing',
+        'progress_pct': progress,
+        'remaining_time_pct': remaining,
+        'budget': budget,
+    })
+
+
+def test_recorded_days_load_into_the_matrices(tmp_path):
+    record_snapshot(tmp_path, portfolio(['A', 'B'], [10, 20]), TODAY - timedelta(days=1))
+    record_snapshot(tmp_path, portfolio(['B', 'C'], [30, 40], budget=[5, 6]), TODAY)
+
+    history = HistoryStore(tmp_path).history
+
+    assert list(history.names) == ['A', 'B', 'C']
+    assert history.progress.tolist() == [[10, 20, MISSING], [MISSING, 30, 40]]
+    assert history.budget.tolist() == [1000, 5, 6]
+
+
+def test_rerecording_a_day_replaces_it(tmp_path):
+    store = HistoryStore(tmp_path, interval=0)
+    store.record(portfolio(['A'], [10]), TODAY)
+    assert store.history.progress.tolist() == [[10]]
+
+    store.record(portfolio(['A'], [15]), TODAY)
+
+    assert store.history.progress.tolist() == [[15]]
+
+
+def test_stale_names_do_not_drop_projects_of_other_writers(tmp_path):
+    stale = read_project_names(tmp_path)
+    record_snapshot(tmp_path, portfolio(['A', 'B'], [10, 20]), TODAY)
+
+    names = record_snapshot(tmp_path, portfolio(['C', 'A'], [30, 40]), TODAY + timedelta(days=1), stale)
+
+    assert list(names) == ['A', 'B', 'C']
+    assert list(read_project_names(tmp_path)) == ['A', 'B', 'C']
+    history = HistoryStore(tmp_path).history
+    assert history.progress[1].tolist() == [40, MISSING, 30]
+
+
+def test_concurrent_writers_register_every_project_once(tmp_path):
+    start = threading.Barrier(4)
+
+    def write(writer):
+        start.wait()
+        for day in range(5):
+            names = [f'P{writer}-{number}' for number in range(day + 1)]
+            record_snapshot(tmp_path, portfolio(names, writer * 10 + day), TODAY + timedelta(days=writer * 10 + day))
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    names = read_project_names(tmp_path)
+    assert sorted(names) == sorted(f'P{writer}-{number}' for writer in range(4) for number in range(5))
+    history = HistoryStore(tmp_path).history
+    last_days = history.progress[np.searchsorted(history.days, [np.datetime64(TODAY + timedelta(days=writer * 10 + 4))
+                                                                 for writer in range(4)])]
+    for writer, row in enumerate(last_days):
+        assert (row[history.rows_of([f'P{writer}-{number}' for number in range(5)])] == writer * 10 + 4).all()
+
+
+def test_trends_measure_slope_and_slippage(tmp_path):
+    for offset, progress in enumerate([10, 20, 30]):
+        record_snapshot(tmp_path, portfolio(['A'], [progress], remaining=50), TODAY + timedelta(days=offset))
+
+    trends = HistoryStore(tmp_path).history.trends()
+
+    assert trends.loc['A', 'progress_change'] == 20
+    assert trends.loc['A', 'progress_per_day'] == 10
+    assert trends.loc['A', 'slippage_pct'] == 20
+    assert trends.loc['A', 'days_to_complete'] == 7
+
+
+def test_rows_sharing_a_name_are_recorded_once(tmp_path, caplog):
+    df = portfolio(['A', 'B', 'A', 'A'], [10, 20, 30, 40])
+
+    record_snapshot(tmp_path, df, TODAY)
+
+    history = HistoryStore(tmp_path).history
+    assert list(history.names) == ['A', 'B']
+    assert history.progress.tolist() == [[10, 20]]
+    assert 'Recording only the first row of 1 project names' in caplog.text
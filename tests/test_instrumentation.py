@@ -0,0 +1,67 @@
+import json
+import logging
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import instrumentation
+from instrumentation import PROFILE_LOG_ENV, RerunStats, get_rerun_stats
+from test_app import APP_PATH
+
+DASHBOARD_STAGES = ['load_data', 'sidebar_filters', 'apply_filters', 'project_counts', 'summary_cards', 'project_table']
+
+
+@pytest.fixture
+def profile_log(tmp_path, monkeypatch):
+    """A rerun profile log attached to a fresh rerun stats resource"""
+    path = tmp_path / 'profile.jsonl'
+    monkeypatch.setenv(PROFILE_LOG_ENV, str(path))
+    get_rerun_stats.clear()
+    yield path
+    get_rerun_stats.clear()
+    for handler in list(instrumentation.logger.handlers):
+        instrumentation.logger.removeHandler(handler)
+        handler.close()
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_reruns_are_profiled_per_stage(profile_log, monkeypatch):
+    monkeypatch.delenv('PM_DASHBOARD_DATA', raising=False)
+    monkeypatch.delenv('PM_DASHBOARD_SHARED_SNAPSHOT', raising=False)
+    app = AppTest.from_file(str(APP_PATH), default_timeout=60).run()
+    app.sidebar.selectbox(key='status_filter').set_value('Closed').run()
+
+    assert not app.exception
+    first, second = records(profile_log)
+    for record in (first, second):
+        assert record['scope'] == 'app'
+        assert list(record['stages']) == ['page_chrome', 'other'] + DASHBOARD_STAGES
+        assert record['stages']['project_table']['elements'] > 0
+        assert record['stages']['project_table']['bytes'] > 0
+        assert record['stages']['sidebar_filters']['elements'] > 0
+    assert first['p50_ms'] == first['p95_ms'] == first['total_ms']
+    assert min(first['total_ms'], second['total_ms']) <= second['p50_ms'] <= second['p95_ms']
+    assert second['p95_ms'] <= max(first['total_ms'], second['total_ms'])
+
+
+def test_profile_log_is_attached_once(profile_log):
+    get_rerun_stats()
+    get_rerun_stats.clear()
+    get_rerun_stats()
+
+    handlers = [handler for handler in instrumentation.logger.handlers if isinstance(handler, logging.FileHandler)]
+    assert len(handlers) == 1
+
+
+def test_percentiles_over_the_window():
+    stats = RerunStats(window=100)
+    assert stats.percentiles() == {'p50_ms': None, 'p95_ms': None}
+
+    for duration in range(1, 201):
+        stats.record(duration)
+
+    assert stats.reruns == 200
+    assert stats.percentiles() == {'p50_ms': 150.5, 'p95_ms': 195.05}
@@ -0,0 +1,122 @@
+import logging
+import os
+from datetime import date, timedelta
+
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import TODAY
+import refresher as refresher_module
+from refresher import Snapshot, SnapshotRefresher
+from synthetic import generate_portfolio
+
+
+def test_refresh_swaps_in_a_new_revision(portfolio_path):
+    refresher = SnapshotRefresher(portfolio_path)
+    assert refresher.refresh()
+    first = refresher.snapshot
+
+    assert not refresher.refresh()
+    pq.write_table(generate_portfolio(50, today=TODAY, seed=1), portfolio_path)
+    os.utime(portfolio_path, ns=(0, 0))
+
+    assert refresher.refresh()
+    assert len(refresher.snapshot.df) == 50
+    assert len(first.df) == 500
+
+
+def test_missing_source_keeps_the_last_snapshot(portfolio_path, caplog):
+    refresher = SnapshotRefresher(portfolio_path)
+    refresher.refresh()
+    snapshot = refresher.snapshot
+    data = portfolio_path.read_bytes()
+    portfolio_path.unlink()
+
+    with caplog.at_level(logging.WARNING, logger='refresher'):
+        assert not refresher.refresh()
+        assert not refresher.refresh()
+
+    assert refresher.snapshot is snapshot
+    assert isinstance(refresher.last_error, FileNotFoundError)
+    assert caplog.text.count('Cannot read project data source') == 1
+
+    portfolio_path.write_bytes(data)
+    assert refresher.refresh()
+    assert refresher.last_error is None
+
+
+def test_unreadable_revision_is_not_retried(portfolio_path):
+    refresher = SnapshotRefresher(portfolio_path)
+    refresher.refresh()
+    snapshot = refresher.snapshot
+    portfolio_path.write_bytes(b'not parquet')
+
+    with pytest.raises(Exception):
+        refresher.refresh()
+
+    assert not refresher.refresh()
+    assert refresher.snapshot is snapshot
+
+
+def test_invalid_change_events_do_not_stop_the_refresher(portfolio_path, tmp_path):
+    changes = tmp_path / 'changes.jsonl'
+    name = generate_portfolio(500, today=TODAY, seed=7).column('project_name')[0].as_py()
+    changes.write_text(
+        f'{{"project_name": "{name}", "end_date": "2025/13/45"}}\n'
+        f'{{"project_name": "{name}", "progress_pct": 85}}\n'
+        f'{{"project_name": "{name}", "budget": "lots"}}\n'
+    )
+
+    refresher = SnapshotRefresher(portfolio_path, changes=changes).start()
+    refresher.stop()
+
+    assert refresher.snapshot.df['progress_pct'].iloc[0] == 85
+    assert refresher.changes.offset == changes.stat().st_size
+
+
+def test_change_batches_that_fail_are_applied_again(portfolio_path, tmp_path, monkeypatch):
+    changes = tmp_path / 'changes.jsonl'
+    refresher = SnapshotRefresher(portfolio_path, changes=changes)
+    refresher.refresh()
+    name = refresher.snapshot.df['project_name'].iloc[0]
+    changes.write_text(f'{{"project_name": "{name}", "progress_pct": 85}}\n')
+
+    def fail(*args):
+        raise MemoryError()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Snapshot, 'with_changes', fail)
+        with pytest.raises(MemoryError):
+            refresher.refresh()
+    assert refresher.changes.offset == 0
+
+    assert refresher.refresh()
+    assert refresher.snapshot.df['progress_pct'].iloc[0] == 85
+
+
+class Tomorrow(date):
+    @classmethod
+    def today(cls):
+        return date.today() + timedelta(days=1)
+
+
+@pytest.mark.parametrize('breakage', ['corrupt', 'missing'])
+def test_new_day_is_derived_while_the_source_is_broken(portfolio_path, monkeypatch, breakage):
+    refresher = SnapshotRefresher(portfolio_path)
+    refresher.refresh()
+    snapshot = refresher.snapshot
+    if breakage == 'corrupt':
+        portfolio_path.write_bytes(b'not parquet')
+        with pytest.raises(Exception):
+            refresher.refresh()
+    else:
+        portfolio_path.unlink()
+        assert not refresher.refresh()
+
+    monkeypatch.setattr(refresher_module, 'date', Tomorrow)
+
+    assert refresher.refresh()
+    assert refresher.snapshot.data_date == Tomorrow.today()
+    assert (refresher.snapshot.df['days_remaining'] == snapshot.df['days_remaining'] - 1).all()
+    assert refresher.snapshot.source_version == snapshot.source_version
+    assert not refresher.refresh()
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from render_attributes import AVATAR_COLOR_COUNT, RENDER_COLUMNS, avatar_color, derive_render_attributes
+
+
+def test_render_columns_are_categoricals(projects):
+    for column in RENDER_COLUMNS:
+        assert isinstance(projects[column].dtype, pd.CategoricalDtype), column
+    assert list(projects['avatar_color'].cat.categories) == list(range(AVATAR_COLOR_COUNT))
+
+
+def test_initials_and_colors_follow_the_manager(projects):
+    managers = projects['project_manager'].astype(str)
+
+    assert (projects['manager_initials'].astype(str) == managers.str[:1].str.upper()).all()
+    assert projects['avatar_color'].astype(int).tolist() == [avatar_color(name) for name in managers]
+
+
+def test_classes_follow_status_and_schedule():
+    df = derive_render_attributes(pd.DataFrame({
+        'project_manager': ['ann', 'bob', 'ann', 'al'],
+        'status': ['Ongoing', 'Ongoing', 'Ongoing', 'Closed'],
+        'status_color': ['ongoing-red', 'ongoing-orange', 'ongoing-green', 'closed'],
+        'remaining_time_pct': pd.array([20, 50, None, 0], dtype='Int64'),
+        'progress_pct': [60, 40, 10, 10],
+    }))
+
+    assert df['time_class'].tolist() == ['time-red', 'time-orange', 'time-green', 'time-closed']
+    assert df['progress_class'].tolist() == ['progress-red', 'progress-orange', '', '']
+    assert df['manager_initials'].tolist() == ['A', 'B', 'A', 'A']
+    assert list(df['manager_initials'].cat.categories) == ['A', 'B']
@@ -0,0 +1,69 @@
+import numpy as np
+
+from query import RESULT_ENTRY_OVERHEAD, FilterResult, FilterResultCache
+
+
+def result(rows):
+    return FilterResult(np.arange(rows, dtype=np.int64), {'row_count': rows})
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = FilterResultCache(max_entries=2)
+    cache.put('a', result(1))
+    cache.put('b', result(1))
+    assert cache.get('a') is not None
+
+    cache.put('c', result(1))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_evicts_until_it_fits():
+    entry_bytes = 100 * 8 + RESULT_ENTRY_OVERHEAD
+    cache = FilterResultCache(max_bytes=2 * entry_bytes)
+    cache.put('a', result(100))
+    cache.put('b', result(100))
+    assert cache.stats()['bytes'] == 2 * entry_bytes
+
+    cache.put('c', result(150))
+
+    assert cache.get('a') is None and cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.stats()['bytes'] == 150 * 8 + RESULT_ENTRY_OVERHEAD
+
+    # An entry larger than the whole budget is not kept either
+    cache.put('d', result(500))
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['evictions'] == 4
+
+
+def test_putting_a_key_again_replaces_its_bytes():
+    cache = FilterResultCache()
+    cache.put('a', result(100))
+    cache.put('a', result(10))
+
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == 10 * 8 + RESULT_ENTRY_OVERHEAD
+
+
+def test_unfiltered_results_cost_only_the_overhead():
+    assert FilterResult(None, {}).nbytes == RESULT_ENTRY_OVERHEAD
+
+
+def test_stats_count_hits_and_misses():
+    cache = FilterResultCache()
+    assert cache.stats()['hit_rate'] == 0.0
+    cache.put('a', result(1))
+
+    cache.get('a')
+    cache.get('a')
+    cache.get('b')
+    cache.clear()
+    cache.get('a')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 2)
+    assert stats['hit_rate'] == 0.5
+    assert (stats['entries'], stats['bytes']) == (0, 0)
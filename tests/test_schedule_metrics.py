@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import TODAY
+from data import ENTERED_REMAINING_COLUMN, derive_schedule_metrics
+
+
+def schedule(rows, compact=False):
+    """Schedule metrics of (start, end, status, progress, entered remaining) rows"""
+    df = pd.DataFrame(rows, columns=['start', 'end', 'status', 'progress_pct', 'remaining_time_pct'])
+    df['start_date_dt'] = pd.to_datetime(df.pop('start'))
+    df['end_date_dt'] = pd.to_datetime(df.pop('end'))
+    return derive_schedule_metrics(df, TODAY, compact)
+
+
+def test_metrics_follow_the_dates():
+    df = schedule([
+        ('2025-05-01', '2025-07-01', 'Ongoing', 20, 90),
+        ('2024-01-01', '2025-01-01', 'Ongoing', 100, 90),
+        ('2025-06-01', '2025-06-01', 'Ongoing', 0, 90),
+        ('2025-01-01', '2026-01-01', 'Closed', 40, 90),
+    ])
+
+    assert df['elapsed_pct'].tolist() == [51, 100, 100, 41]
+    assert df['remaining_time_pct'].tolist() == [49, 0, 0, 0]
+    assert df['progress_gap_pct'].tolist() == [31, 0, 100, 1]
+    assert df[ENTERED_REMAINING_COLUMN].tolist() == [90] * 4
+    assert df['elapsed_pct'].dtype == 'int64'
+
+
+def test_entered_remaining_time_is_used_without_dates():
+    df = schedule([(None, '2025-07-01', 'Ongoing', 10, 30)])
+
+    assert df['remaining_time_pct'].tolist() == [30]
+    assert df['elapsed_pct'].tolist() == [70]
+    assert df['progress_gap_pct'].tolist() == [60]
+
+
+@pytest.mark.parametrize('compact, dtypes', [
+    (False, ['Int64', 'Int64', 'Int64']),
+    (True, ['UInt8', 'UInt8', 'Int8']),
+])
+def test_unknown_schedule_is_missing_not_zero(compact, dtypes):
+    df = schedule([
+        (None, None, 'Ongoing', 10, np.nan),
+        ('2025-05-01', '2025-07-01', 'Ongoing', np.nan, 50),
+    ], compact)
+
+    assert df[['remaining_time_pct', 'elapsed_pct', 'progress_gap_pct']].dtypes.astype(str).tolist() == dtypes
+    assert df['remaining_time_pct'].isna().tolist() == [True, False]
+    assert df['elapsed_pct'].isna().tolist() == [True, False]
+    assert df['progress_gap_pct'].isna().tolist() == [True, True]
+
+
+def test_deriving_again_starts_from_the_entered_value():
+    df = schedule([(None, None, 'Closed', 10, 40)])
+    assert df['remaining_time_pct'].tolist() == [0]
+
+    df['status'] = 'Ongoing'
+    df = derive_schedule_metrics(df, TODAY)
+
+    assert df['remaining_time_pct'].tolist() == [40]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from changes import apply_changes
+from conftest import TODAY
+from filter_index import FilterIndex
+from query import filter_key, query_projects
+from search_index import SearchIndex, search_text
+
+NO_FILTERS = {'manager': 'All', 'project': 'All', 'status': 'All', 'timeline': 'All'}
+
+
+def names_of(df, positions):
+    return df['project_name'].astype(str).take(positions).tolist()
+
+
+def test_exact_matches_come_first(projects):
+    matches = names_of(projects, SearchIndex(projects).search('Shelter 7'))
+
+    assert matches[0] == 'USAID Shelter 7'
+    assert all('Shelter' in name for name in matches[:10])
+
+
+def test_last_word_matches_as_a_prefix_and_typos_still_match(projects):
+    index = SearchIndex(projects)
+
+    assert 'GIZ Food Security 5' in names_of(projects, index.search('giz food secu'))
+    assert 'GIZ Food Security 5' in names_of(projects, index.search('GIZ Food Securty 5'))
+    assert len(index.search('zzzz qqqq')) == 0
+
+
+def test_search_matches_managers_and_donors(projects):
+    positions = SearchIndex(projects).search('hassan')
+
+    assert set(projects['project_manager'].astype(str).take(positions)) == {'Hassan Salih'}
+    assert len(positions) == (projects['project_manager'] == 'Hassan Salih').sum()
+
+
+@pytest.mark.parametrize('query', ['', 'a', ' - ', '!!'])
+def test_queries_too_short_to_match_are_no_search(projects, query):
+    index = FilterIndex(projects)
+
+    result = query_projects(projects, {**NO_FILTERS, 'search': query}, index, 'v1', search_index=SearchIndex(projects))
+
+    assert search_text(query) == ''
+    assert result.positions is None and not result.ranked
+    assert result.aggregates['row_count'] == len(projects)
+    assert filter_key('v1', {**NO_FILTERS, 'search': query}) == filter_key('v1', NO_FILTERS)
+
+
+def test_search_results_are_ranked_and_filtered(projects):
+    filter_params = {**NO_FILTERS, 'status': 'Ongoing', 'search': 'WFP'}
+
+    result = query_projects(projects, filter_params, FilterIndex(projects), 'v1', search_index=SearchIndex(projects))
+
+    assert result.ranked
+    assert (projects['status'].take(result.positions) == 'Ongoing').all()
+    assert result.aggregates['row_count'] == len(result.positions)
+
+
+def test_updated_index_matches_a_fresh_build(projects):
+    names = projects['project_name'].astype(str)
+    events = [
+        {'project_name': names[0], 'project_manager': 'Zainab Osman'},
+        {'project_name': names[1], 'donor': 'ECHO'},
+        {**projects.iloc[2][['project_manager', 'avatar', 'status', 'budget', 'remaining_time_pct', 'progress_pct']].to_dict(),
+         'project_name': 'Osman Water 501', 'start_date': '01/01/2025', 'end_date': '12/31/2025'},
+    ]
+    changed, before, after = apply_changes(projects, events, FilterIndex(projects), TODAY)
+
+    updated = SearchIndex(projects).updated(before, after)
+    fresh = SearchIndex(changed)
+
+    for query in ['osman', 'zainab', 'echo', names[1], 'sara salih', 'water']:
+        np.testing.assert_array_equal(updated.search(query), fresh.search(query), err_msg=query)
+    assert 500 in updated.search('osman water')
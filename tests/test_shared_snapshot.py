@@ -0,0 +1,68 @@
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import shared_snapshot
+from conftest import TODAY
+from refresher import Snapshot
+from shared_snapshot import SharedSnapshotReader, publish_snapshot, read_snapshot
+
+
+def snapshot_of(df):
+    return Snapshot(df, 'test', TODAY, datetime(2025, 6, 1, 8))
+
+
+def test_published_snapshot_reads_back_unchanged(projects, tmp_path):
+    generation = publish_snapshot(tmp_path, snapshot_of(projects))
+
+    snapshot = read_snapshot(tmp_path, generation)
+
+    pd.testing.assert_frame_equal(snapshot.df, projects)
+    assert snapshot.version == projects.attrs['data_version']
+    assert snapshot.data_date == TODAY
+
+
+def test_mapped_columns_are_not_copied(projects, tmp_path):
+    generation = publish_snapshot(tmp_path, snapshot_of(projects))
+
+    df = read_snapshot(tmp_path, generation).df
+
+    assert not df['budget'].to_numpy().flags.writeable
+    if not isinstance(projects['project_name'].dtype, pd.CategoricalDtype):
+        assert df['project_name'].dtype.storage.startswith('pyarrow')
+
+
+def test_old_generations_are_removed(projects, tmp_path):
+    for _ in range(5):
+        generation = publish_snapshot(tmp_path, snapshot_of(projects))
+
+    assert generation == 5
+    assert len(list(tmp_path.glob('snapshot-*.arrow'))) == shared_snapshot.SNAPSHOT_KEEP + 1
+
+
+def test_readers_are_served_while_a_generation_is_mapped(projects, tmp_path, monkeypatch):
+    publish_snapshot(tmp_path, snapshot_of(projects))
+    reader = SharedSnapshotReader(tmp_path, interval=0)
+    first = reader.snapshot
+    publish_snapshot(tmp_path, snapshot_of(projects))
+
+    mapping, release = threading.Event(), threading.Event()
+
+    def slow_read(directory, generation):
+        mapping.set()
+        release.wait(5)
+        return read_snapshot(directory, generation)
+
+    monkeypatch.setattr(shared_snapshot, 'read_snapshot', slow_read)
+    checker = threading.Thread(target=reader.check)
+    checker.start()
+    assert mapping.wait(5)
+
+    # Another request neither blocks nor starts a second check meanwhile
+    assert reader.snapshot is first
+    release.set()
+    checker.join(5)
+
+    assert reader.generation == 2
+    assert reader.snapshot is not first
@@ -0,0 +1,126 @@
+import os
+import threading
+
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+
+from sources import (
+    PROJECT_SCHEMA,
+    configured_source,
+    read_projects,
+    sample_projects,
+    source_loads,
+    source_signature,
+)
+
+
+def write_source(path, table=None):
+    """Write the sample portfolio (or `table`) in the format of the path's extension"""
+    table = sample_projects() if table is None else table
+    if path.suffix == '.parquet':
+        pq.write_table(table, path)
+    elif path.suffix == '.arrow':
+        feather.write_feather(table, path)
+    else:
+        table.to_pandas().to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.arrow', '.csv'])
+def test_read_projects_from_each_format(tmp_path, suffix):
+    path = write_source(tmp_path / f'projects{suffix}')
+
+    df = read_projects(path)
+
+    assert list(df.columns) == PROJECT_SCHEMA.names
+    assert df['project_name'].tolist() == ['OCHA', 'WFP', 'GIRO', 'USAID']
+    assert df['budget'].sum() == 1230000
+
+
+def test_missing_optional_columns_are_filled_in(tmp_path):
+    table = sample_projects().drop_columns(['donor', 'households_reached'])
+    path = write_source(tmp_path / 'projects.parquet', table)
+
+    df = read_projects(path)
+
+    assert df['donor'].tolist() == df['project_name'].tolist()
+    assert df['households_reached'].tolist() == [0, 0, 0, 0]
+
+
+def test_missing_required_column_is_reported(tmp_path):
+    path = write_source(tmp_path / 'projects.parquet', sample_projects().drop_columns(['budget']))
+
+    with pytest.raises(ValueError, match='missing required columns: budget'):
+        read_projects(path)
+
+
+def test_unsupported_extension_is_reported(tmp_path):
+    path = tmp_path / 'projects.xlsx'
+    path.write_bytes(b'')
+
+    with pytest.raises(ValueError, match='Unsupported project data file'):
+        read_projects(path)
+
+
+def test_multi_file_source_skips_unreadable_files(tmp_path):
+    good = write_source(tmp_path / 'a.parquet')
+    bad = tmp_path / 'b.parquet'
+    bad.write_bytes(b'not parquet')
+
+    df = read_projects((str(good), str(bad)))
+
+    assert len(df) == sample_projects().num_rows
+    assert df.attrs['failed_sources'] == [str(bad)]
+
+
+def test_multi_file_source_fails_when_no_file_reads(tmp_path):
+    bad = tmp_path / 'b.parquet'
+    bad.write_bytes(b'not parquet')
+
+    with pytest.raises(ValueError, match='None of the project data files'):
+        read_projects((str(bad), str(tmp_path / 'missing.parquet')))
+
+
+def test_source_loads_are_copied_while_files_are_read(tmp_path):
+    paths = [str(write_source(tmp_path / f'{number}.parquet')) for number in range(40)]
+    read_projects((paths[0], paths[1]))
+    loads = source_loads()
+
+    errors = []
+
+    def iterate():
+        try:
+            for _ in range(200):
+                for load in source_loads().values():
+                    assert load['rows'] >= 0
+        except Exception as exc:
+            errors.append(exc)
+
+    reader = threading.Thread(target=iterate)
+    reader.start()
+    for first in range(2, len(paths), 2):
+        read_projects((paths[first], paths[first + 1]))
+    reader.join()
+
+    assert errors == []
+    assert set(loads) >= {paths[0], paths[1]} and paths[2] not in loads
+    assert set(source_loads()) >= set(paths)
+
+
+def test_configured_source_expands_globs(tmp_path, monkeypatch):
+    for name in ('b.parquet', 'a.parquet'):
+        write_source(tmp_path / name)
+    monkeypatch.setenv('PM_DASHBOARD_DATA', str(tmp_path / '*.parquet'))
+
+    assert configured_source() == (str(tmp_path / 'a.parquet'), str(tmp_path / 'b.parquet'))
+
+
+def test_source_signature_changes_with_the_file(tmp_path):
+    path = write_source(tmp_path / 'projects.parquet')
+    before = source_signature(path)
+    os.utime(path, ns=(0, 0))
+
+    assert source_signature(path) != before
+    assert source_signature((str(path), str(tmp_path / 'gone.parquet'))).endswith('gone.parquet:missing')
+    assert source_signature(None) == 'sample'
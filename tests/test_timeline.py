@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from timeline import STATUS_COLORS, classify_status_color
+
+
+def test_days_remaining_fall_into_threshold_bands():
+    status = pd.Series(['Ongoing'] * 5, index=[3, 4, 5, 6, 7])
+    colors = classify_status_color(status, [-5, 59, 60, 119, 120])
+
+    assert colors.tolist() == ['ongoing-red', 'ongoing-red', 'ongoing-orange', 'ongoing-orange', 'ongoing-green']
+    assert list(colors.cat.categories) == STATUS_COLORS
+    assert colors.index.tolist() == [3, 4, 5, 6, 7]
+
+
+def test_custom_thresholds():
+    status = pd.Series(['Ongoing'] * 4)
+    colors = classify_status_color(status, [5, 10, 30, 31], thresholds=(10, 31))
+
+    assert colors.tolist() == ['ongoing-red', 'ongoing-orange', 'ongoing-orange', 'ongoing-green']
+
+
+def test_missing_days_remaining_are_green():
+    status = pd.Series(['Ongoing'] * 3)
+
+    assert classify_status_color(status, [np.nan, None, 10]).tolist() == ['ongoing-green', 'ongoing-green', 'ongoing-red']
+    assert classify_status_color(status, pd.array([None, 70, 10], dtype='Int64')).tolist() == [
+        'ongoing-green', 'ongoing-orange', 'ongoing-red',
+    ]
+
+
+def test_closed_projects_are_closed_whatever_their_days_remaining():
+    status = pd.Series(['Closed', 'Ongoing', 'Closed', 'Closed'])
+    colors = classify_status_color(status, [10, 10, 500, np.nan])
+
+    assert colors.tolist() == ['closed', 'ongoing-red', 'closed', 'closed']
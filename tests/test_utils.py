@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from utils import page_bounds, sorted_positions
+
+
+def test_sorted_positions_of_a_filtered_set_stay_row_positions():
+    df = pd.DataFrame({'budget': [50, 10, 40, 30, 20]}, index=[10, 11, 12, 13, 14])
+
+    assert sorted_positions(df, 'budget').tolist() == [1, 4, 3, 2, 0]
+    assert sorted_positions(df, 'budget', True, np.array([0, 1, 3])).tolist() == [0, 3, 1]
+    assert sorted_positions(df, 'budget', positions=np.empty(0, dtype=np.intp)).tolist() == []
+
+
+def test_sorted_positions_put_missing_values_last_and_keep_ties_stable():
+    df = pd.DataFrame({'end': [3.0, np.nan, 1.0, 3.0, np.nan]})
+
+    assert sorted_positions(df, 'end').tolist() == [2, 0, 3, 1, 4]
+    assert sorted_positions(df, 'end', descending=True).tolist() == [0, 3, 2, 1, 4]
+
+
+def test_page_bounds_slice_the_last_partial_page():
+    assert page_bounds(45, 1, 20) == (1, 3, 0, 20)
+    assert page_bounds(45, 3, 20) == (3, 3, 40, 45)
+
+
+def test_page_bounds_clamp_the_page_number():
+    assert page_bounds(45, 9, 20) == (3, 3, 40, 45)
+    assert page_bounds(45, 0, 20) == (1, 3, 0, 20)
+    assert page_bounds(0, 2, 20) == (1, 1, 0, 0)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Days-remaining thresholds: below the first is red, below the second orange
+TIMELINE_THRESHOLDS = (60, 120)
+
+# Status color categories, in threshold order with closed projects last
+STATUS_COLORS = ['ongoing-red', 'ongoing-orange', 'ongoing-green', 'closed']
+
+# Timeline flag filter options mapped to their status color
+TIMELINE_FLAGS = {
+    'Red': 'ongoing-red',
+    'Orange': 'ongoing-orange',
+    'Green': 'ongoing-green',
+    'Closed': 'closed',
+}
+
+# Status color counted as a critical timeline
+CRITICAL_STATUS_COLOR = 'ongoing-red'
+
+
+def classify_status_color(status, days_remaining, thresholds=TIMELINE_THRESHOLDS):
+    """
+    Classify projects into timeline status colors without a per-row loop
+
+    Closed projects are 'closed'; other projects are red, orange or green
+    depending on which threshold their days remaining fall below. Projects
+    with no days remaining value are treated as green. Returns a categorical
+    Series with STATUS_COLORS as categories.
+    """
+    days = pd.Series(days_remaining).to_numpy(dtype='float64', na_value=np.nan)
+
+    # searchsorted puts NaN past the last threshold, i.e. green
+    codes = np.searchsorted(np.asarray(thresholds, dtype='float64'), days, side='right')
+    codes[np.asarray(status == 'Closed', dtype=bool)] = STATUS_COLORS.index('closed')
+
+    index = getattr(status, 'index', None)
+    return pd.Series(
+        pd.Categorical.from_codes(codes.astype('int8'), categories=STATUS_COLORS),
+        index=index,
+        name='status_color',
+    )
+
+
+def critical_count(df):
+    """Number of projects with a critical (red) timeline"""
+    return int((df['status_color'] == CRITICAL_STATUS_COLOR).sum())
@@ -1,32 +1,34 @@
-def apply_filters(df, filter_params):
+import pandas as pd
+
+def sorted_positions(df, sort_by, descending=False, positions=None):
     """
-    Apply filters to the dataframe based on selected filter parameters
-    """
-    filtered_df = df.copy()
-    
-    # Filter by project manager
-    if filter_params['manager'] != 'All':
-        filtered_df = filtered_df[filtered_df['project_manager'] == filter_params['manager']]
-    
-    # Filter by project name
-    if filter_params['project'] != 'All':
-        filtered_df = filtered_df[filtered_df['project_name'] == filter_params['project']]
-    
-    # Filter by status
-    if filter_params['status'] != 'All':
-        filtered_df = filtered_df[filtered_df['status'] == filter_params['status']]
+    Return the row positions of the dataframe ordered by one column
     
-    # Filter by timeline flag
-    if filter_params['timeline'] != 'All':
-        if filter_params['timeline'] == 'Closed':
-            filtered_df = filtered_df[filtered_df['status'] == 'Closed']
-        elif filter_params['timeline'] == 'Red':
-            filtered_df = filtered_df[(filtered_df['status'] != 'Closed') & (filtered_df['days_remaining'] < 60)]
-        elif filter_params['timeline'] == 'Orange':
-            filtered_df = filtered_df[(filtered_df['status'] != 'Closed') & 
-                                 (filtered_df['days_remaining'] >= 60) & 
-                                 (filtered_df['days_remaining'] < 120)]
-        elif filter_params['timeline'] == 'Green':
-            filtered_df = filtered_df[(filtered_df['status'] != 'Closed') & (filtered_df['days_remaining'] >= 120)]
+    With `positions` (a filtered set) only those rows are ordered; only the
+    sort column is taken, never the rows. The sort is stable and missing
+    values always come last.
+    """
+    column = df[sort_by] if positions is None else df[sort_by].take(positions)
+    ordered = column.reset_index(drop=True).sort_values(ascending=not descending, kind='stable', na_position='last')
+    order = ordered.index.to_numpy()
+    return order if positions is None else positions[order]
+
+def page_bounds(total_rows, page, page_size):
+    """
+    Clamp a 1-based page number and return (page, page_count, start, stop)
     
-    return filtered_df
+    `start` and `stop` are the row positions of the page within the full set.
+    """
+    page_count = max(1, -(-total_rows // page_size))
+    page = min(max(1, int(page)), page_count)
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total_rows)
+    return page, page_count, start, stop
+
+def format_dates(dates):
+    """Format datetime values as month/day/year strings, blank when missing"""
+    return ['' if pd.isna(value) else f"{value.month}/{value.day}/{value.year}" for value in dates]
+
+def format_percents(values):
+    """Format percentages as '57%' labels, '–' when missing"""
+    return ['–' if pd.isna(value) else f"{value:.0f}%" for value in values.tolist()]